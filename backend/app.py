@@ -12,10 +12,21 @@ from datetime import datetime
 # Import routes
 from app.routes.detection_routes import detection_bp
 from app.routes.model_routes import model_bp
+from app.routes.job_routes import job_bp
+from app.routes.socket_routes import register_socket_routes
+from app.services.job_queue import get_job_queue
+from app.services.readiness import readiness, start_warmup
 from app.config import Config
 
-def create_app(config_class=Config):
-    """Application factory pattern"""
+def create_app(config_class=Config, warmup: bool = True):
+    """
+    Application factory pattern
+
+    Args:
+        config_class: Configuration class
+        warmup: Whether to start background work: eager model loading (when
+            Config.EAGER_LOAD is set) and the job queue workers
+    """
     app = Flask(__name__)
     app.config.from_object(config_class)
 
@@ -35,14 +46,39 @@ def create_app(config_class=Config):
     # Register blueprints
     app.register_blueprint(detection_bp, url_prefix='/api/detection')
     app.register_blueprint(model_bp, url_prefix='/api/model')
+    app.register_blueprint(job_bp, url_prefix='/api/jobs')
+
+    # WebSocket frame streaming (optional flask-sock)
+    register_socket_routes(app)
+
+    # Load and warm models eagerly
+    if app.config.get('EAGER_LOAD'):
+        if warmup:
+            start_warmup()
+    else:
+        readiness.set_status('ready')
 
-    # Health check endpoint
+    # Resume queued and interrupted background jobs
+    if warmup:
+        get_job_queue().start()
+
+    # Health check endpoint (readiness: 503 until models are loaded and warm)
     @app.route('/api/health', methods=['GET'])
     def health_check():
+        state = readiness.to_dict()
         return jsonify({
-            'status': 'healthy',
+            'status': 'healthy' if state['ready'] else state['status'],
             'timestamp': datetime.now().isoformat(),
-            'service': 'Object Detection API'
+            'service': 'Object Detection API',
+            'readiness': state
+        }), 200 if state['ready'] else 503
+
+    # Liveness endpoint (process is up, regardless of model state)
+    @app.route('/api/health/live', methods=['GET'])
+    def liveness_check():
+        return jsonify({
+            'status': 'alive',
+            'timestamp': datetime.now().isoformat()
         }), 200
 
     # Root endpoint
@@ -53,12 +89,15 @@ def create_app(config_class=Config):
             'version': '1.0.0',
             'endpoints': {
                 'health': '/api/health',
+                'liveness': '/api/health/live',
                 'detect_image': '/api/detection/image',
                 'detect_stream': '/api/detection/stream',
                 'get_models': '/api/model/list',
                 'get_classes': '/api/model/classes',
                 'upload': '/api/detection/upload',
+                'jobs': '/api/jobs',
                 'video_feed': '/api/detection/video_feed',
+                'stream_socket': '/api/detection/stream/ws',
                 'stop_camera': '/stop_camera',
                 'set_webcam': '/set_webcam'
             }
@@ -105,7 +144,8 @@ def create_app(config_class=Config):
     return app
 
 if __name__ == '__main__':
-    app = create_app()
+    # With the debug reloader only the child process (WERKZEUG_RUN_MAIN) serves requests
+    app = create_app(warmup=not Config.DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true')
     print("=" * 50)
     print("🚀 Object Detection API Server")
     print("=" * 50)
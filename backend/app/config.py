@@ -20,10 +20,11 @@ class Config:
     # File upload settings
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
     OUTPUT_FOLDER = os.path.join(BASE_DIR, 'outputs')
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB max file size
+    MAX_CONTENT_LENGTH = int(float(os.environ.get('MAX_CONTENT_MB', '16')) * 1024 * 1024)  # 16 MB max request size
 
     # Allowed file extensions
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
+    VIDEO_EXTENSIONS = {'mp4', 'avi', 'mov', 'mkv', 'webm'}
 
     # Dataset and model paths
     DATASETS_FOLDER = os.path.join(BASE_DIR, 'Datasets')
@@ -34,6 +35,88 @@ class Config:
     DEFAULT_MODEL = os.environ.get('DEFAULT_MODEL') or os.path.join(BASE_DIR, 'yolov8n.pt')
     DEFAULT_CONF = float(os.environ.get('DEFAULT_CONF', '0.25'))
 
+    # Micro-batching of concurrent inference requests
+    BATCH_ENABLED = os.environ.get('BATCH_ENABLED', 'True').lower() == 'true'
+    BATCH_WINDOW_MS = float(os.environ.get('BATCH_WINDOW_MS', '10'))
+    BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', '8'))
+
+    # Model replica pool (0 = auto: one replica per 4 cores, cores split evenly)
+    MODEL_REPLICAS = int(os.environ.get('MODEL_REPLICAS', '0'))
+    TORCH_THREADS_PER_REPLICA = int(os.environ.get('TORCH_THREADS_PER_REPLICA', '0'))
+
+    # Inference backend: auto (ONNX Runtime for .onnx files), ultralytics or onnxruntime
+    INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'auto').lower()
+
+    # Model weight formats that may be selected per request
+    MODEL_EXTENSIONS = {'pt', 'onnx'}
+
+    # Loaded model registry (LRU, 0 = unlimited memory budget)
+    MODEL_CACHE_MB = float(os.environ.get('MODEL_CACHE_MB', '1024'))
+
+    # Input sizes used to warm up a model before it serves traffic
+    WARMUP_SIZES = [int(size) for size in os.environ.get('WARMUP_SIZES', '640').split(',') if size.strip()]
+
+    # Detection result cache (content hash + model + params -> detections)
+    RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'True').lower() == 'true'
+    RESULT_CACHE_MB = float(os.environ.get('RESULT_CACHE_MB', '64'))
+    RESULT_CACHE_DIR = os.environ.get('RESULT_CACHE_DIR', '')  # empty = no disk tier
+    RESULT_CACHE_DISK_MB = float(os.environ.get('RESULT_CACHE_DISK_MB', '512'))
+
+    # Cached inference runs at this floor so any higher conf is a cheap array filter
+    CONF_FLOOR = float(os.environ.get('CONF_FLOOR', '0.05'))
+
+    # Sliced (tiled) inference for large images with small objects (enabled per request)
+    TILE_SIZE = int(os.environ.get('TILE_SIZE', '640'))
+    TILE_OVERLAP = float(os.environ.get('TILE_OVERLAP', '0.2'))
+    TILE_FULL_PASS = os.environ.get('TILE_FULL_PASS', 'True').lower() == 'true'  # also run the whole image
+    TILE_MERGE = os.environ.get('TILE_MERGE', 'wbf').lower()  # wbf or nms
+    TILE_IOU = float(os.environ.get('TILE_IOU', '0.5'))
+
+    # Adaptive input resolution (imgsz=auto): candidate sizes and smallest object of interest
+    IMGSZ_CHOICES = [int(size) for size in os.environ.get('IMGSZ_CHOICES', '320,416,512,640').split(',') if size.strip()]
+    ADAPTIVE_MIN_OBJECT_PX = float(os.environ.get('ADAPTIVE_MIN_OBJECT_PX', '32'))
+
+    # Keep original uploads in UPLOAD_FOLDER (written in the background)
+    PERSIST_UPLOADS = os.environ.get('PERSIST_UPLOADS', 'True').lower() == 'true'
+
+    # Render annotated output images on first request instead of in every detection
+    DEFERRED_RENDER = os.environ.get('DEFERRED_RENDER', 'True').lower() == 'true'
+
+    # Background job queue (SQLite-backed, survives restarts)
+    JOBS_DB = os.environ.get('JOBS_DB') or os.path.join(BASE_DIR, 'jobs.db')
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '1'))
+    JOB_NICE = int(os.environ.get('JOB_NICE', '10'))  # OS priority penalty for job threads (Linux)
+    JOB_FLUSH_INTERVAL = float(os.environ.get('JOB_FLUSH_INTERVAL', '0.5'))
+    JOB_MAX_REPLICAS = int(os.environ.get('JOB_MAX_REPLICAS', '1'))  # replicas background jobs may occupy
+
+    # Recorded video pipeline (decode -> batched inference -> encode)
+    VIDEO_BATCH_SIZE = int(os.environ.get('VIDEO_BATCH_SIZE', '4'))
+    VIDEO_QUEUE_SIZE = int(os.environ.get('VIDEO_QUEUE_SIZE', '16'))
+
+    # Live MJPEG streams (latest frame wins, stale frames are dropped)
+    STREAM_JPEG_QUALITY = int(os.environ.get('STREAM_JPEG_QUALITY', '80'))
+
+    # Stream latency targets (0 = off, overridable per stream with ?fps= and ?latency_ms=)
+    STREAM_TARGET_FPS = float(os.environ.get('STREAM_TARGET_FPS', '0'))
+    STREAM_TARGET_LATENCY_MS = float(os.environ.get('STREAM_TARGET_LATENCY_MS', '0'))
+    STREAM_MIN_JPEG_QUALITY = int(os.environ.get('STREAM_MIN_JPEG_QUALITY', '40'))
+    STREAM_CONTROL_INTERVAL_S = float(os.environ.get('STREAM_CONTROL_INTERVAL_S', '1.0'))
+
+    # Tracker-assisted sparse inference for live streams (detector runs every N frames)
+    TRACKER_ENABLED = os.environ.get('TRACKER_ENABLED', 'True').lower() == 'true'
+    TRACKER_DETECT_INTERVAL = int(os.environ.get('TRACKER_DETECT_INTERVAL', '4'))
+    TRACKER_CONF_DECAY = float(os.environ.get('TRACKER_CONF_DECAY', '0.95'))
+    TRACKER_MIN_CONF = float(os.environ.get('TRACKER_MIN_CONF', '0.2'))
+
+    # Motion gate: reuse the last stream result while the scene is static
+    MOTION_GATE_ENABLED = os.environ.get('MOTION_GATE_ENABLED', 'True').lower() == 'true'
+    MOTION_THRESHOLD = float(os.environ.get('MOTION_THRESHOLD', '0.02'))  # fraction of changed pixels
+    MOTION_MAX_STALE_S = float(os.environ.get('MOTION_MAX_STALE_S', '2.0'))
+
+    # Load and warm models at startup; /api/health reports 503 until done
+    EAGER_LOAD = os.environ.get('EAGER_LOAD', 'True').lower() == 'true'
+    PRELOAD_MODELS = [m.strip() for m in os.environ.get('PRELOAD_MODELS', '').split(',') if m.strip()]
+
     # CORS settings
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000,http://localhost:5173').split(',')
 
@@ -57,6 +140,7 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     DEBUG = True
+    EAGER_LOAD = False
 
 
 # Configuration dictionary
@@ -1,5 +1,6 @@
 """Routes package"""
 from .detection_routes import detection_bp
 from .model_routes import model_bp
+from .job_routes import job_bp
 
-__all__ = ['detection_bp', 'model_bp']
+__all__ = ['detection_bp', 'model_bp', 'job_bp']
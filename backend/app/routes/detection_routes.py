@@ -3,21 +3,140 @@ Detection API Routes
 Endpoints for object detection operations
 """
 
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, request, jsonify, send_file
 from werkzeug.utils import secure_filename
 import os
 import cv2
-import numpy as np
 from datetime import datetime
+from urllib.parse import quote
 import base64
+import io
+import json
+import time
+import uuid
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Optional
 
 from app.services.detect_service import get_detection_service
-from app.utils.validators import allowed_file, validate_image
+from app.services.job_handlers import video_output_paths
+from app.services.job_queue import get_job_queue
+from app.services.live_stream import get_stream_broker
+from app.utils.resolution import normalize_imgsz
+from app.utils.tiling import tiling_options
+from app.utils.validators import allowed_file, decode_image, resolve_model_path
+from app.utils.binary import (
+    BINARY_FORMATS, MSGPACK_MIMETYPE, encode_msgpack, encode_multipart, msgpack_available, pack_detections
+)
 from app.config import Config
 
 detection_bp = Blueprint('detection', __name__)
 
 
+def unique_filename(filename: str) -> str:
+    """Build a sanitized upload name that does not collide between concurrent requests"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f"{timestamp}_{uuid.uuid4().hex[:8]}_{secure_filename(filename)}"
+
+
+def parse_tiling(values) -> Optional[dict]:
+    """
+    Tiled inference settings from request parameters
+
+    Reads tiled, tile_size, tile_overlap, tile_full_pass and tile_merge from
+    form data, JSON or query string; None unless tiled is true.
+
+    Raises:
+        ValueError: If a tile setting is invalid
+    """
+    if str(values.get('tiled', 'false')).lower() not in ('true', '1'):
+        return None
+    full_pass = values.get('tile_full_pass')
+    return tiling_options(
+        size=values.get('tile_size'),
+        overlap=values.get('tile_overlap'),
+        full_pass=None if full_pass is None else str(full_pass).lower() in ('true', '1'),
+        merge=values.get('tile_merge')
+    )
+
+
+def parse_imgsz(values) -> dict:
+    """
+    Inference resolution settings from request parameters
+
+    Reads imgsz (pixels or 'auto') and latency_budget_ms from form data,
+    JSON or query string, as keyword arguments for the detection service.
+
+    Raises:
+        ValueError: If imgsz or the latency budget is invalid
+    """
+    budget = values.get('latency_budget_ms')
+    if budget is not None and budget != '':
+        try:
+            budget = float(budget)
+        except (TypeError, ValueError):
+            raise ValueError('latency_budget_ms must be a number')
+        if budget <= 0:
+            raise ValueError('latency_budget_ms must be positive')
+    else:
+        budget = None
+    return {'imgsz': normalize_imgsz(values.get('imgsz')), 'latency_budget_ms': budget}
+
+
+def parse_stream_targets(values) -> dict:
+    """
+    Stream latency targets from query parameters
+
+    Reads fps and latency_ms; a missing value falls back to the Config
+    default and 0 turns the target off.
+
+    Raises:
+        ValueError: If a target is not a non-negative number
+    """
+    targets = {}
+    for param, name in (('fps', 'target_fps'), ('latency_ms', 'target_latency_ms')):
+        value = values.get(param)
+        if value is None or value == '':
+            targets[name] = None
+            continue
+        try:
+            targets[name] = float(value)
+        except ValueError:
+            raise ValueError(f'{param} must be a number')
+        if targets[name] < 0:
+            raise ValueError(f'{param} must not be negative')
+    return targets
+
+
+def mjpeg_response(camera_index: int, conf: float, model: Optional[str], **targets):
+    """
+    Stream annotated camera frames as multipart MJPEG
+
+    Capture, inference and encoding run in their own threads and only the
+    newest frame moves on, so a slow model lowers the frame rate instead of
+    adding lag. Viewers of the same camera and settings share one stream.
+    Optional target_fps / target_latency_ms are held by a StreamController.
+    """
+    broker = get_stream_broker()
+    stream = broker.subscribe(camera_index, conf=conf, model=model, **targets)
+    if stream is None:
+        return jsonify({'error': f'Cannot open camera {camera_index}'}), 500
+
+    def generate_frames():
+        """Yield encoded frames until the client disconnects or the camera stops"""
+        try:
+            for frame_bytes in stream.jpeg_frames():
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+        finally:
+            broker.unsubscribe(stream)
+
+    return Response(
+        generate_frames(),
+        mimetype='multipart/x-mixed-replace; boundary=frame'
+    )
+
+
 @detection_bp.route('/image', methods=['POST'])
 def detect_image():
     """
@@ -25,8 +144,13 @@ def detect_image():
 
     Expected form data:
         - image: Image file (jpg, jpeg, png)
-        - conf: Confidence threshold (optional, default: 0.25)
+        - conf: Confidence threshold (optional, default: current threshold, 0.25)
         - save: Whether to save result (optional, default: true)
+        - model: Model to use (optional, default: current model)
+        - tiled: Sliced inference for large images with small objects (optional, default: false)
+        - tile_size, tile_overlap, tile_full_pass, tile_merge: Tiling settings (optional)
+        - imgsz: Inference size in pixels or 'auto' (optional, default: model input size)
+        - latency_budget_ms: Forward latency budget for imgsz=auto (optional)
 
     Returns:
         JSON with detection results and image URL
@@ -47,31 +171,44 @@ def detect_image():
             return jsonify({'error': 'Invalid file type. Allowed: jpg, jpeg, png'}), 400
 
         # Get parameters
-        conf = request.form.get('conf', type=float, default=0.25)
+        conf = request.form.get('conf', type=float)
         save = request.form.get('save', type=str, default='true').lower() == 'true'
-
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{timestamp}_{filename}"
-        filepath = os.path.join(Config.UPLOAD_FOLDER, filename)
-        file.save(filepath)
-
-        # Validate image
-        if not validate_image(filepath):
-            os.remove(filepath)
+        model_param = request.form.get('model')
+        model = resolve_model_path(model_param) if model_param else None
+        if model_param and model is None:
+            return jsonify({'error': f'Model not found: {model_param}'}), 404
+        try:
+            tiling = parse_tiling(request.form)
+            sizing = parse_imgsz(request.form)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Decode once from memory; the original is persisted in the background
+        content = file.read()
+        image = decode_image(content)
+        if image is None:
             return jsonify({'error': 'Invalid or corrupted image file'}), 400
 
-        # Run detection
+        filename = unique_filename(file.filename)
+        filepath = None
         service = get_detection_service()
+        if Config.PERSIST_UPLOADS:
+            filepath = os.path.join(Config.UPLOAD_FOLDER, filename)
+            service.persist(content, filepath)
+
+        # Run detection
         output_path = os.path.join(Config.OUTPUT_FOLDER, f"detected_{filename}") if save else None
-        result = service.detect_image(filepath, conf=conf, save_result=save, output_path=output_path)
+        result = service.detect_array(
+            image, conf=conf, save_result=save, output_path=output_path, model=model,
+            content=content, source_path=filepath, tiling=tiling, **sizing
+        )
 
         if 'error' in result:
             return jsonify({'error': result['error']}), 500
 
         # Add URLs to response
-        result['uploaded_image'] = f"/api/detection/image/uploads/{filename}"
+        if filepath:
+            result['uploaded_image'] = f"/api/detection/image/uploads/{filename}"
         if save and result.get('output_image'):
             output_filename = os.path.basename(result['output_image'])
             result['detected_image'] = f"/api/detection/image/outputs/{output_filename}"
@@ -91,7 +228,10 @@ def detect_image_base64():
         {
             "image": "base64_string",
             "conf": 0.25 (optional),
-            "return_image": true (optional)
+            "return_image": true (optional),
+            "model": "yolov8n.pt" (optional),
+            "tiled": false (optional, plus tile_size, tile_overlap, tile_full_pass, tile_merge),
+            "imgsz": 640 or "auto" (optional, plus latency_budget_ms)
         }
 
     Returns:
@@ -110,8 +250,7 @@ def detect_image_base64():
                 image_data = image_data.split(',')[1]
 
             img_bytes = base64.b64decode(image_data)
-            nparr = np.frombuffer(img_bytes, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            image = decode_image(img_bytes)
 
             if image is None:
                 return jsonify({'error': 'Could not decode image'}), 400
@@ -120,28 +259,32 @@ def detect_image_base64():
             return jsonify({'error': f'Invalid base64 image: {str(e)}'}), 400
 
         # Get parameters
-        conf = data.get('conf', 0.25)
+        conf = data.get('conf')
         return_image = data.get('return_image', False)
+        model_param = data.get('model')
+        model = resolve_model_path(model_param) if model_param else None
+        if model_param and model is None:
+            return jsonify({'error': f'Model not found: {model_param}'}), 404
+        try:
+            tiling = parse_tiling(data)
+            sizing = parse_imgsz(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
-        # Save temporary file
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        temp_path = os.path.join(Config.UPLOAD_FOLDER, f"temp_{timestamp}.jpg")
-        cv2.imwrite(temp_path, image)
-
-        # Run detection
+        # Run detection in memory
         service = get_detection_service()
-        result = service.detect_image(temp_path, conf=conf, save_result=False)
-
-        # Clean up temp file
-        os.remove(temp_path)
+        result = service.detect_array(
+            image, conf=conf, model=model, content=img_bytes, return_jpeg=bool(return_image), tiling=tiling,
+            **sizing
+        )
 
         if 'error' in result:
             return jsonify({'error': result['error']}), 500
 
         # Optionally return annotated image as base64
-        if return_image and result.get('output_image'):
-            annotated_image = cv2.imread(result['output_image'])
-            result['annotated_image'] = service.frame_to_base64(annotated_image)
+        annotated_jpeg = result.pop('annotated_jpeg', None)
+        if annotated_jpeg is not None:
+            result['annotated_image'] = service.jpeg_to_base64(annotated_jpeg)
 
         return jsonify(result), 200
 
@@ -157,7 +300,8 @@ def start_stream():
     Expected JSON:
         {
             "camera": 0 (optional, default: 0),
-            "conf": 0.25 (optional)
+            "conf": 0.25 (optional),
+            "model": "yolov8n.pt" (optional)
         }
 
     Returns:
@@ -167,22 +311,19 @@ def start_stream():
         data = request.get_json() or {}
         camera_index = data.get('camera', 0)
         conf = data.get('conf', 0.25)
+        model = data.get('model')
 
-        # Try to open camera
-        cap = cv2.VideoCapture(camera_index)
-        if not cap.isOpened():
+        # A camera that is already streaming is reused instead of opened again
+        if not get_stream_broker().camera_available(camera_index):
             return jsonify({'error': f'Cannot open camera {camera_index}'}), 500
 
-        # Store camera info (in production, use Redis or session management)
-        # For now, just return success
-        cap.release()
-
         return jsonify({
             'success': True,
             'message': 'Stream initialized',
             'camera': camera_index,
             'conf': conf,
             'stream_url': f'/api/detection/stream/video?camera={camera_index}&conf={conf}'
+                          + (f'&model={quote(model)}' if model else '')
         }), 200
 
     except Exception as e:
@@ -197,43 +338,79 @@ def video_stream():
     Query parameters:
         - camera: Camera index (default: 0)
         - conf: Confidence threshold (default: 0.25)
+        - model: Model to use (default: current model)
+        - fps: Target frame rate (default: STREAM_TARGET_FPS, 0 = none)
+        - latency_ms: Target capture-to-frame latency (default: STREAM_TARGET_LATENCY_MS, 0 = none)
 
     Returns:
         Video stream with multipart/x-mixed-replace
     """
-    from flask import Response
-
     camera_index = request.args.get('camera', default=0, type=int)
     conf = request.args.get('conf', default=0.25, type=float)
+    model_param = request.args.get('model')
+    model = resolve_model_path(model_param) if model_param else None
+    if model_param and model is None:
+        return jsonify({'error': f'Model not found: {model_param}'}), 404
+    try:
+        targets = parse_stream_targets(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    def generate_frames():
-        """Generate frames with detection"""
-        cap = cv2.VideoCapture(camera_index)
-        service = get_detection_service()
+    return mjpeg_response(camera_index, conf, model, **targets)
 
-        try:
-            while True:
-                success, frame = cap.read()
-                if not success:
-                    break
 
-                # Run detection
-                annotated_frame, detections = service.detect_frame(frame, conf=conf, draw_boxes=True)
+@detection_bp.route('/stream/stats', methods=['GET'])
+def get_stream_stats():
+    """
+    Stats of the open cameras and their MJPEG streams
 
-                # Encode frame
-                ret, buffer = cv2.imencode('.jpg', annotated_frame)
-                frame_bytes = buffer.tobytes()
+    Per stream: subscribers, frames inferred/encoded, frames dropped before
+    inference and before encoding, output FPS and the latest
+    capture-to-encode latency.
+    """
+    try:
+        return jsonify(get_stream_broker().get_stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
 
-        finally:
-            cap.release()
+@detection_bp.route('/stream/snapshot', methods=['GET'])
+def get_stream_snapshot():
+    """
+    Latest annotated frame of a running stream, without opening the camera again
 
-    return Response(
-        generate_frames(),
-        mimetype='multipart/x-mixed-replace; boundary=frame'
-    )
+    Query parameters:
+        - camera: Camera index (default: 0)
+        - model: Only use a stream running this model (optional)
+        - format: jpeg (default) or json (detections + base64 image)
+    """
+    try:
+        camera_index = request.args.get('camera', default=0, type=int)
+        model_param = request.args.get('model')
+        model = resolve_model_path(model_param) if model_param else None
+        if model_param and model is None:
+            return jsonify({'error': f'Model not found: {model_param}'}), 404
+
+        snapshot = get_stream_broker().snapshot(camera_index, model=model)
+        if snapshot is None:
+            return jsonify({'error': f'No active stream for camera {camera_index}'}), 404
+
+        if request.args.get('format') == 'json':
+            return jsonify({
+                'success': True,
+                'camera': camera_index,
+                'detections': snapshot['detections'],
+                'count': len(snapshot['detections']),
+                'age_ms': snapshot['age_ms'],
+                'image': get_detection_service().jpeg_to_base64(snapshot['jpeg'])
+            }), 200
+
+        response = Response(snapshot['jpeg'], mimetype='image/jpeg')
+        response.headers['Cache-Control'] = 'no-store'
+        response.headers['X-Frame-Age-Ms'] = str(snapshot['age_ms'])
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 
 @detection_bp.route('/stream/frame', methods=['POST'])
@@ -245,7 +422,9 @@ def detect_stream_frame():
         {
             "frame": "base64_string",
             "conf": 0.25 (optional),
-            "return_image": true (optional)
+            "return_image": true (optional),
+            "model": "yolov8n.pt" (optional),
+            "imgsz": 640 or "auto" (optional, plus latency_budget_ms)
         }
 
     Returns:
@@ -263,8 +442,7 @@ def detect_stream_frame():
             frame_data = frame_data.split(',')[1]
 
         img_bytes = base64.b64decode(frame_data)
-        nparr = np.frombuffer(img_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        frame = decode_image(img_bytes)
 
         if frame is None:
             return jsonify({'error': 'Could not decode frame'}), 400
@@ -272,10 +450,18 @@ def detect_stream_frame():
         # Get parameters
         conf = data.get('conf', 0.25)
         return_image = data.get('return_image', True)
+        model_param = data.get('model')
+        model = resolve_model_path(model_param) if model_param else None
+        if model_param and model is None:
+            return jsonify({'error': f'Model not found: {model_param}'}), 404
+        try:
+            sizing = parse_imgsz(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
         # Run detection
         service = get_detection_service()
-        annotated_frame, detections = service.detect_frame(frame, conf=conf, draw_boxes=True)
+        annotated_frame, detections = service.detect_frame(frame, conf=conf, draw_boxes=True, model=model, **sizing)
 
         result = {
             'success': True,
@@ -293,11 +479,324 @@ def detect_stream_frame():
         return jsonify({'error': str(e)}), 500
 
 
+def response_format() -> str:
+    """Pick json, msgpack or multipart from ?format= or the Accept header"""
+    fmt = request.args.get('format', type=str)
+    if fmt:
+        return fmt.lower()
+    best = request.accept_mimetypes.best_match(
+        ['application/json', MSGPACK_MIMETYPE, 'application/msgpack', 'multipart/mixed']
+    )
+    if best in (MSGPACK_MIMETYPE, 'application/msgpack'):
+        return 'msgpack'
+    if best == 'multipart/mixed':
+        return 'multipart'
+    return 'json'
+
+
+def binary_response(result: dict, jpeg: bytes, image_key: str):
+    """
+    Encode a detection result for the raw endpoints
+
+    Args:
+        result: JSON-serializable detection result
+        jpeg: Annotated JPEG bytes (None if not requested)
+        image_key: Key used for the image in JSON responses
+    """
+    fmt = response_format()
+    if fmt not in BINARY_FORMATS:
+        return jsonify({'error': f'Unknown format: {fmt}. Use one of {", ".join(BINARY_FORMATS)}'}), 400
+
+    if fmt == 'msgpack':
+        if not msgpack_available():
+            return jsonify({'error': 'msgpack is not installed (pip install msgpack)'}), 406
+        payload = {k: v for k, v in result.items() if k != 'detections'}
+        payload.update(pack_detections(result['detections']))
+        if jpeg is not None:
+            payload['image'] = jpeg
+        return Response(encode_msgpack(payload), mimetype=MSGPACK_MIMETYPE)
+
+    if fmt == 'multipart':
+        body, content_type = encode_multipart(result, jpeg)
+        return Response(body, content_type=content_type)
+
+    if jpeg is not None:
+        result[image_key] = get_detection_service().jpeg_to_base64(jpeg)
+    return jsonify(result), 200
+
+
+def read_raw_image():
+    """
+    Read a raw image request body
+
+    Returns:
+        Tuple of (content, image, error_response); error_response is None on success
+    """
+    content = request.get_data(cache=False)
+    if not content:
+        return None, None, (jsonify({'error': 'No image data provided'}), 400)
+    image = decode_image(content)
+    if image is None:
+        return None, None, (jsonify({'error': 'Could not decode image'}), 400)
+    return content, image, None
+
+
+@detection_bp.route('/image/raw', methods=['POST'])
+def detect_image_raw():
+    """
+    Detect objects in a raw image body (no base64)
+
+    Body: image bytes (Content-Type: image/jpeg, image/png, ...)
+
+    Query parameters:
+        - conf: Confidence threshold (optional)
+        - model: Model to use (optional)
+        - return_image: Include the annotated JPEG (default: false)
+        - format: json, msgpack or multipart (default: from Accept header, else json)
+        - tiled, tile_size, tile_overlap, tile_full_pass, tile_merge: Sliced inference (optional)
+        - imgsz, latency_budget_ms: Inference size in pixels or 'auto', and its latency budget (optional)
+
+    Returns:
+        Detection result as JSON, msgpack, or multipart/mixed (JSON part + JPEG part)
+    """
+    try:
+        content, image, error = read_raw_image()
+        if error:
+            return error
+
+        conf = request.args.get('conf', type=float)
+        return_image = request.args.get('return_image', default='false').lower() == 'true'
+        model_param = request.args.get('model')
+        model = resolve_model_path(model_param) if model_param else None
+        if model_param and model is None:
+            return jsonify({'error': f'Model not found: {model_param}'}), 404
+
+        try:
+            tiling = parse_tiling(request.args)
+            sizing = parse_imgsz(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        service = get_detection_service()
+        result = service.detect_array(
+            image, conf=conf, model=model, content=content, return_jpeg=return_image, tiling=tiling, **sizing
+        )
+
+        if 'error' in result:
+            return jsonify({'error': result['error']}), 500
+
+        jpeg = result.pop('annotated_jpeg', None)
+        return binary_response(result, jpeg, 'annotated_image')
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@detection_bp.route('/stream/frame/raw', methods=['POST'])
+def detect_stream_frame_raw():
+    """
+    Detect objects in a raw stream frame (no base64)
+
+    Body: frame bytes (Content-Type: image/jpeg)
+
+    Query parameters:
+        - conf: Confidence threshold (default: 0.25)
+        - model: Model to use (optional)
+        - return_image: Include the annotated JPEG (default: true)
+        - quality: JPEG quality of the annotated frame (default: 90)
+        - imgsz, latency_budget_ms: Inference size in pixels or 'auto', and its latency budget (optional)
+        - format: json, msgpack or multipart (default: from Accept header, else json)
+
+    Returns:
+        Detection result as JSON, msgpack, or multipart/mixed (JSON part + JPEG part)
+    """
+    try:
+        content, frame, error = read_raw_image()
+        if error:
+            return error
+
+        conf = request.args.get('conf', default=0.25, type=float)
+        return_image = request.args.get('return_image', default='true').lower() == 'true'
+        quality = request.args.get('quality', default=90, type=int)
+        model_param = request.args.get('model')
+        model = resolve_model_path(model_param) if model_param else None
+        if model_param and model is None:
+            return jsonify({'error': f'Model not found: {model_param}'}), 404
+        try:
+            sizing = parse_imgsz(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        service = get_detection_service()
+        annotated_frame, detections = service.detect_frame(
+            frame, conf=conf, draw_boxes=return_image, model=model, **sizing
+        )
+
+        result = {
+            'success': True,
+            'detections': detections,
+            'count': len(detections)
+        }
+
+        jpeg = None
+        if return_image:
+            _, buffer = cv2.imencode('.jpg', annotated_frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+            jpeg = buffer.tobytes()
+
+        return binary_response(result, jpeg, 'annotated_frame')
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def iter_batch_inputs(uploads):
+    """
+    Expand uploaded (filename, content) pairs and zip archives into (filename, content, error) items
+
+    Zip members are read lazily, one at a time, so the archive is never fully inflated in memory.
+    """
+    for name, data in uploads:
+        if name.lower().endswith('.zip'):
+            try:
+                archive = zipfile.ZipFile(io.BytesIO(data))
+            except zipfile.BadZipFile:
+                yield name, None, 'Invalid zip archive'
+                continue
+            with archive:
+                for info in archive.infolist():
+                    if info.is_dir():
+                        continue
+                    member = f"{name}/{info.filename}"
+                    if not allowed_file(info.filename):
+                        yield member, None, 'Invalid file type'
+                    elif info.file_size > Config.MAX_CONTENT_LENGTH:
+                        yield member, None, 'File too large'
+                    else:
+                        try:
+                            yield member, archive.read(info), None
+                        except Exception as e:
+                            yield member, None, f'Could not extract: {e}'
+        elif not allowed_file(name):
+            yield name, None, 'Invalid file type'
+        else:
+            yield name, data, None
+
+
+@detection_bp.route('/batch', methods=['POST'])
+def detect_batch():
+    """
+    Detect objects in many images in one request
+
+    Expected form data:
+        - files: One or more image files and/or zip archives of images
+        - conf: Confidence threshold (optional)
+        - model: Model to use (optional)
+        - tiled, tile_size, tile_overlap, tile_full_pass, tile_merge: Sliced inference (optional)
+        - imgsz, latency_budget_ms: Inference size in pixels or 'auto', and its latency budget (optional)
+
+    Returns:
+        NDJSON stream (application/x-ndjson): one line per image as soon as its
+        result is ready, in completion order, then a summary line with "done": true.
+        A bad file produces an "error" line and does not fail the batch.
+    """
+    files = request.files.getlist('files') or request.files.getlist('file')
+    if not files:
+        return jsonify({'error': 'No files provided'}), 400
+
+    conf = request.form.get('conf', type=float)
+    model_param = request.form.get('model')
+    model = resolve_model_path(model_param) if model_param else None
+    if model_param and model is None:
+        return jsonify({'error': f'Model not found: {model_param}'}), 404
+    try:
+        tiling = parse_tiling(request.form)
+        sizing = parse_imgsz(request.form)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Upload streams are closed once the view returns, so take the raw bytes now
+    uploads = [(file.filename or 'unnamed', file.read()) for file in files]
+
+    service = get_detection_service()
+    # Enough requests in flight to fill the micro-batches without holding the whole upload decoded
+    window = max(1, Config.BATCH_MAX_SIZE) * 2
+
+    def process(index: int, filename: str, content: bytes) -> dict:
+        try:
+            image = decode_image(content)
+            if image is None:
+                return {'index': index, 'filename': filename, 'error': 'Invalid or corrupted image file'}
+            result = service.detect_array(image, conf=conf, model=model, content=content, tiling=tiling, **sizing)
+            if 'error' in result:
+                return {'index': index, 'filename': filename, 'error': result['error']}
+            result.pop('image_info', None)
+            return {'index': index, 'filename': filename, 'width': image.shape[1], 'height': image.shape[0], **result}
+        except Exception as e:
+            return {'index': index, 'filename': filename, 'error': str(e)}
+
+    def generate():
+        start_time = time.time()
+        counts = {'succeeded': 0, 'failed': 0}
+        executor = ThreadPoolExecutor(max_workers=window, thread_name_prefix='batch-request')
+
+        def emit(line: dict) -> str:
+            counts['failed' if 'error' in line else 'succeeded'] += 1
+            return json.dumps(line) + '\n'
+
+        try:
+            pending = set()
+            for index, (filename, content, error) in enumerate(iter_batch_inputs(uploads)):
+                if error:
+                    yield emit({'index': index, 'filename': filename, 'error': error})
+                    continue
+                pending.add(executor.submit(process, index, filename, content))
+                if len(pending) >= window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield emit(future.result())
+
+            for future in as_completed(pending):
+                yield emit(future.result())
+
+            yield json.dumps({
+                'done': True,
+                'total': counts['succeeded'] + counts['failed'],
+                **counts,
+                'elapsed': round(time.time() - start_time, 3)
+            }) + '\n'
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+
+@detection_bp.route('/cache', methods=['GET', 'DELETE'])
+def result_cache():
+    """
+    Detection result cache statistics
+
+    GET returns hit/miss counters; DELETE clears the in-memory cache.
+    """
+    try:
+        service = get_detection_service()
+        if service.cache is None:
+            return jsonify({'enabled': False}), 200
+
+        if request.method == 'DELETE':
+            service.cache.clear()
+            return jsonify({'success': True, 'message': 'Result cache cleared'}), 200
+
+        return jsonify({'enabled': True, **service.cache.get_stats()}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @detection_bp.route('/image/uploads/<filename>', methods=['GET'])
 def get_uploaded_image(filename):
     """Serve uploaded image"""
     try:
         filepath = os.path.join(Config.UPLOAD_FOLDER, filename)
+        get_detection_service().writer.wait(filepath, timeout=30)
         if os.path.exists(filepath):
             return send_file(filepath, mimetype='image/jpeg')
         else:
@@ -308,9 +807,11 @@ def get_uploaded_image(filename):
 
 @detection_bp.route('/image/outputs/<filename>', methods=['GET'])
 def get_output_image(filename):
-    """Serve output/detected image"""
+    """Serve output/detected image, rendering it on first request"""
     try:
         filepath = os.path.join(Config.OUTPUT_FOLDER, filename)
+        if not os.path.exists(filepath):
+            get_detection_service().render_output(filepath)
         if os.path.exists(filepath):
             return send_file(filepath, mimetype='image/jpeg')
         else:
@@ -319,6 +820,25 @@ def get_output_image(filename):
         return jsonify({'error': str(e)}), 500
 
 
+@detection_bp.route('/video/outputs/<filename>', methods=['GET'])
+def get_output_video(filename):
+    """Serve an annotated video (.mp4) or its per-frame detections (.jsonl)"""
+    try:
+        filepath = os.path.join(Config.OUTPUT_FOLDER, secure_filename(filename))
+        if filepath.endswith('.mp4'):
+            mimetype = 'video/mp4'
+        elif filepath.endswith('.jsonl'):
+            mimetype = 'application/x-ndjson'
+        else:
+            return jsonify({'error': 'Unsupported file type'}), 400
+        if os.path.exists(filepath):
+            return send_file(filepath, mimetype=mimetype, conditional=True)
+        else:
+            return jsonify({'error': 'File not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 # Additional simplified endpoints for frontend compatibility
 @detection_bp.route('/stop', methods=['POST'])
 def stop_detection():
@@ -347,20 +867,20 @@ def start_webcam():
         data = request.get_json() or {}
         camera = data.get('camera', 0)
         conf = data.get('conf', 0.25)
+        model = data.get('model')
 
-        # Test camera availability
-        cap = cv2.VideoCapture(camera)
-        if not cap.isOpened():
+        # Test camera availability (a camera that is already streaming is not opened again)
+        if not get_stream_broker().camera_available(camera):
             return jsonify({
                 'success': False,
                 'error': f'Cannot open camera {camera}'
             }), 500
-        cap.release()
 
         return jsonify({
             'success': True,
             'message': 'Webcam initialized',
             'stream_url': f'/api/detection/video_feed?camera={camera}&conf={conf}'
+                          + (f'&model={quote(model)}' if model else '')
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -372,39 +892,18 @@ def video_feed():
     Video feed endpoint (alternative path for frontend compatibility)
     Redirects to stream/video with same parameters
     """
-    from flask import Response
-
     camera_index = request.args.get('camera', default=0, type=int)
     conf = request.args.get('conf', default=0.25, type=float)
+    model_param = request.args.get('model')
+    model = resolve_model_path(model_param) if model_param else None
+    if model_param and model is None:
+        return jsonify({'error': f'Model not found: {model_param}'}), 404
+    try:
+        targets = parse_stream_targets(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    def generate_frames():
-        """Generate frames with detection"""
-        cap = cv2.VideoCapture(camera_index)
-        service = get_detection_service()
-
-        try:
-            while True:
-                success, frame = cap.read()
-                if not success:
-                    break
-
-                # Run detection
-                annotated_frame, detections = service.detect_frame(frame, conf=conf, draw_boxes=True)
-
-                # Encode frame
-                ret, buffer = cv2.imencode('.jpg', annotated_frame)
-                frame_bytes = buffer.tobytes()
-
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-
-        finally:
-            cap.release()
-
-    return Response(
-        generate_frames(),
-        mimetype='multipart/x-mixed-replace; boundary=frame'
-    )
+    return mjpeg_response(camera_index, conf, model, **targets)
 
 
 @detection_bp.route('/upload', methods=['POST'])
@@ -426,49 +925,77 @@ def upload_file():
         filename = secure_filename(file.filename)
         ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
 
-        # Save file
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        new_filename = f"{timestamp}_{filename}"
+        new_filename = unique_filename(file.filename)
         filepath = os.path.join(Config.UPLOAD_FOLDER, new_filename)
-        file.save(filepath)
 
         # Determine file type
         image_exts = ['jpg', 'jpeg', 'png', 'bmp', 'webp']
-        video_exts = ['mp4', 'avi', 'mov', 'mkv', 'webm']
 
         if ext in image_exts:
             # Process image immediately
-            conf = request.form.get('conf', type=float, default=0.25)
+            conf = request.form.get('conf', type=float)
+            model_param = request.form.get('model')
+            model = resolve_model_path(model_param) if model_param else None
+            if model_param and model is None:
+                return jsonify({'error': f'Model not found: {model_param}'}), 404
+            try:
+                tiling = parse_tiling(request.form)
+                sizing = parse_imgsz(request.form)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+            # Decode once from memory; the original is persisted in the background
+            content = file.read()
+            image = decode_image(content)
+            if image is None:
+                return jsonify({'error': 'Invalid or corrupted image file'}), 400
+
             service = get_detection_service()
+            if Config.PERSIST_UPLOADS:
+                service.persist(content, filepath)
+
+            # The response embeds the annotated image, so render it now and
+            # reuse the same JPEG for the saved output
             output_path = os.path.join(Config.OUTPUT_FOLDER, f"detected_{new_filename}")
-            result = service.detect_image(filepath, conf=conf, save_result=True, output_path=output_path)
+            result = service.detect_array(
+                image, conf=conf, save_result=True, output_path=output_path, model=model,
+                defer_render=False, content=content, return_jpeg=True, tiling=tiling, **sizing
+            )
 
             if 'error' in result:
                 return jsonify({'error': result['error']}), 500
 
-            # Convert annotated image to base64
-            annotated_image = cv2.imread(output_path)
-            image_base64 = service.frame_to_base64(annotated_image)
-
             return jsonify({
                 'success': True,
                 'type': 'image',
                 'filename': new_filename,
                 'detections': result.get('detections', []),
                 'count': result.get('count', 0),
-                'image': image_base64
+                'image': service.jpeg_to_base64(result['annotated_jpeg'])
             }), 200
 
-        elif ext in video_exts:
-            # For video, return metadata and prepare for streaming
+        elif ext in Config.VIDEO_EXTENSIONS:
+            # Videos are decoded from disk, so they are saved synchronously
+            conf = request.form.get('conf', type=float)
+            model_param = request.form.get('model')
+            if model_param and resolve_model_path(model_param) is None:
+                return jsonify({'error': f'Model not found: {model_param}'}), 404
+
+            file.save(filepath)
+            params = {'video': filepath, 'conf': conf, 'model': model_param}
+            job = get_job_queue().submit('video', {k: v for k, v in params.items() if v is not None})
+            output_path, detections_path = video_output_paths(filepath)
             return jsonify({
                 'success': True,
                 'type': 'video',
                 'filename': new_filename,
-                'message': 'Video uploaded, use video_feed endpoint for streaming'
+                'job_id': job['job_id'],
+                'status_url': f"/api/jobs/{job['job_id']}",
+                'video_url': f'/api/detection/video/outputs/{os.path.basename(output_path)}',
+                'detections_url': f'/api/detection/video/outputs/{os.path.basename(detections_path)}',
+                'message': 'Video uploaded, processing in background'
             }), 200
         else:
-            os.remove(filepath)
             return jsonify({'error': 'Unsupported file type'}), 400
 
     except Exception as e:
@@ -482,9 +1009,13 @@ def get_processed_image():
     Returns the last processed image in base64 format
     """
     try:
-        # Get most recent file from outputs folder
+        service = get_detection_service()
+        pending_suffix = service.renders.SUFFIX
+
+        # Get most recent file from outputs folder (including images not rendered yet)
         output_files = [f for f in os.listdir(Config.OUTPUT_FOLDER)
-                       if f.endswith(('.jpg', '.jpeg', '.png'))]
+                       if f.endswith(('.jpg', '.jpeg', '.png'))
+                       or f.endswith(pending_suffix)]
 
         if not output_files:
             return jsonify({'error': 'No processed images found'}), 404
@@ -493,15 +1024,17 @@ def get_processed_image():
         output_files.sort(key=lambda x: os.path.getmtime(
             os.path.join(Config.OUTPUT_FOLDER, x)), reverse=True)
         latest_file = output_files[0]
+        if latest_file.endswith(pending_suffix):
+            latest_file = latest_file[:-len(pending_suffix)]
 
         # Read and convert to base64
         filepath = os.path.join(Config.OUTPUT_FOLDER, latest_file)
+        service.render_output(filepath)
         image = cv2.imread(filepath)
 
         if image is None:
             return jsonify({'error': 'Could not read image'}), 500
 
-        service = get_detection_service()
         image_base64 = service.frame_to_base64(image)
 
         return jsonify({
@@ -0,0 +1,123 @@
+"""
+Job API Routes
+Endpoints for submitting and tracking background jobs
+"""
+
+from flask import Blueprint, request, jsonify
+
+from app.services.job_queue import JOB_STATUSES, get_job_queue
+
+job_bp = Blueprint('jobs', __name__)
+
+
+@job_bp.route('', methods=['POST'])
+def submit_job():
+    """
+    Submit a background job
+
+    Expected JSON:
+        {
+            "type": "folder",
+            "params": {"folder": "uploads", "conf": 0.25, "model": "yolov8n.pt", "recursive": false}
+        }
+
+    Returns:
+        202 with the job and its status URL
+    """
+    try:
+        data = request.get_json() or {}
+        job_type = data.get('type')
+        if not job_type:
+            return jsonify({'error': 'No job type provided'}), 400
+        params = data.get('params') or {}
+        if not isinstance(params, dict):
+            return jsonify({'error': 'params must be an object'}), 400
+
+        try:
+            job = get_job_queue().submit(job_type, params)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({
+            'success': True,
+            'job': job,
+            'status_url': f"/api/jobs/{job['job_id']}"
+        }), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@job_bp.route('', methods=['GET'])
+def list_jobs():
+    """
+    List recent jobs
+
+    Query parameters:
+        - status: Filter by status (pending, running, completed, failed, cancelled)
+        - limit: Maximum number of jobs (default: 50)
+    """
+    try:
+        status = request.args.get('status')
+        if status and status not in JOB_STATUSES:
+            return jsonify({'error': f'Unknown status: {status}'}), 400
+        limit = request.args.get('limit', default=50, type=int)
+
+        queue = get_job_queue()
+        jobs = queue.list_jobs(status=status, limit=min(max(limit, 1), 500))
+        return jsonify({'jobs': jobs, 'count': len(jobs), 'stats': queue.get_stats()}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@job_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get job status, progress and final result"""
+    try:
+        job = get_job_queue().get(job_id)
+        if job is None:
+            return jsonify({'error': f'Job not found: {job_id}'}), 404
+        return jsonify(job), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@job_bp.route('/<job_id>/results', methods=['GET'])
+def get_job_results(job_id):
+    """
+    Get partial results of a job (available while it is running)
+
+    Query parameters:
+        - offset: Index of the first result (default: 0)
+        - limit: Maximum number of results (default: 100)
+    """
+    try:
+        queue = get_job_queue()
+        job = queue.get(job_id)
+        if job is None:
+            return jsonify({'error': f'Job not found: {job_id}'}), 404
+
+        offset = max(request.args.get('offset', default=0, type=int), 0)
+        limit = min(max(request.args.get('limit', default=100, type=int), 1), 1000)
+        results = queue.results(job_id, offset=offset, limit=limit)
+        return jsonify({
+            'job_id': job_id,
+            'status': job['status'],
+            'progress': job['progress'],
+            'offset': offset,
+            'results': results,
+            'total': job['num_results']
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@job_bp.route('/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a pending or running job"""
+    try:
+        job = get_job_queue().cancel(job_id)
+        if job is None:
+            return jsonify({'error': f'Job not found: {job_id}'}), 404
+        return jsonify({'success': True, 'job': job}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -8,6 +8,7 @@ import os
 from pathlib import Path
 
 from app.services.detect_service import get_detection_service
+from app.utils.validators import resolve_model_path
 from app.config import Config
 
 model_bp = Blueprint('model', __name__)
@@ -34,12 +35,20 @@ def get_classes():
     """
     Get list of detectable classes
 
+    Query parameters:
+        - model: Model to query (default: current model)
+
     Returns:
         JSON with list of class names
     """
     try:
+        model_param = request.args.get('model')
+        model = resolve_model_path(model_param) if model_param else None
+        if model_param and model is None:
+            return jsonify({'error': f'Model not found: {model_param}'}), 404
+
         service = get_detection_service()
-        classes = service.get_classes()
+        classes = service.get_classes(model)
         return jsonify({
             'classes': classes,
             'count': len(classes)
@@ -48,6 +57,21 @@ def get_classes():
         return jsonify({'error': str(e)}), 500
 
 
+@model_bp.route('/loaded', methods=['GET'])
+def get_loaded_models():
+    """
+    List models currently held in memory by the model registry
+
+    Returns:
+        JSON with loaded models, memory usage and cache statistics
+    """
+    try:
+        service = get_detection_service()
+        return jsonify(service.registry.get_stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @model_bp.route('/list', methods=['GET'])
 def list_available_models():
     """
@@ -61,8 +85,8 @@ def list_available_models():
         base_dir = Path(Config.BASE_DIR)
         models = []
 
-        # Search for .pt files in backend root
-        for pt_file in base_dir.glob('*.pt'):
+        # Search for .pt/.onnx files in backend root
+        for pt_file in sorted(base_dir.glob('*.pt')) + sorted(base_dir.glob('*.onnx')):
             models.append({
                 'name': pt_file.name,
                 'path': str(pt_file),
@@ -74,7 +98,7 @@ def list_available_models():
         runs_dir = base_dir / 'runs' / 'train'
         if runs_dir.exists():
             for weights_dir in runs_dir.glob('*/weights'):
-                for pt_file in weights_dir.glob('*.pt'):
+                for pt_file in sorted(weights_dir.glob('*.pt')) + sorted(weights_dir.glob('*.onnx')):
                     models.append({
                         'name': pt_file.name,
                         'path': str(pt_file),
@@ -97,6 +121,9 @@ def change_model():
     """
     Change the detection model
 
+    The new model is loaded and warmed in the background and only becomes the
+    default once it is ready; requests keep using the current model meanwhile.
+
     Expected JSON:
         {
             "model_path": "path/to/model.pt",
@@ -104,7 +131,7 @@ def change_model():
         }
 
     Returns:
-        JSON with success status
+        JSON with the model change job (poll status_url until status is ready/failed)
     """
     try:
         data = request.get_json()
@@ -118,19 +145,36 @@ def change_model():
         if not os.path.exists(model_path):
             return jsonify({'error': f'Model file not found: {model_path}'}), 404
 
-        # Try to change model
+        # Start background load + warmup
         service = get_detection_service()
-        success = service.change_model(model_path)
+        job = service.change_model_async(model_path)
+
+        return jsonify({
+            'success': True,
+            'message': 'Model change started',
+            'model_path': model_path,
+            'job': job,
+            'status_url': f"/api/model/change/{job['job_id']}"
+        }), 202
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        if success:
-            return jsonify({
-                'success': True,
-                'message': 'Model changed successfully',
-                'model_path': model_path
-            }), 200
-        else:
-            return jsonify({'error': 'Failed to load model'}), 500
 
+@model_bp.route('/change/<job_id>', methods=['GET'])
+def get_change_status(job_id):
+    """
+    Get the status of a model change job
+
+    Returns:
+        JSON with job status (pending, loading, warming, ready, failed)
+    """
+    try:
+        service = get_detection_service()
+        job = service.get_model_job(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,165 @@
+"""
+WebSocket Routes
+Full-duplex frame streaming for clients that push their own camera frames
+(requires the optional flask-sock package)
+"""
+
+import json
+import time
+
+import cv2
+from flask import request
+
+from app.config import Config
+from app.routes.detection_routes import parse_imgsz
+from app.services.detect_service import get_detection_service
+from app.utils.binary import encode_msgpack, msgpack_available, pack_detections
+from app.utils.motion import MotionGate
+from app.utils.tracker import BoxTracker
+from app.utils.validators import decode_image, resolve_model_path
+
+SOCKET_FORMATS = ('json', 'msgpack')
+
+
+def websocket_available() -> bool:
+    """Check whether the optional flask-sock dependency is installed"""
+    try:
+        import flask_sock  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def register_socket_routes(app, path: str = '/api/detection/stream/ws') -> bool:
+    """
+    Register the frame streaming WebSocket on an app
+
+    Args:
+        app: Flask application
+        path: URL of the WebSocket endpoint
+
+    Returns:
+        True if the endpoint was registered, False if flask-sock is missing
+    """
+    if not websocket_available():
+        print("flask-sock is not installed, WebSocket streaming disabled (pip install flask-sock)")
+        return False
+    from flask_sock import Sock
+
+    app.config.setdefault('SOCK_SERVER_OPTIONS', {'max_message_size': Config.MAX_CONTENT_LENGTH})
+    Sock(app).route(path)(stream_socket)
+    return True
+
+
+def socket_settings(args) -> dict:
+    """
+    Per-connection settings from the WebSocket URL query string
+
+    Raises:
+        ValueError: If a setting is invalid
+    """
+    fmt = args.get('format', default='json').lower()
+    if fmt not in SOCKET_FORMATS:
+        raise ValueError(f'Unknown format: {fmt}. Use one of {", ".join(SOCKET_FORMATS)}')
+    if fmt == 'msgpack' and not msgpack_available():
+        raise ValueError('msgpack is not installed (pip install msgpack)')
+
+    model_param = args.get('model')
+    model = resolve_model_path(model_param) if model_param else None
+    if model_param and model is None:
+        raise ValueError(f'Model not found: {model_param}')
+
+    return {
+        'conf': args.get('conf', default=0.25, type=float),
+        'model': model,
+        'return_image': args.get('return_image', default='false').lower() == 'true',
+        'quality': args.get('quality', default=Config.STREAM_JPEG_QUALITY, type=int),
+        'format': fmt,
+        'sizing': parse_imgsz(args)
+    }
+
+
+def stream_socket(ws):
+    """
+    Detect objects in frames pushed over a WebSocket
+
+    Connect to /api/detection/stream/ws and send each frame as one binary
+    message (JPEG/PNG bytes). Every processed frame is answered with one
+    message holding its detections.
+
+    Query parameters:
+        - conf: Confidence threshold (default: 0.25)
+        - model: Model to use (default: current model)
+        - return_image: Include the annotated JPEG (default: false)
+        - quality: JPEG quality of the annotated frame (default: STREAM_JPEG_QUALITY)
+        - imgsz, latency_budget_ms: Inference size in pixels or 'auto', and its latency budget (optional)
+        - format: json (text messages) or msgpack (binary messages, packed arrays as in /stream/frame/raw)
+
+    Frames that arrive while the previous one is still being processed are
+    dropped except for the newest, so a slow server answers fewer frames
+    instead of falling behind. Each reply carries the 1-based index of its
+    frame among those sent and the number of frames dropped so far.
+    """
+    try:
+        settings = socket_settings(request.args)
+    except ValueError as e:
+        ws.send(json.dumps({'error': str(e)}))
+        return
+
+    service = get_detection_service()
+    tracker = BoxTracker() if Config.TRACKER_ENABLED else None
+    gate = MotionGate() if Config.MOTION_GATE_ENABLED else None
+    received = dropped = 0
+
+    while True:
+        # Block for the next message, then drain the backlog keeping the newest frame
+        message = ws.receive()
+        content = None
+        while message is not None:
+            if isinstance(message, str):
+                ws.send(json.dumps({'error': 'Send frames as binary messages'}))
+            else:
+                received += 1
+                if content is not None:
+                    dropped += 1
+                content = message
+            message = ws.receive(timeout=0)
+        if content is None:
+            continue
+
+        frame = decode_image(content)
+        if frame is None:
+            ws.send(json.dumps({'frame': received, 'error': 'Could not decode frame'}))
+            continue
+
+        start = time.perf_counter()
+        annotated_frame, detections = service.detect_frame(
+            frame, conf=settings['conf'], draw_boxes=settings['return_image'], model=settings['model'],
+            tracker=tracker, gate=gate, **settings['sizing']
+        )
+        result = {
+            'success': True,
+            'frame': received,
+            'detections': detections,
+            'count': len(detections),
+            'dropped': dropped,
+            'inference_ms': round((time.perf_counter() - start) * 1000, 2)
+        }
+
+        jpeg = None
+        if settings['return_image']:
+            _, buffer = cv2.imencode(
+                '.jpg', annotated_frame, [int(cv2.IMWRITE_JPEG_QUALITY), settings['quality']]
+            )
+            jpeg = buffer.tobytes()
+
+        if settings['format'] == 'msgpack':
+            payload = {k: v for k, v in result.items() if k != 'detections'}
+            payload.update(pack_detections(detections))
+            if jpeg is not None:
+                payload['image'] = jpeg
+            ws.send(encode_msgpack(payload))
+        else:
+            if jpeg is not None:
+                result['annotated_frame'] = service.jpeg_to_base64(jpeg)
+            ws.send(json.dumps(result))
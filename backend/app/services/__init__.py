@@ -1,4 +1,5 @@
 """Services package"""
 from .detect_service import DetectionService, get_detection_service
+from .model_pool import ModelPool
 
-__all__ = ['DetectionService', 'get_detection_service']
+__all__ = ['DetectionService', 'get_detection_service', 'ModelPool']
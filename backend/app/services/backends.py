@@ -0,0 +1,305 @@
+"""
+Inference Backends
+Engines that turn a batch of BGR images into (xyxy, conf, cls) arrays
+"""
+
+import ast
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.utils.detections import batched_nms, boxes_to_arrays, empty_arrays
+
+Arrays = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+_thread_budget = threading.local()
+
+
+def set_torch_threads(num_threads: int):
+    """
+    Set the torch intra-op thread budget for inferences run on the calling thread
+
+    torch.set_num_threads() sets the OpenMP budget of the thread it is called
+    from, so replicas apply their own budget right before each forward pass
+    instead of once at load time, where the last loaded replica would win.
+    """
+    num_threads = max(1, int(num_threads))
+    if getattr(_thread_budget, 'value', None) == num_threads:
+        return
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+        _thread_budget.value = num_threads
+    except Exception as e:
+        print(f"Could not set torch threads: {e}")
+
+
+def letterbox(image: np.ndarray, new_shape: Tuple[int, int]) -> Tuple[np.ndarray, Tuple[float, float, float]]:
+    """
+    Resize keeping aspect ratio and pad to new_shape, YOLO style
+
+    Args:
+        image: BGR image [H, W, 3]
+        new_shape: Target (height, width)
+
+    Returns:
+        Tuple of (blob [3, H, W] float32 RGB in 0..1, (gain, pad_x, pad_y))
+    """
+    height, width = image.shape[:2]
+    new_h, new_w = new_shape
+    gain = min(new_h / height, new_w / width)
+    resized_h, resized_w = int(round(height * gain)), int(round(width * gain))
+
+    if (resized_h, resized_w) != (height, width):
+        image = cv2.resize(image, (resized_w, resized_h), interpolation=cv2.INTER_LINEAR)
+
+    pad_y = (new_h - resized_h) // 2
+    pad_x = (new_w - resized_w) // 2
+    canvas = np.full((new_h, new_w, 3), 114, dtype=np.uint8)
+    canvas[pad_y:pad_y + resized_h, pad_x:pad_x + resized_w] = image
+
+    blob = cv2.dnn.blobFromImage(canvas, scalefactor=1 / 255.0, swapRB=True)[0]
+    return blob, (gain, float(pad_x), float(pad_y))
+
+
+class InferenceBackend:
+    """Base class for inference engines"""
+
+    name = 'base'
+    names: Dict[int, str] = {}
+
+    def predict(self, images: List[np.ndarray], conf: float, imgsz: Optional[int] = None) -> List[Arrays]:
+        """
+        Run detection on a batch of images
+
+        Args:
+            images: List of BGR images
+            conf: Confidence threshold
+            imgsz: Inference size (uses the model default if None)
+
+        Returns:
+            One (xyxy, conf, cls) tuple per image, in original image coordinates
+        """
+        raise NotImplementedError
+
+    def input_size(self, imgsz: Optional[int] = None) -> Optional[int]:
+        """
+        Inference size the engine actually runs for a requested one
+
+        Args:
+            imgsz: Requested inference size (None for the model default)
+
+        Returns:
+            Size in pixels, or None for the model default
+        """
+        return imgsz
+
+    def memory_bytes(self) -> int:
+        """Estimated in-memory size of this engine"""
+        return 0
+
+
+class UltralyticsBackend(InferenceBackend):
+    """PyTorch inference through ultralytics.YOLO"""
+
+    name = 'ultralytics'
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        # Imported lazily: ultralytics pulls in torch and matplotlib
+        from ultralytics import YOLO
+
+        self.num_threads = num_threads
+        self.model_path = model_path
+        self.model = YOLO(model_path)
+        self.names = self.model.names
+
+    def predict(self, images: List[np.ndarray], conf: float, imgsz: Optional[int] = None) -> List[Arrays]:
+        kwargs = {'imgsz': imgsz} if imgsz else {}
+        if self.num_threads:
+            set_torch_threads(self.num_threads)
+        results = self.model(images, conf=conf, verbose=False, **kwargs)
+        return [boxes_to_arrays(result.boxes) for result in results]
+
+    def memory_bytes(self) -> int:
+        try:
+            return int(sum(p.numel() * p.element_size() for p in self.model.model.parameters()))
+        except Exception:
+            try:
+                return os.path.getsize(self.model_path)
+            except OSError:
+                return 0
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """ONNX Runtime CPU inference for YOLOv8 models exported with src/export_model.py"""
+
+    name = 'onnxruntime'
+
+    def __init__(
+        self,
+        model_path: str,
+        num_threads: Optional[int] = None,
+        iou: float = 0.7,
+        max_det: int = 300
+    ):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise RuntimeError('onnxruntime is not installed (pip install onnxruntime)')
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = int(num_threads)
+            options.inter_op_num_threads = 1
+
+        self.model_path = model_path
+        self.iou = iou
+        self.max_det = max_det
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, width = model_input.shape
+        self.dynamic_batch = not isinstance(batch, int)
+        self.dynamic_shape = not (isinstance(height, int) and isinstance(width, int))
+
+        # Ultralytics stores names/imgsz/stride as Python literals in the metadata
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        names = self._literal(metadata.get('names'))
+        imgsz = self._literal(metadata.get('imgsz'))
+        self.stride = int(self._literal(metadata.get('stride')) or 32)
+
+        if self.dynamic_shape:
+            imgsz = imgsz or [640, 640]
+            self.imgsz = (int(imgsz[0]), int(imgsz[1]))
+        else:
+            self.imgsz = (int(height), int(width))
+
+        if not names:
+            num_classes = self.session.get_outputs()[0].shape[1] - 4
+            names = {i: str(i) for i in range(num_classes if isinstance(num_classes, int) else 0)}
+        self.names = {int(k): v for k, v in dict(names).items()}
+
+    @staticmethod
+    def _literal(value):
+        if value is None:
+            return None
+        try:
+            return ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return None
+
+    def _input_shape(self, imgsz: Optional[int]) -> Tuple[int, int]:
+        """Input (height, width); only dynamic-shape exports honour imgsz"""
+        if imgsz and self.dynamic_shape:
+            size = int(np.ceil(imgsz / self.stride) * self.stride)
+            return size, size
+        return self.imgsz
+
+    def input_size(self, imgsz: Optional[int] = None) -> Optional[int]:
+        """Static-shape exports always run at their export size"""
+        return max(self._input_shape(imgsz))
+
+    def predict(self, images: List[np.ndarray], conf: float, imgsz: Optional[int] = None) -> List[Arrays]:
+        shape = self._input_shape(imgsz)
+        prepared = [letterbox(image, shape) for image in images]
+        blobs = [blob for blob, _ in prepared]
+
+        if self.dynamic_batch:
+            outputs = self.session.run(None, {self.input_name: np.stack(blobs)})[0]
+        else:
+            outputs = np.concatenate([
+                self.session.run(None, {self.input_name: blob[None]})[0] for blob in blobs
+            ])
+
+        return [
+            self._postprocess(output, scale, image.shape[:2], conf)
+            for output, (_, scale), image in zip(outputs, prepared, images)
+        ]
+
+    def _postprocess(
+        self,
+        output: np.ndarray,
+        scale: Tuple[float, float, float],
+        image_shape: Tuple[int, int],
+        conf: float
+    ) -> Arrays:
+        """Decode one [4 + num_classes, N] YOLOv8 output into image-space detections"""
+        predictions = output.T
+        class_scores = predictions[:, 4:]
+        scores = class_scores.max(axis=1)
+        candidates = scores >= conf
+        if not candidates.any():
+            return empty_arrays()
+
+        predictions = predictions[candidates]
+        scores = scores[candidates]
+        cls = class_scores[candidates].argmax(axis=1)
+
+        cx, cy, w, h = predictions[:, 0], predictions[:, 1], predictions[:, 2], predictions[:, 3]
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+        keep = batched_nms(boxes, scores, cls, self.iou)[:self.max_det]
+        boxes, scores, cls = boxes[keep], scores[keep], cls[keep]
+
+        gain, pad_x, pad_y = scale
+        boxes[:, [0, 2]] -= pad_x
+        boxes[:, [1, 3]] -= pad_y
+        boxes /= gain
+        height, width = image_shape
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+
+        return boxes.astype(np.float32), scores.astype(np.float32), cls.astype(np.int64)
+
+    def memory_bytes(self) -> int:
+        try:
+            return os.path.getsize(self.model_path)
+        except OSError:
+            return 0
+
+
+def onnxruntime_available() -> bool:
+    """Check whether the optional onnxruntime dependency is installed"""
+    try:
+        import onnxruntime  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_backend(model_path: str, backend: str = 'auto', num_threads: Optional[int] = None) -> InferenceBackend:
+    """
+    Create an inference backend for a model
+
+    Args:
+        model_path: Path to .pt or .onnx weights
+        backend: 'auto', 'ultralytics' or 'onnxruntime'. 'auto' uses ONNX Runtime
+            for .onnx files when it is installed. 'onnxruntime' also serves a .pt
+            model through its exported .onnx sibling when one exists.
+        num_threads: Intra-op thread budget for this engine
+
+    Returns:
+        InferenceBackend instance
+    """
+    backend = (backend or 'auto').lower()
+    root, ext = os.path.splitext(model_path)
+    is_onnx = ext.lower() == '.onnx'
+
+    if backend == 'onnxruntime':
+        if is_onnx:
+            return OnnxRuntimeBackend(model_path, num_threads=num_threads)
+        if os.path.exists(root + '.onnx'):
+            return OnnxRuntimeBackend(root + '.onnx', num_threads=num_threads)
+        print(f"No ONNX export found for {model_path}, using ultralytics backend")
+    elif backend == 'auto' and is_onnx and onnxruntime_available():
+        return OnnxRuntimeBackend(model_path, num_threads=num_threads)
+    elif backend not in ('auto', 'ultralytics'):
+        raise ValueError(f'Unknown inference backend: {backend}')
+
+    return UltralyticsBackend(model_path, num_threads=num_threads)
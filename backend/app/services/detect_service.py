@@ -5,50 +5,486 @@ Handles YOLO model loading and inference
 
 import cv2
 import numpy as np
-from ultralytics import YOLO
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Callable, Any, Iterator
 import base64
 from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+import os
+import queue
+import threading
 import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from app.config import Config
+from app.services.backends import create_backend
+from app.services.file_writer import AsyncFileWriter
+from app.services.model_pool import ModelPool, default_pool_size
+from app.services.model_registry import ModelRegistry
+from app.services.render_store import DeferredRenderStore
+from app.services.result_cache import ResultCache
+from app.utils.detections import build_detections, filter_arrays
+from app.utils.renderer import frame_renderer, image_renderer
+from app.utils.resolution import Imgsz, choose_imgsz
+from app.utils.tiling import merge_tile_detections, tile_grid
+from app.utils.motion import MotionGate
+from app.utils.tracker import BoxTracker
+
+
+class BatchScheduler:
+    """
+    Dynamic micro-batching scheduler
+
+    Collects inference requests that arrive within a short window and runs
+    them as a single batched forward pass, then scatters the per-image
+    results back to the waiting callers. With several workers, a new batch
+    is only collected once a worker is free, so batches grow while all
+    workers are busy.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[..., List[Any]],
+        window_ms: float = 10.0,
+        max_batch_size: int = 8,
+        num_workers: int = 1
+    ):
+        """
+        Initialize batch scheduler
+
+        Args:
+            predict_fn: Callable taking (images, **kwargs) and returning one result per image
+            window_ms: Maximum time to wait for more requests after the first one arrives
+            max_batch_size: Maximum number of images per forward pass
+            num_workers: Number of batches that may run concurrently
+        """
+        self.predict_fn = predict_fn
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.num_workers = max(int(num_workers), 1)
+        self.stats = {'batches': 0, 'images': 0, 'max_batch_seen': 0}
+
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._slots = threading.Semaphore(self.num_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix='batch-worker')
+        self._worker = threading.Thread(target=self._run, name='batch-scheduler', daemon=True)
+        self._worker.start()
+
+    def submit(self, image: np.ndarray, **kwargs) -> Future:
+        """
+        Queue an image for batched inference
+
+        Args:
+            image: Input image (numpy array)
+            **kwargs: Inference parameters; only requests with equal parameters share a batch
+
+        Returns:
+            Future resolving to the result for this image
+        """
+        future = Future()
+        if self._stopped.is_set():
+            future.set_exception(RuntimeError('Batch scheduler is stopped'))
+            return future
+        self._queue.put((image, kwargs, future))
+        return future
+
+    def stop(self):
+        """Stop the worker thread after the queued requests are served"""
+        self._stopped.set()
+        self._queue.put(None)
+        self._worker.join(timeout=5)
+        self._executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict:
+        """Get batching statistics"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        batches = stats['batches']
+        return {
+            'window_ms': round(self.window * 1000, 2),
+            'max_batch_size': self.max_batch_size,
+            'num_workers': self.num_workers,
+            'batches': batches,
+            'images': stats['images'],
+            'max_batch_seen': stats['max_batch_seen'],
+            'avg_batch_size': round(stats['images'] / batches, 2) if batches else 0.0
+        }
+
+    def _collect(self) -> Optional[List[Tuple]]:
+        """Block for the first request, then gather more until the window closes"""
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        """Worker loop"""
+        while True:
+            self._slots.acquire()
+            batch = self._collect()
+            if batch is None:
+                self._slots.release()
+                break
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: List[Tuple]):
+        """Run one forward pass per group of compatible requests, then free the worker slot"""
+        try:
+            self._dispatch_groups(batch)
+        finally:
+            self._slots.release()
+
+    def _dispatch_groups(self, batch: List[Tuple]):
+        """Run one forward pass per group of compatible requests"""
+        groups = {}
+        for item in batch:
+            key = tuple(sorted(item[1].items()))
+            groups.setdefault(key, []).append(item)
+
+        for key, items in groups.items():
+            images = [image for image, _, _ in items]
+            try:
+                results = self.predict_fn(images, **dict(key))
+            except Exception as e:
+                for _, _, future in items:
+                    future.set_exception(e)
+                continue
+
+            with self._stats_lock:
+                self.stats['batches'] += 1
+                self.stats['images'] += len(items)
+                self.stats['max_batch_seen'] = max(self.stats['max_batch_seen'], len(items))
+            for (_, _, future), result in zip(items, results):
+                future.set_result(result)
 
 
 class DetectionService:
     """Service for handling object detection operations"""
 
-    def __init__(self, model_path: str = 'yolov8n.pt', conf_threshold: float = 0.25):
+    def __init__(
+        self,
+        model_path: str = 'yolov8n.pt',
+        conf_threshold: float = 0.25,
+        batching: Optional[bool] = None,
+        batch_window_ms: Optional[float] = None,
+        max_batch_size: Optional[int] = None,
+        num_replicas: Optional[int] = None,
+        threads_per_replica: Optional[int] = None,
+        backend: Optional[str] = None
+    ):
         """
         Initialize detection service
 
         Args:
             model_path: Path to YOLO model
             conf_threshold: Confidence threshold for detections
+            batching: Whether to micro-batch concurrent requests (uses Config if None)
+            batch_window_ms: Batch collection window in milliseconds (uses Config if None)
+            max_batch_size: Maximum images per batched forward pass (uses Config if None)
+            num_replicas: Number of model replicas in the pool (uses Config if None, 0 = auto)
+            threads_per_replica: Intra-op threads per replica (uses Config if None, 0 = auto)
+            backend: Inference backend: auto, ultralytics or onnxruntime (uses Config if None)
         """
         self.model_path = model_path
         self.conf_threshold = conf_threshold
-        self.model = None
+        self.num_replicas = num_replicas if num_replicas is not None else Config.MODEL_REPLICAS
+        self.threads_per_replica = (
+            threads_per_replica if threads_per_replica is not None else Config.TORCH_THREADS_PER_REPLICA
+        )
+        self.backend = backend or Config.INFERENCE_BACKEND
+        self.registry = ModelRegistry(self._load_pool, budget_mb=Config.MODEL_CACHE_MB)
+        self.warm_latency: Dict[str, Dict[int, float]] = {}
+        self.cache = None
+        if Config.RESULT_CACHE_ENABLED:
+            self.cache = ResultCache(
+                max_bytes=int(Config.RESULT_CACHE_MB * 1024 * 1024),
+                disk_dir=Config.RESULT_CACHE_DIR or None,
+                disk_max_bytes=int(Config.RESULT_CACHE_DISK_MB * 1024 * 1024)
+            )
+        self.writer = AsyncFileWriter()
+        self.renders = DeferredRenderStore(image_renderer, writer=self.writer)
+        self._swap_lock = threading.Lock()
+        self._model_jobs: 'OrderedDict[str, Dict]' = OrderedDict()
+        # Background jobs may only occupy this many replicas at once
+        self._background_slots = threading.BoundedSemaphore(max(1, Config.JOB_MAX_REPLICAS))
+        self._jobs_lock = threading.Lock()
         self.load_model()
 
+        if batching is None:
+            batching = Config.BATCH_ENABLED
+
+        self.scheduler = None
+        if batching:
+            self.scheduler = BatchScheduler(
+                self._forward,
+                window_ms=batch_window_ms if batch_window_ms is not None else Config.BATCH_WINDOW_MS,
+                max_batch_size=max_batch_size if max_batch_size is not None else Config.BATCH_MAX_SIZE,
+                num_workers=self.num_replicas or default_pool_size()
+            )
+
+    @property
+    def pool(self) -> Optional[ModelPool]:
+        """Replica pool of the default model (None if not loaded)"""
+        return self.registry.peek(self.model_path)
+
+    @property
+    def names(self) -> Dict[int, str]:
+        """Class id to name mapping of the default model"""
+        pool = self.pool
+        return pool.names if pool is not None else {}
+
+    def _load_pool(self, model_path: str) -> ModelPool:
+        """Load replicas for one model (used by the registry on a miss)"""
+        print(f"Loading model: {model_path}")
+        pool = ModelPool(
+            model_path,
+            size=self.num_replicas or None,
+            threads_per_replica=self.threads_per_replica or None,
+            loader=lambda path, threads: create_backend(path, self.backend, threads)
+        )
+        print(f"Model loaded successfully: {model_path} ({pool.size} {pool.backend} replicas)")
+        return pool
+
     def load_model(self) -> bool:
-        """Load YOLO model"""
+        """Load the default YOLO model and pin it in the registry"""
         try:
-            print(f"Loading model: {self.model_path}")
-            self.model = YOLO(self.model_path)
-            print(f"Model loaded successfully: {self.model_path}")
+            self.registry.get(self.model_path)
+            self.registry.pin(self.model_path)
             return True
         except Exception as e:
             print(f"Error loading model: {e}")
             return False
 
+    def _model_key(self, model: Optional[str]) -> str:
+        """Map a requested model path to its registry key (the default model keeps its own key)"""
+        if not model or os.path.abspath(model) == os.path.abspath(self.model_path):
+            return self.model_path
+        return model
+
+    def _model_identity(self, model: str) -> str:
+        """Identity of a model's weights for cache keys (changes when the file is replaced)"""
+        pool = self.registry.peek(model)
+        backend = pool.backend if pool is not None else self.backend
+        try:
+            stat = os.stat(model)
+            return f'{os.path.abspath(model)}:{stat.st_size}:{stat.st_mtime_ns}:{backend}'
+        except OSError:
+            return f'{model}:{backend}'
+
+    def get_pool(self, model: Optional[str] = None) -> ModelPool:
+        """
+        Get the replica pool for a model, loading it into the registry if needed
+
+        Args:
+            model: Model path (uses the default model if None)
+
+        Returns:
+            Loaded ModelPool
+        """
+        return self.registry.get(self._model_key(model))
+
+    def warmup(self, model: Optional[str] = None, sizes: Optional[List[int]] = None) -> Dict[int, float]:
+        """
+        Warm up every replica of a model and record its warm latency per input size
+
+        Args:
+            model: Model path (uses the default model if None)
+            sizes: Input sizes to warm up (uses Config.WARMUP_SIZES and Config.IMGSZ_CHOICES if None)
+
+        Returns:
+            Mapping of input size to warm forward latency in milliseconds
+        """
+        model = self._model_key(model)
+        # imgsz=auto picks from IMGSZ_CHOICES, so each choice needs a measured latency
+        sizes = sizes or sorted(set(Config.WARMUP_SIZES) | set(Config.IMGSZ_CHOICES))
+        latencies = self.get_pool(model).warmup(sizes)
+        self.warm_latency[model] = latencies
+        return latencies
+
+    @contextmanager
+    def checkout(self, model: Optional[str] = None, timeout: Optional[float] = None) -> Iterator[object]:
+        """
+        Check out a model replica for exclusive use
+
+        Args:
+            model: Model path (uses the default model if None)
+            timeout: Maximum seconds to wait for a free replica
+
+        Yields:
+            YOLO model replica, returned to its pool on exit
+        """
+        with self.get_pool(model).replica(timeout=timeout) as replica:
+            yield replica
+
+    def _forward(
+        self,
+        images: List[np.ndarray],
+        conf: float,
+        model: Optional[str] = None,
+        imgsz: Optional[int] = None,
+        background: bool = False
+    ) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Run one forward pass over a list of images and return (xyxy, conf, cls) arrays per image
+
+        Background forwards run on the calling (job) thread and wait for one
+        of the JOB_MAX_REPLICAS background slots, so the rest of the pool
+        stays free for interactive requests.
+        """
+        if background:
+            with self._background_slots:
+                with self.checkout(model) as replica:
+                    return replica.predict(images, conf=conf, imgsz=imgsz)
+        with self.checkout(model) as replica:
+            return replica.predict(images, conf=conf, imgsz=imgsz)
+
+    def _predict(
+        self,
+        image: np.ndarray,
+        conf: float,
+        model: Optional[str] = None,
+        imgsz: Optional[int] = None,
+        background: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Run inference for a single image, batched with concurrent callers of the same size when enabled
+
+        Background work bypasses the batch scheduler so it never shares a batch
+        (or a scheduler thread) with interactive requests.
+        """
+        model = self._model_key(model)
+        if background:
+            return self._forward([image], conf=conf, model=model, imgsz=imgsz, background=True)[0]
+        if self.scheduler is not None:
+            return self.scheduler.submit(image, conf=conf, model=model, imgsz=imgsz).result()
+        return self._forward([image], conf=conf, model=model, imgsz=imgsz)[0]
+
+    def resolve_imgsz(
+        self,
+        imgsz: Imgsz,
+        image_shape: Tuple[int, ...],
+        model: Optional[str] = None,
+        latency_budget_ms: Optional[float] = None
+    ) -> Optional[int]:
+        """
+        Turn a requested inference size into a concrete one
+
+        Args:
+            imgsz: None (model default), a size in pixels, or 'auto'
+            image_shape: Shape of the image to run
+            model: Model path (uses the default model if None)
+            latency_budget_ms: Forward latency budget for 'auto'
+
+        Returns:
+            Inference size the model actually runs (static-shape exports keep
+            their export size), or None for the model default
+        """
+        pool = self.get_pool(model)
+        if imgsz == 'auto':
+            latencies = self.warm_latency.get(self._model_key(model), {})
+            imgsz = choose_imgsz(image_shape, latencies, budget_ms=latency_budget_ms, native=pool.input_size(None))
+        return pool.input_size(imgsz)
+
+    def _predict_tiled(
+        self,
+        image: np.ndarray,
+        conf: float,
+        model: str,
+        options: Dict,
+        imgsz: Optional[int] = None,
+        background: bool = False,
+        full_imgsz: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sliced inference: run overlapping tiles (plus the whole image if enabled) and merge across tiles
+
+        Tiles go through the model in batches of up to BATCH_MAX_SIZE, which
+        bounds memory for very large images. The full-image pass runs at
+        full_imgsz, since a size chosen for a tile is usually too small for
+        the whole image. Only detections at or above conf are merged, so the
+        fused boxes match a run at that threshold.
+        """
+        height, width = image.shape[:2]
+        tiles = tile_grid(height, width, options['size'], options['overlap'])
+        crops = [np.ascontiguousarray(image[y1:y2, x1:x2]) for x1, y1, x2, y2 in tiles.tolist()]
+        offsets = np.tile(tiles[:, :2], 2).astype(np.float32)
+
+        chunk = max(1, Config.BATCH_MAX_SIZE)
+        results = []
+        for start in range(0, len(crops), chunk):
+            results.extend(self._forward(
+                crops[start:start + chunk], conf=conf, model=model, imgsz=imgsz, background=background
+            ))
+        if options['full_pass'] and len(tiles) > 1:
+            results.extend(self._forward(
+                [image], conf=conf, model=model, imgsz=full_imgsz or imgsz, background=background
+            ))
+            offsets = np.concatenate([offsets, np.zeros((1, 4), dtype=np.float32)])
+
+        xyxy = np.concatenate([r[0] + offset for r, offset in zip(results, offsets)])
+        confs = np.concatenate([r[1] for r in results])
+        cls_ids = np.concatenate([r[2] for r in results])
+        return merge_tile_detections(xyxy, confs, cls_ids, options['iou'], options['merge'])
+
+    def predict_batch(
+        self,
+        images: List[np.ndarray],
+        conf: Optional[float] = None,
+        model: Optional[str] = None,
+        imgsz: Optional[int] = None,
+        background: bool = False
+    ) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Run one batched forward pass over images that are already grouped (e.g. video frames)
+
+        Args:
+            images: List of BGR images
+            conf: Confidence threshold (uses default if None)
+            model: Model path to use (uses the default model if None)
+            imgsz: Inference size (uses the model default if None)
+            background: Offline job work; limited to JOB_MAX_REPLICAS replicas
+
+        Returns:
+            One (xyxy, conf, cls) tuple per image
+        """
+        conf_threshold = conf if conf is not None else self.conf_threshold
+        return self._forward(
+            images, conf=conf_threshold, model=self._model_key(model), imgsz=imgsz, background=background
+        )
+
     def get_model_info(self) -> Dict:
         """Get model information"""
-        if self.model is None:
+        pool = self.pool
+        if pool is None:
             return {'error': 'Model not loaded'}
 
         return {
             'model_path': self.model_path,
             'conf_threshold': self.conf_threshold,
-            'classes': self.model.names,
-            'num_classes': len(self.model.names)
+            'classes': pool.names,
+            'num_classes': len(pool.names),
+            'batching': self.scheduler.get_stats() if self.scheduler is not None else None,
+            'pool': pool.get_stats(),
+            'registry': self.registry.get_stats(),
+            'warm_latency_ms': self.warm_latency.get(self.model_path),
+            'result_cache': self.cache.get_stats() if self.cache is not None else None
         }
 
     def detect_image(
@@ -56,7 +492,13 @@ class DetectionService:
         image_path: str,
         conf: Optional[float] = None,
         save_result: bool = True,
-        output_path: Optional[str] = None
+        output_path: Optional[str] = None,
+        model: Optional[str] = None,
+        defer_render: Optional[bool] = None,
+        tiling: Optional[Dict] = None,
+        imgsz: Imgsz = None,
+        latency_budget_ms: Optional[float] = None,
+        background: bool = False
     ) -> Dict:
         """
         Detect objects in an image
@@ -66,76 +508,166 @@ class DetectionService:
             conf: Confidence threshold (uses default if None)
             save_result: Whether to save annotated image
             output_path: Path to save output image
+            model: Model path to use (uses the default model if None)
+            defer_render: Only record detections and render the output image on
+                first request via render_output() (uses Config if None)
+            tiling: Run sliced inference with these settings (see tiling_options()); None = whole image
+            imgsz: Inference size in pixels, 'auto' to pick one per image, or None for the model default
+            latency_budget_ms: Forward latency budget used by imgsz='auto'
+            background: Offline job work: runs on the calling thread within
+                JOB_MAX_REPLICAS replicas and bypasses the batcher and result cache
 
         Returns:
             Dictionary containing detection results
         """
-        if self.model is None:
+        # Read image bytes once; they are both the cache key and the decode source
+        try:
+            with open(image_path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            return {'error': 'Could not read image'}
+
+        return self._detect(
+            content, None, conf, save_result, output_path, model, defer_render, source_path=image_path,
+            tiling=tiling, imgsz=imgsz, latency_budget_ms=latency_budget_ms, background=background
+        )
+
+    def detect_array(
+        self,
+        image: np.ndarray,
+        conf: Optional[float] = None,
+        save_result: bool = False,
+        output_path: Optional[str] = None,
+        model: Optional[str] = None,
+        defer_render: Optional[bool] = None,
+        content: Optional[bytes] = None,
+        source_path: Optional[str] = None,
+        return_jpeg: bool = False,
+        tiling: Optional[Dict] = None,
+        imgsz: Imgsz = None,
+        latency_budget_ms: Optional[float] = None
+    ) -> Dict:
+        """
+        Detect objects in an already decoded image, without touching the disk
+
+        Args:
+            image: BGR image (not modified)
+            conf: Confidence threshold (uses default if None)
+            save_result: Whether to save annotated image
+            output_path: Path to save output image
+            model: Model path to use (uses the default model if None)
+            defer_render: Defer rendering of output_path (only possible with source_path)
+            content: Encoded bytes the image was decoded from (cache key; pixels are hashed if None)
+            source_path: Where the original is, or is being, persisted (see persist())
+            return_jpeg: Include the annotated image as JPEG bytes under 'annotated_jpeg'
+            tiling: Run sliced inference with these settings (see tiling_options()); None = whole image
+            imgsz: Inference size in pixels, 'auto' to pick one per image, or None for the model default
+            latency_budget_ms: Forward latency budget used by imgsz='auto'
+
+        Returns:
+            Dictionary containing detection results
+        """
+        if content is None:
+            content = str(image.shape).encode('utf-8') + np.ascontiguousarray(image).tobytes()
+        return self._detect(
+            content, image, conf, save_result, output_path, model, defer_render,
+            source_path=source_path, return_jpeg=return_jpeg, tiling=tiling,
+            imgsz=imgsz, latency_budget_ms=latency_budget_ms
+        )
+
+    def persist(self, content: bytes, path: str) -> Future:
+        """
+        Write an original upload to disk in the background
+
+        Args:
+            content: Encoded image bytes, written as received (no re-encode)
+            path: Destination path
+
+        Returns:
+            Future resolving once the file is written
+        """
+        return self.writer.write(path, content)
+
+    def _detect(
+        self,
+        content: bytes,
+        image: Optional[np.ndarray],
+        conf: Optional[float],
+        save_result: bool,
+        output_path: Optional[str],
+        model: Optional[str],
+        defer_render: Optional[bool],
+        source_path: Optional[str] = None,
+        return_jpeg: bool = False,
+        tiling: Optional[Dict] = None,
+        imgsz: Imgsz = None,
+        latency_budget_ms: Optional[float] = None,
+        background: bool = False
+    ) -> Dict:
+        """Shared detection path; decodes content only when image is None and inference or drawing needs it"""
+        if model is None and self.pool is None:
             return {'error': 'Model not loaded'}
 
+        # Resolve once so a concurrent model swap cannot mix two models in one request
+        model = self._model_key(model)
+        owns_image = image is None
+
         try:
-            # Read image
-            image = cv2.imread(image_path)
-            if image is None:
-                return {'error': 'Could not read image'}
+            names = self.get_pool(model).names
 
-            # Run detection
+            # Run detection. With the cache enabled, inference runs once at a
+            # floor threshold and any higher conf is answered by filtering the
+            # stored candidates, so moving the threshold needs no new forward.
             conf_threshold = conf if conf is not None else self.conf_threshold
+            # Offline results are not worth evicting interactive entries for
+            cache = self.cache if not background else None
+            # Tiled results are merged across tiles, which depends on the threshold,
+            # so they run (and are cached) at the request's own conf
+            if cache is not None and tiling is None:
+                inference_conf = min(Config.CONF_FLOOR, conf_threshold)
+            else:
+                inference_conf = conf_threshold
+
+            def decode() -> np.ndarray:
+                nonlocal image
+                if image is None:
+                    image = cv2.imdecode(np.frombuffer(content, np.uint8), cv2.IMREAD_COLOR)
+                    if image is None:
+                        raise ValueError('Could not read image')
+                return image
+
+            def run_inference() -> Dict[str, np.ndarray]:
+                frame = decode()
+                if tiling is not None:
+                    tile_shape = (min(tiling['size'], frame.shape[0]), min(tiling['size'], frame.shape[1]))
+                    size = self.resolve_imgsz(imgsz, tile_shape, model, latency_budget_ms)
+                    xyxy, confs, cls_ids = self._predict_tiled(
+                        frame, inference_conf, model, tiling, imgsz=size, background=background,
+                        full_imgsz=self.resolve_imgsz(imgsz, frame.shape, model, latency_budget_ms)
+                    )
+                else:
+                    size = self.resolve_imgsz(imgsz, frame.shape, model, latency_budget_ms)
+                    xyxy, confs, cls_ids = self._predict(frame, inference_conf, model, imgsz=size, background=background)
+                return {
+                    'xyxy': xyxy, 'conf': confs, 'cls': cls_ids, 'shape': np.asarray(frame.shape[:2]),
+                    'imgsz': np.asarray(size or 0)
+                }
+
             start_time = time.time()
-            results = self.model(image, conf=conf_threshold, verbose=False)
-            inference_time = time.time() - start_time
+            if cache is not None:
+                key = cache.make_key(content, self._model_identity(model), {
+                    'conf_floor': inference_conf, 'tiling': tiling, 'imgsz': imgsz, 'latency_budget_ms': latency_budget_ms
+                })
+                result, cached = cache.get_or_compute(key, run_inference)
+            else:
+                result, cached = run_inference(), False
 
             # Process results
-            detections = []
-            annotated_image = image.copy()
-
-            for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        cls_id = int(box.cls[0])
-                        cls_name = self.model.names[cls_id]
-                        confidence = float(box.conf[0])
-                        x1, y1, x2, y2 = map(int, box.xyxy[0])
-
-                        # Add to detections list
-                        detections.append({
-                            'class_id': cls_id,
-                            'class_name': cls_name,
-                            'confidence': round(confidence, 3),
-                            'bbox': {
-                                'x1': x1,
-                                'y1': y1,
-                                'x2': x2,
-                                'y2': y2,
-                                'width': x2 - x1,
-                                'height': y2 - y1
-                            }
-                        })
-
-                        # Draw on image
-                        color = (0, 255, 0)
-                        cv2.rectangle(annotated_image, (x1, y1), (x2, y2), color, 2)
-
-                        # Draw label
-                        label = f"{cls_name}: {confidence:.2f}"
-                        label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
-                        cv2.rectangle(
-                            annotated_image,
-                            (x1, y1 - label_size[1] - 10),
-                            (x1 + label_size[0], y1),
-                            color,
-                            -1
-                        )
-                        cv2.putText(
-                            annotated_image,
-                            label,
-                            (x1, y1 - 5),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.6,
-                            (0, 0, 0),
-                            2
-                        )
+            xyxy, confs, cls_ids = result['xyxy'], result['conf'], result['cls']
+            if inference_conf < conf_threshold:
+                xyxy, confs, cls_ids = filter_arrays(xyxy, confs, cls_ids, confs >= conf_threshold)
+            inference_time = time.time() - start_time
+            detections = build_detections(xyxy, confs, cls_ids, names, include_size=True)
 
             # Save annotated image
             output_image_path = None
@@ -143,14 +675,32 @@ class DetectionService:
                 if output_path is None:
                     timestamp = int(time.time())
                     output_path = f"outputs/detected_{timestamp}.jpg"
-
                 output_image_path = output_path
-                cv2.imwrite(output_path, annotated_image)
+
+                if defer_render is None:
+                    defer_render = Config.DEFERRED_RENDER
+                if not source_path:
+                    defer_render = False
+                if defer_render:
+                    self.renders.defer(output_path, source_path, xyxy, confs, cls_ids, names)
+
+            annotated_jpeg = None
+            if (save_result and not defer_render) or return_jpeg:
+                # A decoded image owned by this request is drawn in place, a caller's is copied
+                canvas = decode() if owns_image else image.copy()
+                annotated_image = image_renderer.draw(canvas, xyxy, confs, cls_ids, names)
+                _, annotated_jpeg = cv2.imencode('.jpg', annotated_image)
+                if save_result and not defer_render:
+                    if output_path.lower().endswith(('.jpg', '.jpeg')):
+                        with open(output_path, 'wb') as f:
+                            f.write(annotated_jpeg.tobytes())
+                    else:
+                        cv2.imwrite(output_path, annotated_image)
 
             # Get image dimensions
-            height, width = image.shape[:2]
+            height, width = (int(v) for v in result['shape'])
 
-            return {
+            response = {
                 'success': True,
                 'detections': detections,
                 'count': len(detections),
@@ -158,20 +708,45 @@ class DetectionService:
                 'image_info': {
                     'width': width,
                     'height': height,
-                    'path': image_path
+                    'path': source_path
                 },
                 'output_image': output_image_path,
-                'conf_threshold': conf_threshold
+                'conf_threshold': conf_threshold,
+                'model': model,
+                'imgsz': int(result['imgsz']) or None,
+                'cached': cached
             }
+            if tiling is not None:
+                response['tiling'] = tiling
+            if return_jpeg:
+                response['annotated_jpeg'] = annotated_jpeg.tobytes()
+            return response
 
         except Exception as e:
             return {'error': str(e)}
 
+    def render_output(self, output_path: str) -> Optional[str]:
+        """
+        Render an annotated image recorded by detect_image(defer_render=True)
+
+        Args:
+            output_path: Path of the annotated image
+
+        Returns:
+            output_path if the image exists (rendered now or earlier), None otherwise
+        """
+        return self.renders.render(output_path)
+
     def detect_frame(
         self,
         frame: np.ndarray,
         conf: Optional[float] = None,
-        draw_boxes: bool = True
+        draw_boxes: bool = True,
+        model: Optional[str] = None,
+        tracker: Optional[BoxTracker] = None,
+        gate: Optional[MotionGate] = None,
+        imgsz: Imgsz = None,
+        latency_budget_ms: Optional[float] = None
     ) -> Tuple[np.ndarray, List[Dict]]:
         """
         Detect objects in a single frame
@@ -180,49 +755,54 @@ class DetectionService:
             frame: Input frame (numpy array)
             conf: Confidence threshold
             draw_boxes: Whether to draw bounding boxes
+            model: Model path to use (uses the default model if None)
+            tracker: Per-stream tracker; the model only runs when the tracker asks
+                for it and detections carry a track_id
+            gate: Per-stream motion gate; while the scene is static the last
+                result is reused and neither the model nor the tracker runs
+            imgsz: Inference size in pixels, 'auto', or None for the model default
+            latency_budget_ms: Forward latency budget used by imgsz='auto'
 
         Returns:
             Tuple of (annotated_frame, detections_list)
         """
-        if self.model is None:
+        if model is None and self.pool is None:
             return frame, []
 
+        model = self._model_key(model)
+
         try:
+            names = self.get_pool(model).names
             conf_threshold = conf if conf is not None else self.conf_threshold
-            results = self.model(frame, conf=conf_threshold, verbose=False)
-
-            detections = []
-            annotated_frame = frame.copy()
-
-            for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        cls_id = int(box.cls[0])
-                        cls_name = self.model.names[cls_id]
-                        confidence = float(box.conf[0])
-                        x1, y1, x2, y2 = map(int, box.xyxy[0])
-
-                        detections.append({
-                            'class_id': cls_id,
-                            'class_name': cls_name,
-                            'confidence': round(confidence, 3),
-                            'bbox': {'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2}
-                        })
-
-                        if draw_boxes:
-                            color = (0, 255, 0)
-                            cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), color, 2)
-                            label = f"{cls_name}: {confidence:.2f}"
-                            cv2.putText(
-                                annotated_frame,
-                                label,
-                                (x1, y1 - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX,
-                                0.5,
-                                color,
-                                2
-                            )
+            size = self.resolve_imgsz(imgsz, frame.shape, model, latency_budget_ms)
+
+            if gate is not None and not gate.should_run(frame):
+                xyxy, confs, cls_ids, track_ids = gate.last
+            else:
+                if tracker is None:
+                    xyxy, confs, cls_ids = self._predict(frame, conf_threshold, model, imgsz=size)
+                    track_ids = None
+                elif tracker.should_detect(conf_threshold):
+                    xyxy, confs, cls_ids, track_ids = tracker.update(
+                        *self._predict(frame, conf_threshold, model, imgsz=size)
+                    )
+                else:
+                    xyxy, confs, cls_ids, track_ids = tracker.predict(conf_threshold)
+                if gate is not None:
+                    gate.remember((xyxy, confs, cls_ids, track_ids))
+
+            labels = None
+            if track_ids is not None:
+                labels = [
+                    f"{names[c]} #{t}: {s:.2f}"
+                    for c, t, s in zip(cls_ids.tolist(), track_ids.tolist(), confs.tolist())
+                ]
+
+            detections = build_detections(xyxy, confs, cls_ids, names, include_size=False, track_ids=track_ids)
+            # Only copy when drawing, the caller keeps ownership of frame
+            annotated_frame = frame
+            if draw_boxes:
+                annotated_frame = frame_renderer.draw(frame.copy(), xyxy, confs, cls_ids, names, labels=labels)
 
             return annotated_frame, detections
 
@@ -230,6 +810,10 @@ class DetectionService:
             print(f"Error in detect_frame: {e}")
             return frame, []
 
+    def jpeg_to_base64(self, jpeg: bytes) -> str:
+        """Convert encoded JPEG bytes to a base64 data URL"""
+        return f"data:image/jpeg;base64,{base64.b64encode(jpeg).decode('utf-8')}"
+
     def frame_to_base64(self, frame: np.ndarray, quality: int = 90) -> str:
         """Convert frame to base64 string"""
         try:
@@ -241,29 +825,131 @@ class DetectionService:
             print(f"Error converting frame to base64: {e}")
             return ""
 
-    def get_classes(self) -> List[str]:
+    def get_classes(self, model: Optional[str] = None) -> List[str]:
         """Get list of detectable classes"""
-        if self.model is None:
+        if model is None and self.pool is None:
             return []
-        return list(self.model.names.values())
+        return list(self.get_pool(model).names.values())
 
     def change_model(self, model_path: str) -> bool:
-        """Change detection model"""
+        """
+        Change the default detection model synchronously
+
+        The new model is loaded and warmed before it becomes the default, so a
+        failed load leaves the current model in place.
+        """
+        # Pinned from the start, so loading another model while this one warms
+        # up cannot evict it before the swap
+        self.registry.pin(model_path)
         try:
-            self.model_path = model_path
-            return self.load_model()
+            self.warmup(model_path)
+            self._swap_default(model_path)
         except Exception as e:
             print(f"Error changing model: {e}")
+            if model_path != self.model_path:
+                self.registry.evict(model_path)  # Also unpins it
             return False
+        return True
+
+    def change_model_async(self, model_path: str) -> Dict:
+        """
+        Load and warm a model in the background, then make it the default
+
+        Args:
+            model_path: Path to the new model
+
+        Returns:
+            Job dictionary; poll get_model_job(job_id) for progress
+        """
+        with self._jobs_lock:
+            for job in self._model_jobs.values():
+                if job['model_path'] == model_path and job['status'] in ('pending', 'loading', 'warming'):
+                    return dict(job)
+
+            job_id = uuid.uuid4().hex
+            job = {
+                'job_id': job_id,
+                'model_path': model_path,
+                'status': 'pending',
+                'created_at': datetime.now().isoformat(),
+                'finished_at': None,
+                'warmup_ms': None,
+                'error': None
+            }
+            self._model_jobs[job_id] = job
+            while len(self._model_jobs) > 50:
+                self._model_jobs.popitem(last=False)
+
+        thread = threading.Thread(target=self._run_model_job, args=(job_id,), name=f'model-swap-{job_id[:8]}', daemon=True)
+        thread.start()
+        return dict(job)
+
+    def get_model_job(self, job_id: str) -> Optional[Dict]:
+        """Get the state of a background model change job"""
+        with self._jobs_lock:
+            job = self._model_jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def _update_model_job(self, job_id: str, **fields):
+        with self._jobs_lock:
+            self._model_jobs[job_id].update(fields)
+
+    def _run_model_job(self, job_id: str):
+        """Background worker for change_model_async"""
+        model_path = self.get_model_job(job_id)['model_path']
+        # Pinned from the start, so loading another model while this one warms
+        # up cannot evict it before the swap
+        self.registry.pin(model_path)
+        try:
+            self._update_model_job(job_id, status='loading')
+            self.registry.get(model_path)
+
+            self._update_model_job(job_id, status='warming')
+            warmup_ms = self.warmup(model_path)
+
+            self._swap_default(model_path)
+            self._update_model_job(job_id, status='ready', warmup_ms=warmup_ms,
+                                   finished_at=datetime.now().isoformat())
+            print(f"Default model switched to: {model_path}")
+        except Exception as e:
+            print(f"Error changing model: {e}")
+            if model_path != self.model_path:
+                self.registry.evict(model_path)  # Also unpins it
+            self._update_model_job(job_id, status='failed', error=str(e),
+                                   finished_at=datetime.now().isoformat())
+
+    def _swap_default(self, model_path: str):
+        """
+        Atomically make a loaded model the default
+
+        Raises:
+            RuntimeError: If the model is no longer loaded
+        """
+        with self._swap_lock:
+            if self.registry.peek(model_path) is None:
+                raise RuntimeError(f'Model was unloaded before it became the default: {model_path}')
+            previous = self.model_path
+            self.registry.pin(model_path)
+            self.model_path = model_path
+        if previous != model_path:
+            self.registry.unpin(previous)
 
 
 # Singleton instance
 _detection_service = None
 
 
-def get_detection_service(model_path: str = 'yolov8n.pt', conf: float = 0.25) -> DetectionService:
-    """Get or create detection service instance"""
+_service_lock = threading.Lock()
+
+
+def get_detection_service(model_path: Optional[str] = None, conf: Optional[float] = None) -> DetectionService:
+    """Get or create detection service instance (defaults come from Config)"""
     global _detection_service
     if _detection_service is None:
-        _detection_service = DetectionService(model_path, conf)
+        with _service_lock:
+            if _detection_service is None:
+                _detection_service = DetectionService(
+                    model_path or Config.DEFAULT_MODEL,
+                    conf if conf is not None else Config.DEFAULT_CONF
+                )
     return _detection_service
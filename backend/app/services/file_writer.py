@@ -0,0 +1,92 @@
+"""
+Async File Writer
+Persists request payloads off the request path
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Optional
+
+
+class AsyncFileWriter:
+    """
+    Writes byte payloads to disk on a small thread pool
+
+    Files are written to a temporary name and renamed, so readers never see
+    a partial file. Readers that need a file which may still be in flight
+    call wait(path) first.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        """
+        Initialize writer
+
+        Args:
+            max_workers: Number of writer threads
+        """
+        self.stats = {'writes': 0, 'bytes': 0, 'errors': 0}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='file-writer')
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def write(self, path: str, data: bytes) -> Future:
+        """
+        Schedule a write of data to path
+
+        Args:
+            path: Destination file path
+            data: File content
+
+        Returns:
+            Future resolving to path once the file is in place
+        """
+        future = self._executor.submit(self._write, path, data)
+        with self._lock:
+            self._pending[path] = future
+        future.add_done_callback(lambda done: self._finish(path, done))
+        return future
+
+    def wait(self, path: str, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a pending write of path
+
+        Args:
+            path: File path
+            timeout: Maximum seconds to wait (None = no limit)
+
+        Returns:
+            False if the write failed or timed out, True otherwise (including no pending write)
+        """
+        with self._lock:
+            future = self._pending.get(path)
+        if future is None:
+            return True
+        done, _ = wait([future], timeout=timeout)
+        return bool(done) and future.exception() is None
+
+    def get_stats(self) -> Dict:
+        """Get writer statistics"""
+        with self._lock:
+            return {**self.stats, 'pending': len(self._pending)}
+
+    def _write(self, path: str, data: bytes) -> str:
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Could not write {path}: {e}")
+            with self._lock:
+                self.stats['errors'] += 1
+            raise
+        with self._lock:
+            self.stats['writes'] += 1
+            self.stats['bytes'] += len(data)
+        return path
+
+    def _finish(self, path: str, future: Future):
+        with self._lock:
+            if self._pending.get(path) is future:
+                del self._pending[path]
@@ -0,0 +1,146 @@
+"""
+Job Handlers
+Built-in background job types for the job queue
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+from app.config import Config
+from app.services.detect_service import get_detection_service
+from app.services.job_queue import JobContext, JobQueue
+from app.services.video_pipeline import VideoPipeline
+from app.utils.validators import allowed_file, resolve_folder_path, resolve_model_path, resolve_video_path
+
+
+def validate_folder_params(params: Dict) -> Optional[str]:
+    """Check folder job params before queueing"""
+    if resolve_folder_path(params.get('folder')) is None:
+        return f"Folder not found: {params.get('folder')}"
+    if params.get('model') and resolve_model_path(params['model']) is None:
+        return f"Model not found: {params['model']}"
+    return None
+
+
+def detect_folder(ctx: JobContext) -> Dict:
+    """
+    Detect objects in every image of a folder
+
+    Params:
+        folder: Folder inside the backend directory
+        conf: Confidence threshold (optional)
+        model: Model to use (optional)
+        recursive: Include subfolders (default: false)
+
+    Partial results: one item per image with its detections (or error)
+    """
+    params = ctx.params
+    folder = resolve_folder_path(params.get('folder'))
+    if folder is None:
+        raise ValueError(f"Folder not found: {params.get('folder')}")
+    model = None
+    if params.get('model'):
+        model = resolve_model_path(params['model'])
+        if model is None:
+            raise ValueError(f"Model not found: {params['model']}")
+    conf = params.get('conf')
+
+    if params.get('recursive'):
+        paths = [os.path.join(root, name) for root, _, names in os.walk(folder) for name in names]
+    else:
+        paths = [os.path.join(folder, name) for name in os.listdir(folder)]
+    paths = sorted(path for path in paths if os.path.isfile(path) and allowed_file(path))
+
+    service = get_detection_service()
+    summary = {'folder': folder, 'images': len(paths), 'succeeded': 0, 'failed': 0, 'detections': 0, 'classes': {}}
+    ctx.update(progress=0.0, force=True)
+
+    for i, path in enumerate(paths):
+        ctx.check_cancelled()
+        name = os.path.relpath(path, folder)
+        result = service.detect_image(path, conf=conf, save_result=False, model=model, background=True)
+
+        if 'error' in result:
+            summary['failed'] += 1
+            item = {'filename': name, 'error': result['error']}
+        else:
+            summary['succeeded'] += 1
+            summary['detections'] += result['count']
+            for det in result['detections']:
+                summary['classes'][det['class_name']] = summary['classes'].get(det['class_name'], 0) + 1
+            item = {
+                'filename': name,
+                'detections': result['detections'],
+                'count': result['count'],
+                'image_info': result['image_info']
+            }
+
+        ctx.update(progress=(i + 1) / len(paths), result=item)
+
+    return summary
+
+
+def validate_video_params(params: Dict) -> Optional[str]:
+    """Check video job params before queueing"""
+    if resolve_video_path(params.get('video')) is None:
+        return f"Video not found: {params.get('video')}"
+    if params.get('model') and resolve_model_path(params['model']) is None:
+        return f"Model not found: {params['model']}"
+    return None
+
+
+def video_output_paths(video: str) -> Tuple[str, str]:
+    """Annotated video and per-frame detections paths for a source video"""
+    stem = os.path.splitext(os.path.basename(video))[0]
+    return (
+        os.path.join(Config.OUTPUT_FOLDER, f'detected_{stem}.mp4'),
+        os.path.join(Config.OUTPUT_FOLDER, f'detected_{stem}.jsonl')
+    )
+
+
+def detect_video(ctx: JobContext) -> Dict:
+    """
+    Detect objects in every frame of a video file
+
+    Params:
+        video: Video file inside the backend directory
+        conf: Confidence threshold (optional)
+        model: Model to use (optional)
+
+    Partial results: one summary item with the path of the JSONL file that
+    holds the detections of every frame (kept out of the job database, which
+    would otherwise take one row per frame)
+    """
+    params = ctx.params
+    video = resolve_video_path(params.get('video'))
+    if video is None:
+        raise ValueError(f"Video not found: {params.get('video')}")
+    model = None
+    if params.get('model'):
+        model = resolve_model_path(params['model'])
+        if model is None:
+            raise ValueError(f"Model not found: {params['model']}")
+
+    output_path, detections_path = video_output_paths(video)
+    pipeline = VideoPipeline(
+        get_detection_service(), video, output_path, detections_path, conf=params.get('conf'), model=model
+    )
+    ctx.update(progress=0.0, force=True)
+
+    # Progress is reported from the encode thread only, so the context is
+    # never updated concurrently
+    def on_frame(index: int, timestamp: float, detections: List[Dict]):
+        total = pipeline.stats.get('total_frames')
+        ctx.update(progress=(index + 1) / total if total else None)
+
+    summary = pipeline.run(on_frame=on_frame, should_stop=lambda: ctx.cancelled)
+    summary['video_url'] = f'/api/detection/video/outputs/{os.path.basename(output_path)}'
+    summary['detections_url'] = f'/api/detection/video/outputs/{os.path.basename(detections_path)}'
+    ctx.update(result=summary, force=True)
+    return summary
+
+
+def register_default_handlers(queue: JobQueue):
+    """Register the built-in job types"""
+    queue.register('folder', detect_folder, validate_folder_params)
+    queue.register('video', detect_video, validate_video_params)
@@ -0,0 +1,459 @@
+"""
+Background Job Queue
+SQLite-backed queue for long-running detection work (folders, videos)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import Config
+
+JOB_STATUSES = ('pending', 'running', 'completed', 'failed', 'cancelled')
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled"""
+
+
+class JobContext:
+    """Handle passed to job handlers for reporting progress and partial results"""
+
+    def __init__(self, queue: 'JobQueue', job: Dict):
+        self.queue = queue
+        self.job_id = job['job_id']
+        self.params = job['params']
+        self._results: List[Dict] = []
+        self._progress = 0.0
+        self._last_flush = 0.0
+        self._cancel_flag = False
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation was requested for this job"""
+        return self._cancel_flag or self.queue.is_cancel_requested(self.job_id)
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the job was cancelled"""
+        if self.cancelled:
+            raise JobCancelled()
+
+    def update(self, progress: Optional[float] = None, result: Optional[Dict] = None, force: bool = False):
+        """
+        Report progress and/or append one partial result
+
+        Writes are batched and flushed to SQLite at most every
+        Config.JOB_FLUSH_INTERVAL seconds unless force is set.
+
+        Args:
+            progress: Fraction done (0..1)
+            result: Partial result item, queryable via JobQueue.results()
+            force: Flush immediately
+        """
+        if progress is not None:
+            self._progress = min(max(float(progress), 0.0), 1.0)
+        if result is not None:
+            self._results.append(result)
+        now = time.monotonic()
+        if force or now - self._last_flush >= Config.JOB_FLUSH_INTERVAL:
+            self.flush()
+            self._last_flush = now
+
+    def flush(self):
+        """Write buffered progress and partial results"""
+        results, self._results = self._results, []
+        if self.queue._write_progress(self.job_id, self._progress, results):
+            self._cancel_flag = True
+
+
+class JobQueue:
+    """
+    Persistent background job queue
+
+    Jobs are stored in SQLite and executed by a small pool of worker threads
+    running at reduced OS priority, so offline work yields the CPU to
+    interactive requests. Running jobs write a heartbeat from a separate
+    thread, so a handler that is busy for a long time without reporting
+    progress stays alive; a job whose heartbeat goes stale (process restart
+    or crash) is queued again.
+    """
+
+    # Seconds without a heartbeat before a running job is considered orphaned
+    STALE_AFTER = 60.0
+
+    def __init__(self, db_path: str, num_workers: int = 1, max_attempts: int = 3):
+        """
+        Initialize job queue
+
+        Args:
+            db_path: SQLite database file
+            num_workers: Number of concurrently running jobs
+            max_attempts: Times a job interrupted by a restart is retried
+        """
+        self.db_path = db_path
+        self.num_workers = max(1, int(num_workers))
+        self.max_attempts = max_attempts
+        self.handlers: Dict[str, Callable[[JobContext], Any]] = {}
+        self.validators: Dict[str, Callable[[Dict], Optional[str]]] = {}
+
+        self._db_lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._cancel_requested = set()
+        self._running = set()   # jobs executing in this process, never requeued
+        self._workers: List[threading.Thread] = []
+        self._started = False
+        self._stopping = False
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._db_lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    type TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    progress REAL NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    num_results INTEGER NOT NULL DEFAULT 0,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    heartbeat_at REAL,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS job_results (
+                    job_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (job_id, seq)
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)')
+
+    def register(
+        self,
+        job_type: str,
+        handler: Callable[[JobContext], Any],
+        validate: Optional[Callable[[Dict], Optional[str]]] = None
+    ):
+        """
+        Register a handler for a job type
+
+        Args:
+            job_type: Job type name used in submit()
+            handler: Callable taking a JobContext and returning a JSON-serializable summary
+            validate: Optional callable checking params at submit time; returns an error message or None
+        """
+        self.handlers[job_type] = handler
+        if validate is not None:
+            self.validators[job_type] = validate
+
+    def start(self):
+        """Requeue orphaned jobs and start the worker threads (idempotent)"""
+        with self._wakeup:
+            if self._started:
+                return
+            self._started = True
+
+        self._requeue_stale()
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._worker, name=f'job-worker-{i}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self):
+        """Ask worker threads to exit after their current job"""
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+
+    def submit(self, job_type: str, params: Optional[Dict] = None) -> Dict:
+        """
+        Queue a job
+
+        Args:
+            job_type: Registered job type
+            params: JSON-serializable handler parameters
+
+        Returns:
+            Job dictionary
+
+        Raises:
+            ValueError: If no handler is registered for job_type or params are invalid
+        """
+        if job_type not in self.handlers:
+            raise ValueError(f'Unknown job type: {job_type}')
+        validate = self.validators.get(job_type)
+        error = validate(params or {}) if validate is not None else None
+        if error:
+            raise ValueError(error)
+
+        job_id = uuid.uuid4().hex
+        with self._db_lock:
+            self._conn.execute(
+                'INSERT INTO jobs (id, type, status, params, created_at) VALUES (?, ?, ?, ?, ?)',
+                (job_id, job_type, 'pending', json.dumps(params or {}), datetime.now().isoformat())
+            )
+        self.start()
+        with self._wakeup:
+            self._wakeup.notify()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Get a job by id"""
+        with self._db_lock:
+            row = self._conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """List the most recent jobs, optionally filtered by status"""
+        query = 'SELECT * FROM jobs'
+        args: tuple = ()
+        if status:
+            query += ' WHERE status = ?'
+            args = (status,)
+        query += ' ORDER BY created_at DESC LIMIT ?'
+        with self._db_lock:
+            rows = self._conn.execute(query, args + (int(limit),)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def results(self, job_id: str, offset: int = 0, limit: int = 100) -> List[Dict]:
+        """Get partial results of a job in the order they were produced"""
+        with self._db_lock:
+            rows = self._conn.execute(
+                'SELECT data FROM job_results WHERE job_id = ? ORDER BY seq LIMIT ? OFFSET ?',
+                (job_id, int(limit), int(offset))
+            ).fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        Cancel a job; pending jobs stop immediately, running jobs at their next check
+
+        Returns:
+            Updated job dictionary, or None if the job does not exist
+        """
+        with self._db_lock:
+            updated = self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'pending'",
+                (datetime.now().isoformat(), job_id)
+            ).rowcount
+            if not updated:
+                # Running jobs (possibly in another process) see the flag on their next flush
+                updated = self._conn.execute(
+                    "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,)
+                ).rowcount
+                if updated:
+                    with self._wakeup:
+                        self._cancel_requested.add(job_id)
+        return self.get(job_id)
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        with self._wakeup:
+            return job_id in self._cancel_requested
+
+    def get_stats(self) -> Dict:
+        """Get job counts per status"""
+        with self._db_lock:
+            rows = self._conn.execute('SELECT status, COUNT(*) AS n FROM jobs GROUP BY status').fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({row['status']: row['n'] for row in rows})
+        return {'workers': self.num_workers, 'types': sorted(self.handlers), **counts}
+
+    def _to_dict(self, row: sqlite3.Row) -> Dict:
+        return {
+            'job_id': row['id'],
+            'type': row['type'],
+            'status': row['status'],
+            'params': json.loads(row['params']),
+            'progress': round(row['progress'], 4),
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'num_results': row['num_results'],
+            'cancel_requested': bool(row['cancel_requested']),
+            'attempts': row['attempts'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at']
+        }
+
+    def _requeue_stale(self):
+        """Queue running jobs without a recent heartbeat again (or fail them after max_attempts)"""
+        cutoff = time.time() - self.STALE_AFTER
+        with self._wakeup:
+            owned = set(self._running)
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT id, attempts FROM jobs WHERE status = 'running' AND heartbeat_at < ?", (cutoff,)
+            ).fetchall()
+            rows = [row for row in rows if row['id'] not in owned]
+            for row in rows:
+                if row['attempts'] >= self.max_attempts:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = 'Interrupted too many times', finished_at = ? "
+                        "WHERE id = ?", (datetime.now().isoformat(), row['id'])
+                    )
+            stale = [row['id'] for row in rows if row['attempts'] < self.max_attempts]
+            for job_id in stale:
+                self._conn.execute('DELETE FROM job_results WHERE job_id = ?', (job_id,))
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'pending', progress = 0, num_results = 0 WHERE id = ?", (job_id,)
+                )
+        if stale:
+            print(f"Requeued {len(stale)} interrupted job(s)")
+
+    def _claim(self) -> Optional[Dict]:
+        """Atomically move the oldest pending job to running"""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = 'pending' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            claimed = self._conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, heartbeat_at = ?, attempts = attempts + 1 "
+                "WHERE id = ? AND status = 'pending'",
+                (datetime.now().isoformat(), time.time(), row['id'])
+            ).rowcount
+        return self.get(row['id']) if claimed else None
+
+    def _write_progress(self, job_id: str, progress: float, results: List[Dict]) -> bool:
+        """Store progress and partial results, refresh the heartbeat; returns the cancel flag"""
+        with self._db_lock:
+            self._conn.execute('BEGIN')
+            try:
+                if results:
+                    start = self._conn.execute(
+                        'SELECT num_results FROM jobs WHERE id = ?', (job_id,)
+                    ).fetchone()['num_results']
+                    self._conn.executemany(
+                        'INSERT INTO job_results (job_id, seq, data) VALUES (?, ?, ?)',
+                        [(job_id, start + i, json.dumps(item)) for i, item in enumerate(results)]
+                    )
+                self._conn.execute(
+                    'UPDATE jobs SET progress = ?, num_results = num_results + ?, heartbeat_at = ? WHERE id = ?',
+                    (progress, len(results), time.time(), job_id)
+                )
+                row = self._conn.execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,)).fetchone()
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return bool(row and row['cancel_requested'])
+
+    def _finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        with self._db_lock:
+            self._conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, '
+                'progress = CASE WHEN ? = \'completed\' THEN 1 ELSE progress END WHERE id = ?',
+                (status, json.dumps(result) if result is not None else None, error,
+                 datetime.now().isoformat(), status, job_id)
+            )
+        with self._wakeup:
+            self._cancel_requested.discard(job_id)
+
+    def _lower_priority(self):
+        """Run this worker thread at a lower OS priority than request threads (Linux only)"""
+        if Config.JOB_NICE <= 0 or not hasattr(os, 'setpriority'):
+            return
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), Config.JOB_NICE)
+        except (OSError, AttributeError) as e:
+            print(f"Could not lower job worker priority: {e}")
+
+    def _worker(self):
+        self._lower_priority()
+        last_sweep = time.monotonic()
+        while True:
+            with self._wakeup:
+                if self._stopping:
+                    return
+            if time.monotonic() - last_sweep >= self.STALE_AFTER / 2:
+                self._requeue_stale()
+                last_sweep = time.monotonic()
+            job = self._claim()
+            if job is None:
+                with self._wakeup:
+                    if not self._stopping:
+                        self._wakeup.wait(timeout=1.0)
+                continue
+            self._run(job)
+
+    def _heartbeat(self, job_id: str, done: threading.Event):
+        """Refresh a running job's heartbeat until done is set"""
+        while not done.wait(self.STALE_AFTER / 4):
+            with self._db_lock:
+                self._conn.execute(
+                    "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = 'running'", (time.time(), job_id)
+                )
+
+    def _run(self, job: Dict):
+        ctx = JobContext(self, job)
+        handler = self.handlers.get(job['type'])
+        done = threading.Event()
+        with self._wakeup:
+            self._running.add(job['job_id'])
+        threading.Thread(
+            target=self._heartbeat, args=(job['job_id'], done), name=f"job-heartbeat-{job['job_id'][:8]}", daemon=True
+        ).start()
+        try:
+            self._execute(job, ctx, handler)
+        finally:
+            done.set()
+            with self._wakeup:
+                self._running.discard(job['job_id'])
+
+    def _execute(self, job: Dict, ctx: JobContext, handler: Optional[Callable[[JobContext], Any]]):
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for job type: {job['type']}")
+            result = handler(ctx)
+            ctx.flush()
+            if ctx.cancelled:
+                self._finish(job['job_id'], 'cancelled', result)
+            else:
+                self._finish(job['job_id'], 'completed', result)
+        except JobCancelled:
+            ctx.flush()
+            self._finish(job['job_id'], 'cancelled')
+        except Exception as e:
+            print(f"Job {job['job_id']} ({job['type']}) failed: {e}")
+            try:
+                ctx.flush()
+            except Exception:
+                pass
+            self._finish(job['job_id'], 'failed', error=str(e))
+
+
+# Global job queue instance
+_job_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Get or create the job queue with the built-in handlers registered"""
+    global _job_queue
+    if _job_queue is None:
+        with _queue_lock:
+            if _job_queue is None:
+                from app.services.job_handlers import register_default_handlers
+
+                queue = JobQueue(Config.JOBS_DB, num_workers=Config.JOB_WORKERS)
+                register_default_handlers(queue)
+                _job_queue = queue
+    return _job_queue
@@ -0,0 +1,522 @@
+"""
+Live Stream
+Latest-frame-wins capture -> inference -> encode loop for MJPEG streams,
+shared between all viewers of the same camera
+"""
+
+import threading
+import time
+import uuid
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+import cv2
+
+from app.config import Config
+from app.services.detect_service import get_detection_service
+from app.utils.motion import MotionGate
+from app.utils.stream_control import StreamController
+from app.utils.tracker import BoxTracker
+
+
+class LatestSlot:
+    """
+    Single-item mailbox that always holds the newest value
+
+    put() overwrites whatever is stored, so a slow consumer skips stale
+    items instead of building a backlog. Any number of consumers can wait
+    on the same slot; each one tracks the last sequence number it saw.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._seq = 0
+        self._closed = False
+
+    def put(self, item):
+        """Store item, replacing the previous one"""
+        with self._cond:
+            self._item = item
+            self._seq += 1
+            self._cond.notify_all()
+
+    def get(self, after: int = 0, timeout: Optional[float] = None) -> Optional[Tuple[int, object]]:
+        """
+        Wait for an item newer than sequence number after
+
+        Args:
+            after: Last sequence number seen by the caller
+            timeout: Maximum seconds to wait
+
+        Returns:
+            (seq, item), or None on timeout or when the slot is closed
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > after or self._closed, timeout=timeout):
+                return None
+            if self._seq <= after:
+                return None
+            return self._seq, self._item
+
+    def peek(self) -> Tuple[int, object]:
+        """Current (seq, item) without waiting"""
+        with self._cond:
+            return self._seq, self._item
+
+    def close(self):
+        """Wake up all waiters; later gets return None once drained"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class CameraSource:
+    """
+    Owns one capture device and publishes its newest frame
+
+    Every LiveStream on the same camera reads from this source, so the
+    device is opened once no matter how many models or viewers use it.
+    """
+
+    def __init__(self, source: Union[int, str]):
+        """
+        Initialize camera source
+
+        Args:
+            source: Camera index or video path/URL
+        """
+        self.source = source
+        self.frames = LatestSlot()  # (capture_time, frame)
+        self.captured = 0
+        self._stop = threading.Event()
+        self._cap: Optional[cv2.VideoCapture] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and not self._stop.is_set()
+
+    def start(self) -> bool:
+        """
+        Open the device and start capturing
+
+        Returns:
+            True if the source could be opened
+        """
+        self._cap = cv2.VideoCapture(self.source)
+        if not self._cap.isOpened():
+            self._cap.release()
+            return False
+        # Keep the driver from buffering frames we would only throw away
+        self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        self._thread = threading.Thread(target=self._capture, name=f'camera-{self.source}', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Stop capturing and release the device"""
+        self._stop.set()
+        self.frames.close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        if self._cap is not None:
+            self._cap.release()
+
+    def _capture(self):
+        try:
+            while not self._stop.is_set():
+                ok, frame = self._cap.read()
+                if not ok:
+                    break
+                self.captured += 1
+                self.frames.put((time.perf_counter(), frame))
+        finally:
+            # End of source: let the streams drain and exit
+            self._stop.set()
+            self.frames.close()
+
+
+class LiveStream:
+    """
+    Runs inference and JPEG encoding on a camera source in separate threads
+
+    Each stage only ever looks at the newest output of the previous one, so
+    when the model is slower than the camera, intermediate frames are
+    dropped and the latency from capture to encoded frame stays bounded by
+    roughly one inference plus one encode. Encoded frames are fanned out to
+    every subscriber through the same slot.
+    """
+
+    def __init__(
+        self,
+        service,
+        camera: CameraSource,
+        conf: Optional[float] = None,
+        model: Optional[str] = None,
+        quality: Optional[int] = None,
+        target_fps: Optional[float] = None,
+        target_latency_ms: Optional[float] = None
+    ):
+        """
+        Initialize live stream
+
+        Args:
+            service: DetectionService used for inference
+            camera: Running camera source to read frames from
+            conf: Confidence threshold (uses the service default if None)
+            model: Model path to use (uses the default model if None)
+            quality: JPEG quality of the encoded frames (uses Config if None)
+            target_fps: Frame rate to hold with a StreamController (no FPS target if None)
+            target_latency_ms: Capture-to-encode latency to hold (no latency target if None)
+        """
+        self.id = uuid.uuid4().hex[:8]
+        self.service = service
+        self.camera = camera
+        self.conf = conf
+        self.model = model
+        self.quality = quality or Config.STREAM_JPEG_QUALITY
+        self.subscribers = 0
+        self.tracker = BoxTracker() if Config.TRACKER_ENABLED else None
+        self.gate = MotionGate() if Config.MOTION_GATE_ENABLED else None
+        self.target_fps = target_fps
+        self.target_latency_ms = target_latency_ms
+        self.controller = None
+        if target_fps or target_latency_ms:
+            self.controller = StreamController(target_fps, target_latency_ms, max_quality=self.quality)
+
+        self.results = LatestSlot()   # (capture_time, annotated_frame, detections)
+        self.encoded = LatestSlot()   # (capture_time, jpeg, detections)
+
+        self._stop = threading.Event()
+        self._threads = []
+        self.started_at: Optional[float] = None
+        self.stats = {
+            'inferred': 0, 'encoded': 0, 'dropped_before_inference': 0, 'dropped_before_encode': 0,
+            'latency_ms': 0.0, 'inference_ms': 0.0
+        }
+
+    @property
+    def running(self) -> bool:
+        return self.started_at is not None and not self._stop.is_set()
+
+    def start(self):
+        """Start the inference and encode threads"""
+        self.started_at = time.time()
+        for name, target in (('inference', self._infer), ('encode', self._encode)):
+            thread = threading.Thread(target=target, name=f'stream-{self.id}-{name}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Stop both stages (the camera source is owned by the broker)"""
+        self._stop.set()
+        self.results.close()
+        self.encoded.close()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=5)
+
+    def jpeg_frames(self, timeout: float = 10.0) -> Iterator[bytes]:
+        """
+        Yield encoded frames as they are produced, skipping any the caller was too slow for
+
+        Args:
+            timeout: Seconds without a new frame after which the iteration ends
+        """
+        seq = 0
+        while not self._stop.is_set():
+            item = self.encoded.get(after=seq, timeout=timeout)
+            if item is None:
+                return
+            seq, (_, jpeg, _) = item
+            yield jpeg
+
+    def snapshot(self) -> Optional[Dict]:
+        """
+        Latest encoded frame and its detections
+
+        Returns:
+            Dictionary with jpeg, detections and age_ms, or None before the first frame
+        """
+        seq, item = self.encoded.peek()
+        if seq == 0:
+            return None
+        captured_at, jpeg, detections = item
+        return {
+            'jpeg': jpeg,
+            'detections': detections,
+            'age_ms': round((time.perf_counter() - captured_at) * 1000, 1)
+        }
+
+    def get_stats(self) -> Dict:
+        """Stage counters, dropped frames, the latest capture-to-encode latency and controller settings"""
+        uptime = time.time() - self.started_at if self.started_at else 0.0
+        return {
+            'id': self.id,
+            'model': self.model,
+            'conf': self.conf,
+            'running': self.running,
+            'subscribers': self.subscribers,
+            'uptime': round(uptime, 1),
+            'fps': round(self.stats['encoded'] / uptime, 2) if uptime > 0 else 0.0,
+            'quality': self.controller.quality if self.controller is not None else self.quality,
+            **{k: round(v, 2) if isinstance(v, float) else v for k, v in self.stats.items()},
+            'tracker': self.tracker.get_stats() if self.tracker is not None else None,
+            'motion_gate': self.gate.get_stats() if self.gate is not None else None,
+            'controller': self.controller.get_stats() if self.controller is not None else None
+        }
+
+    def _fit_controller(self):
+        """Limit the controller to input sizes the model can run"""
+        try:
+            input_size = self.service.get_pool(self.model).input_size
+        except Exception as e:
+            print(f"Error loading stream model: {e}")
+            return
+        self.controller.use_sizes([input_size(size) for size in self.controller.sizes])
+
+    def _infer(self):
+        seq = 0
+        try:
+            if self.controller is not None:
+                self._fit_controller()
+            while not self._stop.is_set():
+                item = self.camera.frames.get(after=seq, timeout=0.5)
+                if item is None:
+                    if self.camera.running:
+                        continue
+                    break
+                last, (seq, (captured_at, frame)) = seq, item
+                if last:
+                    self.stats['dropped_before_inference'] += seq - last - 1
+                controller = self.controller
+                if controller is not None and not controller.should_process(seq):
+                    continue
+                start = time.perf_counter()
+                annotated, detections = self.service.detect_frame(
+                    frame, conf=self.conf, draw_boxes=True, model=self.model, tracker=self.tracker, gate=self.gate,
+                    imgsz=controller.imgsz if controller is not None else None
+                )
+                self.stats['inference_ms'] = (time.perf_counter() - start) * 1000
+                if controller is not None:
+                    controller.record_inference(self.stats['inference_ms'])
+                self.stats['inferred'] += 1
+                self.results.put((captured_at, annotated, detections))
+        finally:
+            self._stop.set()
+            self.results.close()
+
+    def _encode(self):
+        seq = 0
+        controller = self.controller
+        try:
+            while True:
+                item = self.results.get(after=seq)
+                if item is None:
+                    break
+                last, (seq, (captured_at, annotated, detections)) = seq, item
+                self.stats['dropped_before_encode'] += seq - last - 1
+                quality = controller.quality if controller is not None else self.quality
+                start = time.perf_counter()
+                ok, buffer = cv2.imencode('.jpg', annotated, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+                if not ok:
+                    continue
+                self.stats['encoded'] += 1
+                self.stats['latency_ms'] = (time.perf_counter() - captured_at) * 1000
+                if controller is not None:
+                    controller.record_frame((time.perf_counter() - start) * 1000, self.stats['latency_ms'])
+                self.encoded.put((captured_at, buffer.tobytes(), detections))
+        finally:
+            self.encoded.close()
+
+
+class StreamBroker:
+    """
+    Shares camera sources and live streams between viewers
+
+    One CameraSource per camera and one LiveStream per (camera, model,
+    conf, targets) are kept alive while they have subscribers. Viewers with the same
+    settings share one inference loop; viewers with different settings on
+    the same camera share the capture. The last viewer to leave stops the
+    stream, and the camera is released when no stream uses it anymore.
+    """
+
+    def __init__(self, service):
+        """
+        Initialize stream broker
+
+        Args:
+            service: DetectionService used for inference
+        """
+        self.service = service
+        self._cameras: Dict[Union[int, str], CameraSource] = {}
+        self._streams: Dict[Tuple, LiveStream] = {}
+        # Cameras being released; set once the device is free to open again
+        self._stopping: Dict[Union[int, str], threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self,
+        source: Union[int, str],
+        conf: Optional[float] = None,
+        model: Optional[str] = None,
+        target_fps: Optional[float] = None,
+        target_latency_ms: Optional[float] = None
+    ) -> Optional[LiveStream]:
+        """
+        Join (or start) the stream for a camera and settings
+
+        Args:
+            source: Camera index or video path/URL
+            conf: Confidence threshold
+            model: Model path to use (uses the default model if None)
+            target_fps: Frame rate the stream should hold (uses Config if None, 0 = none)
+            target_latency_ms: Latency the stream should hold (uses Config if None, 0 = none)
+
+        Returns:
+            Running LiveStream, or None if the camera cannot be opened
+        """
+        if target_fps is None:
+            target_fps = Config.STREAM_TARGET_FPS
+        if target_latency_ms is None:
+            target_latency_ms = Config.STREAM_TARGET_LATENCY_MS
+        key = (source, model, conf, target_fps or None, target_latency_ms or None)
+        while True:
+            with self._lock:
+                stopping = self._stopping.get(source)
+                if stopping is None:
+                    stream = self._streams.get(key)
+                    if stream is None or not stream.running:
+                        camera = self._cameras.get(source)
+                        if camera is None or not camera.running:
+                            camera = CameraSource(source)
+                            if not camera.start():
+                                return None
+                            self._cameras[source] = camera
+                        stream = LiveStream(
+                            self.service, camera, conf=conf, model=model,
+                            target_fps=target_fps or None, target_latency_ms=target_latency_ms or None
+                        )
+                        stream.start()
+                        self._streams[key] = stream
+                    stream.subscribers += 1
+                    return stream
+            # The last viewer just left; opening the device before it is released would fail
+            stopping.wait()
+
+    def unsubscribe(self, stream: LiveStream):
+        """Leave a stream, stopping it (and its camera) when nobody else uses it"""
+        camera = stream.camera
+        released = None
+        with self._lock:
+            stream.subscribers -= 1
+            if stream.subscribers > 0:
+                return
+            key = (camera.source, stream.model, stream.conf, stream.target_fps, stream.target_latency_ms)
+            if self._streams.get(key) is stream:
+                del self._streams[key]
+
+            if not any(s.camera is camera for s in self._streams.values()):
+                if self._cameras.get(camera.source) is camera:
+                    del self._cameras[camera.source]
+                    # Hold new subscribers for this camera until the device is released
+                    released = self._stopping[camera.source] = threading.Event()
+
+        # Joining threads can take a moment, so do it outside the lock
+        stream.stop()
+        if released is not None:
+            try:
+                camera.stop()
+            finally:
+                with self._lock:
+                    del self._stopping[camera.source]
+                released.set()
+
+    def camera_available(self, source: Union[int, str]) -> bool:
+        """
+        Check that a camera can be streamed without opening it twice
+
+        A camera already captured by a running stream counts as available;
+        otherwise the device is opened briefly and released. The probe runs
+        outside the broker lock, since opening a device can take a second.
+
+        Args:
+            source: Camera index or video path/URL
+
+        Returns:
+            True if the camera is streaming or could be opened
+        """
+        with self._lock:
+            camera = self._cameras.get(source)
+            if camera is not None and camera.running:
+                return True
+            stopping = self._stopping.get(source)
+        if stopping is not None:
+            stopping.wait()
+
+        cap = cv2.VideoCapture(source)
+        try:
+            if cap.isOpened():
+                return True
+        finally:
+            cap.release()
+        # A stream may have opened the camera while we were probing it
+        with self._lock:
+            camera = self._cameras.get(source)
+            return camera is not None and camera.running
+
+    def snapshot(self, source: Union[int, str], model: Optional[str] = None) -> Optional[Dict]:
+        """
+        Latest annotated frame of a running stream on a camera
+
+        Args:
+            source: Camera index or video path/URL
+            model: Only consider streams using this model (any model if None)
+
+        Returns:
+            Newest snapshot among the matching streams, or None if none is running
+        """
+        with self._lock:
+            streams = [
+                s for (src, m, *_), s in self._streams.items()
+                if src == source and (model is None or m == model)
+            ]
+        snapshots = [snap for snap in (s.snapshot() for s in streams) if snap is not None]
+        if not snapshots:
+            return None
+        return min(snapshots, key=lambda snap: snap['age_ms'])
+
+    def get_stats(self) -> Dict:
+        """Cameras and streams currently open"""
+        with self._lock:
+            cameras = list(self._cameras.values())
+            streams = list(self._streams.values())
+        return {
+            'cameras': [
+                {
+                    'source': camera.source,
+                    'running': camera.running,
+                    'captured': camera.captured,
+                    'streams': [s.get_stats() for s in streams if s.camera is camera]
+                }
+                for camera in cameras
+            ],
+            'active_streams': len(streams),
+            'subscribers': sum(s.subscribers for s in streams)
+        }
+
+
+# Singleton broker
+_stream_broker: Optional[StreamBroker] = None
+_broker_lock = threading.Lock()
+
+
+def get_stream_broker() -> StreamBroker:
+    """Get or create the stream broker"""
+    global _stream_broker
+    if _stream_broker is None:
+        with _broker_lock:
+            if _stream_broker is None:
+                _stream_broker = StreamBroker(get_detection_service())
+    return _stream_broker
@@ -0,0 +1,149 @@
+"""
+Model Replica Pool
+Holds independent model replicas so concurrent requests can run in parallel
+"""
+
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+import numpy as np
+
+from app.services.backends import InferenceBackend, create_backend
+
+
+def default_pool_size() -> int:
+    """Number of replicas to use when not configured (one per 4 cores)"""
+    return max(1, (os.cpu_count() or 1) // 4)
+
+
+class ModelPool:
+    """Pool of model replicas with checkout/checkin semantics"""
+
+    def __init__(
+        self,
+        model_path: str,
+        size: Optional[int] = None,
+        threads_per_replica: Optional[int] = None,
+        loader: Callable[[str, int], InferenceBackend] = create_backend
+    ):
+        """
+        Initialize model pool
+
+        Args:
+            model_path: Path to model weights
+            size: Number of replicas (defaults to one per 4 CPU cores)
+            threads_per_replica: Intra-op threads per inference (defaults to cores / size)
+            loader: Callable that loads one replica from (model_path, threads_per_replica)
+        """
+        self.model_path = model_path
+        self.size = max(1, int(size or default_pool_size()))
+        # The intra-op budget is split across replicas so that N parallel
+        # inferences do not oversubscribe the cores. Each replica applies it
+        # on the thread that runs its forward pass (see set_torch_threads).
+        self.threads_per_replica = max(1, int(threads_per_replica or (os.cpu_count() or 1) // self.size))
+
+        self._replicas = queue.Queue()
+        self._in_use = 0
+        self._lock = threading.Lock()
+        # Warmups hold the whole pool, so two of them taking replicas in turn
+        # would each wait forever for the other's share
+        self._warmup_lock = threading.Lock()
+        self.warm_latency: Dict[int, float] = {}
+
+        first = loader(model_path, self.threads_per_replica)
+        self.backend = first.name
+        self.input_size = first.input_size
+        self.names: Dict[int, str] = first.names
+        self.memory_bytes = first.memory_bytes() * self.size
+        self._replicas.put(first)
+        for _ in range(self.size - 1):
+            self._replicas.put(loader(model_path, self.threads_per_replica))
+
+    def checkout(self, timeout: Optional[float] = None):
+        """
+        Take a replica out of the pool, blocking until one is free
+
+        Args:
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Returns:
+            Model replica; must be returned with checkin()
+        """
+        try:
+            model = self._replicas.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f'No free model replica within {timeout}s')
+        with self._lock:
+            self._in_use += 1
+        return model
+
+    def checkin(self, model):
+        """Return a replica to the pool"""
+        with self._lock:
+            self._in_use -= 1
+        self._replicas.put(model)
+
+    @contextmanager
+    def replica(self, timeout: Optional[float] = None) -> Iterator[object]:
+        """Context manager wrapping checkout()/checkin()"""
+        model = self.checkout(timeout=timeout)
+        try:
+            yield model
+        finally:
+            self.checkin(model)
+
+    def warmup(self, sizes: Iterable[int] = (640,), runs: int = 2) -> Dict[int, float]:
+        """
+        Run dummy forwards on every replica so the first real request is not slowed
+        by lazy initialization
+
+        Sizes that were already warmed are not run again, and concurrent
+        warmups of the same pool run one after the other.
+
+        Args:
+            sizes: Square input sizes to warm up
+            runs: Forwards per size and replica
+
+        Returns:
+            Mapping of every warmed input size to its warm forward latency in milliseconds
+        """
+        with self._warmup_lock:
+            pending = sorted({int(size) for size in sizes} - set(self.warm_latency))
+            if pending:
+                self.warm_latency = {**self.warm_latency, **self._warmup(pending, runs)}
+            return dict(self.warm_latency)
+
+    def _warmup(self, sizes: Iterable[int], runs: int) -> Dict[int, float]:
+        latencies = {}
+        replicas = [self.checkout() for _ in range(self.size)]
+        try:
+            for size in sizes:
+                dummy = np.zeros((size, size, 3), dtype=np.uint8)
+                elapsed = []
+                for model in replicas:
+                    for _ in range(max(runs, 1)):
+                        start = time.perf_counter()
+                        model.predict([dummy], conf=0.25, imgsz=size)
+                        elapsed.append(time.perf_counter() - start)
+                # The first forward per replica is cold; the fastest one is the warm latency
+                latencies[int(size)] = round(min(elapsed) * 1000, 2)
+        finally:
+            for model in replicas:
+                self.checkin(model)
+        return latencies
+
+    def get_stats(self) -> Dict:
+        """Get pool usage statistics"""
+        with self._lock:
+            in_use = self._in_use
+        return {
+            'backend': self.backend,
+            'replicas': self.size,
+            'in_use': in_use,
+            'available': self.size - in_use,
+            'threads_per_replica': self.threads_per_replica
+        }
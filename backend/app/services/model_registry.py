@@ -0,0 +1,150 @@
+"""
+Model Registry
+Keeps several loaded models in memory under an LRU policy with a memory budget
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from app.services.model_pool import ModelPool
+
+
+class ModelRegistry:
+    """LRU cache of loaded model pools keyed by model path"""
+
+    def __init__(self, loader: Callable[[str], ModelPool], budget_mb: float = 0):
+        """
+        Initialize model registry
+
+        Args:
+            loader: Callable that loads a ModelPool for a model path
+            budget_mb: Memory budget for loaded models in MB (0 = unlimited)
+        """
+        self.loader = loader
+        self.budget_bytes = int(max(budget_mb, 0) * 1024 * 1024)
+        self.stats = {'hits': 0, 'misses': 0, 'loads': 0, 'evictions': 0}
+
+        self._pools: 'OrderedDict[str, ModelPool]' = OrderedDict()
+        self._pinned = set()
+        self._loading: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_path: str) -> ModelPool:
+        """
+        Get a loaded model pool, loading it on a miss
+
+        Concurrent misses for the same path share a single load.
+
+        Args:
+            model_path: Path to model weights
+
+        Returns:
+            Loaded ModelPool
+        """
+        with self._lock:
+            pool = self._pools.get(model_path)
+            if pool is not None:
+                self._pools.move_to_end(model_path)
+                self.stats['hits'] += 1
+                return pool
+
+            self.stats['misses'] += 1
+            future = self._loading.get(model_path)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._loading[model_path] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            pool = self.loader(model_path)
+        except Exception as e:
+            with self._lock:
+                self._loading.pop(model_path, None)
+            future.set_exception(e)
+            raise
+
+        self.put(model_path, pool)
+        with self._lock:
+            self._loading.pop(model_path, None)
+        future.set_result(pool)
+        return pool
+
+    def peek(self, model_path: str) -> Optional[ModelPool]:
+        """Get a model pool only if it is already loaded (does not touch LRU order)"""
+        with self._lock:
+            return self._pools.get(model_path)
+
+    def put(self, model_path: str, pool: ModelPool):
+        """Insert or replace a loaded model pool and enforce the memory budget"""
+        with self._lock:
+            self._pools[model_path] = pool
+            self._pools.move_to_end(model_path)
+            self.stats['loads'] += 1
+            self._evict_over_budget(keep=model_path)
+
+    def evict(self, model_path: str) -> bool:
+        """Remove a model from the registry; in-flight inferences keep their replica"""
+        with self._lock:
+            self._pinned.discard(model_path)
+            return self._pools.pop(model_path, None) is not None
+
+    def pin(self, model_path: str):
+        """Exclude a model from LRU eviction"""
+        with self._lock:
+            self._pinned.add(model_path)
+
+    def unpin(self, model_path: str):
+        """Allow a model to be evicted again"""
+        with self._lock:
+            self._pinned.discard(model_path)
+
+    def loaded(self) -> List[str]:
+        """List loaded model paths, least recently used first"""
+        with self._lock:
+            return list(self._pools.keys())
+
+    def memory_bytes(self) -> int:
+        """Estimated memory used by all loaded models"""
+        with self._lock:
+            return sum(pool.memory_bytes for pool in self._pools.values())
+
+    def get_stats(self) -> Dict:
+        """Get registry statistics"""
+        with self._lock:
+            models = [
+                {
+                    'model_path': path,
+                    'memory_mb': round(pool.memory_bytes / (1024 * 1024), 2),
+                    'pinned': path in self._pinned,
+                    'pool': pool.get_stats()
+                }
+                for path, pool in self._pools.items()
+            ]
+            stats = dict(self.stats)
+        return {
+            'models': models,
+            'count': len(models),
+            'memory_mb': round(sum(m['memory_mb'] for m in models), 2),
+            'budget_mb': round(self.budget_bytes / (1024 * 1024), 2) if self.budget_bytes else None,
+            **stats
+        }
+
+    def _evict_over_budget(self, keep: str):
+        """Evict least recently used models until the budget is met (caller holds the lock)"""
+        if not self.budget_bytes:
+            return
+
+        total = sum(pool.memory_bytes for pool in self._pools.values())
+        for path in list(self._pools.keys()):
+            if total <= self.budget_bytes:
+                break
+            if path == keep or path in self._pinned:
+                continue
+            total -= self._pools.pop(path).memory_bytes
+            self.stats['evictions'] += 1
+            print(f"Evicted model from registry: {path}")
@@ -0,0 +1,109 @@
+"""
+Startup Readiness
+Eagerly loads and warms the configured models so /api/health can gate traffic
+"""
+
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.config import Config
+from app.services.detect_service import get_detection_service
+from app.utils.validators import resolve_model_path
+
+
+class Readiness:
+    """Tracks whether the server has finished loading and warming its models"""
+
+    def __init__(self):
+        self.status = 'starting'
+        self.error = None
+        self.models: Dict[str, Dict[int, float]] = {}
+        self.started_at = datetime.now().isoformat()
+        self.ready_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status == 'ready'
+
+    def set_status(self, status: str, error: Optional[str] = None):
+        with self._lock:
+            self.status = status
+            self.error = error
+            if status == 'ready':
+                self.ready_at = datetime.now().isoformat()
+
+    def record(self, model_path: str, latencies: Dict[int, float]):
+        with self._lock:
+            self.models[model_path] = latencies
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'status': self.status,
+                'ready': self.status == 'ready',
+                'error': self.error,
+                'started_at': self.started_at,
+                'ready_at': self.ready_at,
+                'warm_latency_ms': dict(self.models)
+            }
+
+
+# Process-wide readiness state
+readiness = Readiness()
+
+
+def preload_model_paths() -> List[str]:
+    """Resolve Config.PRELOAD_MODELS to existing model paths"""
+    paths = []
+    for model in Config.PRELOAD_MODELS:
+        path = resolve_model_path(model)
+        if path is None:
+            print(f"Skipping preload, model not found: {model}")
+            continue
+        paths.append(path)
+    return paths
+
+
+def warm_up(sizes: Optional[List[int]] = None):
+    """Load the default and preload models, then warm each at every size"""
+    try:
+        readiness.set_status('loading')
+        service = get_detection_service()
+        if service.pool is None:
+            raise RuntimeError(f'Could not load default model: {service.model_path}')
+
+        models = [service.model_path] + [m for m in preload_model_paths() if m != service.model_path]
+        for model in models[1:]:
+            service.get_pool(model)
+
+        readiness.set_status('warming')
+        for model in models:
+            latencies = service.warmup(model, sizes)
+            readiness.record(model, latencies)
+            print(f"Warmed up {model}: {latencies} ms")
+
+        readiness.set_status('ready')
+    except Exception as e:
+        print(f"Warmup failed: {e}")
+        readiness.set_status('failed', str(e))
+
+
+def start_warmup(background: bool = True) -> Optional[threading.Thread]:
+    """
+    Start eager model loading and warmup
+
+    Args:
+        background: Run in a daemon thread so the server can answer health checks meanwhile
+
+    Returns:
+        Warmup thread, or None when run synchronously
+    """
+    if not background:
+        warm_up()
+        return None
+
+    thread = threading.Thread(target=warm_up, name='model-warmup', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,141 @@
+"""
+Deferred Render Store
+Keeps detections for annotated output images and renders them on first request
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+from app.services.file_writer import AsyncFileWriter
+from app.utils.renderer import DetectionRenderer, image_renderer
+
+
+class DeferredRenderStore:
+    """
+    Defers drawing and encoding annotated images until they are requested
+
+    Detection requests only write a small sidecar next to the output path
+    (source image path plus detection arrays). The first request for the
+    output file renders it from the source image, writes the JPEG and
+    removes the sidecar, so later requests are served from disk.
+    """
+
+    SUFFIX = '.pending.npz'
+
+    def __init__(self, renderer: DetectionRenderer = image_renderer, writer: Optional[AsyncFileWriter] = None):
+        """
+        Initialize render store
+
+        Args:
+            renderer: Renderer used to draw the annotated images
+            writer: Writer that may still be persisting source images
+        """
+        self.renderer = renderer
+        self.writer = writer
+        self.stats = {'deferred': 0, 'rendered': 0, 'errors': 0}
+        # Striped locks: renders of the same path are serialized without a per-path lock map
+        self._render_locks = [threading.Lock() for _ in range(64)]
+        self._lock = threading.Lock()
+
+    def pending_path(self, output_path: str) -> str:
+        """Sidecar path holding the detections for an output image"""
+        return output_path + self.SUFFIX
+
+    def is_pending(self, output_path: str) -> bool:
+        """Check whether an output image is waiting to be rendered"""
+        return os.path.exists(self.pending_path(output_path))
+
+    def defer(
+        self,
+        output_path: str,
+        source_path: str,
+        xyxy: np.ndarray,
+        conf: np.ndarray,
+        cls: np.ndarray,
+        names: Dict[int, str]
+    ):
+        """
+        Record detections so output_path can be rendered later
+
+        Args:
+            output_path: Where the annotated image will be written
+            source_path: Original image to draw on
+            xyxy: Box coordinates [N, 4]
+            conf: Confidences [N]
+            cls: Class ids [N]
+            names: Mapping of class id to class name
+        """
+        # A stale render of the same path must not shadow the new detections
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+        labels = np.array([names[c] for c in np.asarray(cls).tolist()], dtype=str)
+        path = self.pending_path(output_path)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, source=np.array(source_path), xyxy=xyxy, conf=conf, labels=labels)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.stats['deferred'] += 1
+
+    def render(self, output_path: str) -> Optional[str]:
+        """
+        Render a pending output image (concurrent callers render it once)
+
+        Args:
+            output_path: Path of the annotated image
+
+        Returns:
+            output_path if the image exists after the call, None otherwise
+        """
+        lock = self._render_locks[hash(output_path) % len(self._render_locks)]
+        try:
+            with lock:
+                if os.path.exists(output_path):
+                    return output_path
+
+                pending = self.pending_path(output_path)
+                if not os.path.exists(pending):
+                    return None
+
+                with np.load(pending) as data:
+                    source = str(data['source'])
+                    xyxy, conf, labels = data['xyxy'], data['conf'], data['labels']
+
+                # The original upload may still be in flight on the async writer
+                if self.writer is not None:
+                    self.writer.wait(source, timeout=30)
+                image = cv2.imread(source)
+                if image is None:
+                    raise ValueError(f'Source image not found: {source}')
+
+                labels = [f"{name}: {score:.2f}" for name, score in zip(labels.tolist(), conf.tolist())]
+                self.renderer.draw(image, xyxy, conf, np.zeros(len(conf), dtype=np.int64), {}, labels=labels)
+
+                ext = os.path.splitext(output_path)[1] or '.jpg'
+                ok, buffer = cv2.imencode(ext, image)
+                if not ok:
+                    raise ValueError(f'Could not encode {output_path}')
+                tmp_path = f'{output_path}.{threading.get_ident()}.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(buffer.tobytes())
+                os.replace(tmp_path, output_path)
+                os.remove(pending)
+
+                with self._lock:
+                    self.stats['rendered'] += 1
+                return output_path
+        except Exception as e:
+            print(f"Error rendering {output_path}: {e}")
+            with self._lock:
+                self.stats['errors'] += 1
+            return None
+
+    def get_stats(self) -> Dict:
+        """Get render statistics"""
+        with self._lock:
+            return dict(self.stats)
@@ -0,0 +1,230 @@
+"""
+Detection Result Cache
+Content-addressed LRU cache for detection arrays with single-flight deduplication
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+CacheValue = Dict[str, np.ndarray]
+
+
+class ResultCache:
+    """
+    LRU cache of detection results keyed by image content, model and parameters
+
+    Values are small dicts of NumPy arrays. Memory use is bounded by a byte
+    budget; an optional on-disk tier keeps evicted results across restarts.
+    Concurrent misses for the same key share one computation.
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None, disk_max_bytes: int = 0):
+        """
+        Initialize result cache
+
+        Args:
+            max_bytes: Memory budget in bytes
+            disk_dir: Directory for the on-disk tier (None disables it)
+            disk_max_bytes: Disk tier budget in bytes (0 = unlimited)
+        """
+        self.max_bytes = max(int(max_bytes), 0)
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = max(int(disk_max_bytes), 0)
+        self.stats = {
+            'hits': 0, 'disk_hits': 0, 'misses': 0,
+            'inflight_joins': 0, 'evictions': 0, 'errors': 0
+        }
+
+        self._entries: 'OrderedDict[str, Tuple[CacheValue, int]]' = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[str, Future] = {}
+        self._disk_writes = 0
+        self._lock = threading.Lock()
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(content: bytes, model_id: str, params: Dict) -> str:
+        """
+        Build a cache key from image bytes, model identity and inference parameters
+
+        Args:
+            content: Raw image bytes
+            model_id: Identity of the model (path plus version information)
+            params: Inference parameters that affect the result
+
+        Returns:
+            Hex digest key
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        meta = json.dumps({'model': model_id, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha256(f'{digest}:{meta}'.encode('utf-8')).hexdigest()
+
+    def get_or_compute(self, key: str, compute: Callable[[], CacheValue]) -> Tuple[CacheValue, bool]:
+        """
+        Return the cached value for key, computing it once on a miss
+
+        Args:
+            key: Cache key from make_key()
+            compute: Callable producing the value on a miss
+
+        Returns:
+            Tuple of (value, cached) where cached is True if no computation ran for this caller
+        """
+        owner = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[0], True
+
+            future = self._inflight.get(key)
+            if future is None:
+                future = Future()
+                self._inflight[key] = future
+                owner = True
+            else:
+                self.stats['inflight_joins'] += 1
+
+        if not owner:
+            return future.result(), True
+
+        try:
+            value = self._load_disk(key)
+            if value is not None:
+                with self._lock:
+                    self.stats['disk_hits'] += 1
+                cached = True
+            else:
+                with self._lock:
+                    self.stats['misses'] += 1
+                value = compute()
+                self._freeze(value)
+                self._store_disk(key, value)
+                cached = False
+
+            self._put(key, value)
+            future.set_result(value)
+            return value, cached
+        except Exception as e:
+            with self._lock:
+                self.stats['errors'] += 1
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def clear(self):
+        """Drop all in-memory entries (the disk tier is kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        with self._lock:
+            stats = dict(self.stats)
+            entries = len(self._entries)
+            used = self._bytes
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses'] + stats['inflight_joins']
+        hits = stats['hits'] + stats['disk_hits'] + stats['inflight_joins']
+        return {
+            **stats,
+            'entries': entries,
+            'bytes': used,
+            'max_bytes': self.max_bytes,
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            'disk_tier': bool(self.disk_dir)
+        }
+
+    @staticmethod
+    def _freeze(value: CacheValue):
+        """Make cached arrays read-only since they are shared between callers"""
+        for array in value.values():
+            array.setflags(write=False)
+
+    @staticmethod
+    def _size(value: CacheValue) -> int:
+        return sum(array.nbytes for array in value.values()) + 256
+
+    def _put(self, key: str, value: CacheValue):
+        size = self._size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats['evictions'] += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f'{key}.npz')
+
+    def _load_disk(self, key: str) -> Optional[CacheValue]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                value = {name: data[name] for name in data.files}
+            self._freeze(value)
+            return value
+        except Exception as e:
+            print(f"Discarding unreadable cache file {path}: {e}")
+            return None
+
+    def _store_disk(self, key: str, value: CacheValue):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **value)
+            os.replace(tmp_path, path)
+            self._disk_writes += 1
+            # Walking the directory is not free, so the budget is enforced periodically
+            if self.disk_max_bytes and self._disk_writes % 100 == 1:
+                self._prune_disk()
+        except Exception as e:
+            print(f"Could not write cache file {path}: {e}")
+
+    def _prune_disk(self):
+        """Delete the oldest disk entries once the disk tier exceeds its budget"""
+        files = []
+        total = 0
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if name.endswith('.npz'):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    files.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+        if total <= self.disk_max_bytes:
+            return
+        for _, size, path in sorted(files):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.disk_max_bytes:
+                break
@@ -0,0 +1,261 @@
+"""
+Video Pipeline
+Overlapped decode -> batched inference -> annotate/encode for recorded video files
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import cv2
+
+from app.config import Config
+from app.utils.detections import build_detections
+from app.utils.renderer import DetectionRenderer, frame_renderer
+
+# Marks the end of a stage's output
+_END = object()
+
+
+class VideoPipeline:
+    """
+    Processes a video file with three overlapping stages
+
+    A decode thread reads frames, the calling thread groups them into
+    batches for one forward pass each, and an encode thread draws the boxes
+    and writes the annotated video. Stages are connected by bounded queues,
+    so a slow stage applies backpressure instead of buffering the whole video.
+    """
+
+    def __init__(
+        self,
+        service,
+        source_path: str,
+        output_path: str,
+        detections_path: Optional[str] = None,
+        conf: Optional[float] = None,
+        model: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        renderer: DetectionRenderer = frame_renderer
+    ):
+        """
+        Initialize video pipeline
+
+        Args:
+            service: DetectionService used for inference
+            source_path: Input video file
+            output_path: Annotated output video file
+            detections_path: Optional JSON Lines file with one line of detections per frame
+            conf: Confidence threshold (uses the service default if None)
+            model: Model path to use (uses the default model if None)
+            batch_size: Frames per forward pass (uses Config if None)
+            queue_size: Capacity of each inter-stage queue (uses Config if None)
+            renderer: Renderer used to annotate frames
+        """
+        self.service = service
+        self.source_path = source_path
+        self.output_path = output_path
+        self.detections_path = detections_path
+        self.conf = conf
+        self.model = model
+        self.batch_size = max(1, batch_size or Config.VIDEO_BATCH_SIZE)
+        self.queue_size = max(1, queue_size or Config.VIDEO_QUEUE_SIZE)
+        self.renderer = renderer
+
+        self.stats = {'frames': 0, 'detections': 0, 'batches': 0, 'decode_s': 0.0, 'inference_s': 0.0, 'encode_s': 0.0}
+        self._frames: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._results: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def run(
+        self,
+        on_frame: Optional[Callable[[int, float, List[Dict]], None]] = None,
+        on_progress: Optional[Callable[[float], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> Dict:
+        """
+        Process the whole video
+
+        Args:
+            on_frame: Called from the encode thread with (frame_index, timestamp_s, detections)
+            on_progress: Called with the fraction of frames processed
+            should_stop: Polled between batches; returning True aborts the run
+
+        Returns:
+            Summary with frame counts, processed FPS and stage timings
+        """
+        cap = cv2.VideoCapture(self.source_path)
+        if not cap.isOpened():
+            raise ValueError(f'Cannot open video: {self.source_path}')
+
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+        self.stats['total_frames'] = total
+
+        writer = self._open_writer(fps, width, height)
+        names = self.service.get_pool(self.model).names
+        start_time = time.time()
+
+        decoder = threading.Thread(target=self._guard, args=(self._decode, cap), name='video-decode', daemon=True)
+        encoder = threading.Thread(
+            target=self._guard, args=(self._encode, writer, names, fps, on_frame), name='video-encode', daemon=True
+        )
+        decoder.start()
+        encoder.start()
+
+        cancelled = False
+        try:
+            cancelled = self._infer(total, on_progress, should_stop)
+        except BaseException as e:
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            self._put(self._results, _END)
+            decoder.join()
+            encoder.join()
+            cap.release()
+            writer.release()
+
+        if self._errors:
+            raise self._errors[0]
+
+        elapsed = time.time() - start_time
+        return {
+            'output': self.output_path,
+            'detections_file': self.detections_path,
+            'frames': self.stats['frames'],
+            'total_frames': total,
+            'detections': self.stats['detections'],
+            'batches': self.stats['batches'],
+            'source_fps': round(fps, 2),
+            'processed_fps': round(self.stats['frames'] / elapsed, 2) if elapsed > 0 else 0.0,
+            'elapsed': round(elapsed, 3),
+            'stage_seconds': {
+                'decode': round(self.stats['decode_s'], 3),
+                'inference': round(self.stats['inference_s'], 3),
+                'encode': round(self.stats['encode_s'], 3)
+            },
+            'cancelled': cancelled
+        }
+
+    def _open_writer(self, fps: float, width: int, height: int) -> cv2.VideoWriter:
+        """Open the output video, preferring H.264 (browser playable) over MPEG-4 Part 2"""
+        for codec in ('avc1', 'mp4v'):
+            writer = cv2.VideoWriter(self.output_path, cv2.VideoWriter_fourcc(*codec), fps, (width, height))
+            if writer.isOpened():
+                return writer
+            writer.release()
+        raise RuntimeError(f'Cannot open video writer: {self.output_path}')
+
+    def _guard(self, target: Callable, *args):
+        """Run a stage, recording its exception and stopping the other stages"""
+        try:
+            target(*args)
+        except BaseException as e:
+            self._errors.append(e)
+            self._stop.set()
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Put with backpressure, giving up once the pipeline is stopping"""
+        while True:
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if self._stop.is_set() and item is not _END:
+                    return False
+                if self._stop.is_set():
+                    # Make room for the end marker so the consumer can exit
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def _decode(self, cap: cv2.VideoCapture):
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                ok, frame = cap.read()
+                self.stats['decode_s'] += time.perf_counter() - start
+                if not ok:
+                    break
+                if not self._put(self._frames, frame):
+                    break
+        finally:
+            self._put(self._frames, _END)
+
+    def _infer(
+        self,
+        total: Optional[int],
+        on_progress: Optional[Callable[[float], None]],
+        should_stop: Optional[Callable[[], bool]]
+    ) -> bool:
+        """Group decoded frames into batches and run them through the model; returns True if cancelled"""
+        index = 0
+        done = False
+        while not done:
+            if should_stop is not None and should_stop():
+                self._stop.set()
+                return True
+            if self._stop.is_set():
+                return False
+
+            frame = self._frames.get()
+            if frame is _END:
+                break
+            batch = [frame]
+            while len(batch) < self.batch_size:
+                try:
+                    frame = self._frames.get_nowait()
+                except queue.Empty:
+                    break
+                if frame is _END:
+                    done = True
+                    break
+                batch.append(frame)
+
+            start = time.perf_counter()
+            results = self.service.predict_batch(batch, conf=self.conf, model=self.model, background=True)
+            self.stats['inference_s'] += time.perf_counter() - start
+            self.stats['batches'] += 1
+
+            for frame, result in zip(batch, results):
+                if not self._put(self._results, (index, frame, result)):
+                    return False
+                index += 1
+
+            if on_progress is not None and total:
+                on_progress(min(index / total, 1.0))
+        return False
+
+    def _encode(self, writer: cv2.VideoWriter, names: Dict[int, str], fps: float, on_frame):
+        sidecar = open(self.detections_path, 'w') if self.detections_path else None
+        try:
+            while True:
+                item = self._results.get()
+                if item is _END:
+                    break
+                index, frame, (xyxy, confs, cls_ids) = item
+
+                start = time.perf_counter()
+                self.renderer.draw(frame, xyxy, confs, cls_ids, names)
+                writer.write(frame)
+                detections = build_detections(xyxy, confs, cls_ids, names, include_size=False)
+                timestamp = round(index / fps, 3)
+                if sidecar is not None:
+                    sidecar.write(json.dumps({'frame': index, 'time': timestamp, 'detections': detections}) + '\n')
+                self.stats['encode_s'] += time.perf_counter() - start
+
+                self.stats['frames'] += 1
+                self.stats['detections'] += len(detections)
+                if on_frame is not None:
+                    on_frame(index, timestamp, detections)
+        finally:
+            if sidecar is not None:
+                sidecar.close()
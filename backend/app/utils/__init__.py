@@ -1,4 +1,17 @@
 """Utils package"""
-from .validators import allowed_file, validate_image, validate_confidence, validate_camera_index
+from .validators import (
+    allowed_file, validate_image, validate_confidence, validate_camera_index, resolve_model_path, decode_image,
+    resolve_folder_path, resolve_video_path
+)
+from .detections import boxes_to_arrays, build_detections, class_mask, filter_arrays, box_iou, nms, batched_nms
+from .renderer import DetectionRenderer
+from .tracker import BoxTracker
+from .motion import MotionGate
+from .stream_control import StreamController
 
-__all__ = ['allowed_file', 'validate_image', 'validate_confidence', 'validate_camera_index']
+__all__ = [
+    'allowed_file', 'validate_image', 'validate_confidence', 'validate_camera_index', 'resolve_model_path',
+    'decode_image', 'resolve_folder_path', 'resolve_video_path',
+    'boxes_to_arrays', 'build_detections', 'class_mask', 'filter_arrays', 'box_iou', 'nms', 'batched_nms',
+    'DetectionRenderer', 'BoxTracker', 'MotionGate', 'StreamController'
+]
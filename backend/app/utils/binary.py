@@ -0,0 +1,98 @@
+"""
+Binary response encoding
+Compact msgpack and multipart payloads for the raw image endpoints
+"""
+
+import json
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+MSGPACK_MIMETYPE = 'application/x-msgpack'
+BINARY_FORMATS = ('json', 'msgpack', 'multipart')
+
+
+def msgpack_available() -> bool:
+    """Check whether the optional msgpack dependency is installed"""
+    try:
+        import msgpack  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def pack_detections(detections: List[Dict]) -> Dict:
+    """
+    Convert detection dicts into packed little-endian arrays
+
+    Args:
+        detections: Detections from build_detections()
+
+    Returns:
+        Dictionary with 'boxes' (int32 [N, 4] x1, y1, x2, y2), 'conf' (float32 [N]),
+        'cls' (int32 [N]) as raw bytes, plus 'names' mapping each class id present
+        (as a string) to its name. When any detection carries a track_id (live
+        streams with the tracker), also 'track_id' (int32 [N], -1 for untracked boxes)
+    """
+    boxes = np.array(
+        [[d['bbox']['x1'], d['bbox']['y1'], d['bbox']['x2'], d['bbox']['y2']] for d in detections],
+        dtype='<i4'
+    ).reshape(-1, 4)
+    conf = np.array([d['confidence'] for d in detections], dtype='<f4')
+    cls = np.array([d['class_id'] for d in detections], dtype='<i4')
+    # String keys: msgpack.unpackb() rejects int map keys by default (strict_map_key)
+    names = {str(int(d['class_id'])): d['class_name'] for d in detections}
+    packed = {
+        'boxes': boxes.tobytes(),
+        'conf': conf.tobytes(),
+        'cls': cls.tobytes(),
+        'names': names
+    }
+    if any('track_id' in d for d in detections):
+        track_ids = np.array([d.get('track_id', -1) for d in detections], dtype='<i4')
+        packed['track_id'] = track_ids.tobytes()
+    return packed
+
+
+def encode_msgpack(payload: Dict) -> bytes:
+    """
+    Serialize a payload with msgpack
+
+    Raises:
+        RuntimeError: If msgpack is not installed
+    """
+    try:
+        import msgpack
+    except ImportError:
+        raise RuntimeError('msgpack is not installed (pip install msgpack)')
+    return msgpack.packb(payload, use_bin_type=True, strict_types=False)
+
+
+def encode_multipart(metadata: Dict, image: Optional[bytes] = None) -> Tuple[bytes, str]:
+    """
+    Build a multipart/mixed body with a JSON part and an optional JPEG part
+
+    Args:
+        metadata: JSON-serializable detection result
+        image: Encoded JPEG bytes
+
+    Returns:
+        Tuple of (body, content type including the boundary)
+    """
+    boundary = uuid.uuid4().hex
+    parts = [(b'application/json', b'result', json.dumps(metadata).encode('utf-8'))]
+    if image is not None:
+        parts.append((b'image/jpeg', b'image', image))
+
+    chunks = []
+    for content_type, name, data in parts:
+        chunks.append(
+            b'--' + boundary.encode('ascii') + b'\r\n'
+            b'Content-Type: ' + content_type + b'\r\n'
+            b'Content-Disposition: inline; name="' + name + b'"\r\n'
+            b'Content-Length: ' + str(len(data)).encode('ascii') + b'\r\n\r\n'
+            + data + b'\r\n'
+        )
+    chunks.append(b'--' + boundary.encode('ascii') + b'--\r\n')
+    return b''.join(chunks), f'multipart/mixed; boundary={boundary}'
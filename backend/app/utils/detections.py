@@ -0,0 +1,209 @@
+"""
+Detection post-processing utilities
+Converts raw model output into arrays and API detection dictionaries
+"""
+
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def empty_arrays() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return empty (xyxy, conf, cls) arrays"""
+    return (
+        np.zeros((0, 4), dtype=np.float32),
+        np.zeros((0,), dtype=np.float32),
+        np.zeros((0,), dtype=np.int64)
+    )
+
+
+def boxes_to_arrays(boxes) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pull box coordinates, confidences and class ids out of an ultralytics Boxes object
+
+    The whole box tensor is copied to the host once instead of reading every
+    box field separately.
+
+    Args:
+        boxes: ultralytics Boxes object (or None)
+
+    Returns:
+        Tuple of (xyxy [N, 4] float32, conf [N] float32, cls [N] int64)
+    """
+    if boxes is None or len(boxes) == 0:
+        return empty_arrays()
+
+    data = boxes.data
+    if hasattr(data, 'cpu'):
+        data = data.cpu().numpy()
+    data = np.asarray(data, dtype=np.float32)
+
+    # Layout is [x1, y1, x2, y2, (track_id,) conf, cls]
+    return (
+        np.ascontiguousarray(data[:, :4]),
+        np.ascontiguousarray(data[:, -2]),
+        data[:, -1].astype(np.int64)
+    )
+
+
+def class_mask(cls: np.ndarray, names: Dict[int, str], allowed: Iterable[str]) -> np.ndarray:
+    """
+    Build a boolean mask selecting detections whose class name is allowed
+
+    Args:
+        cls: Class ids [N]
+        names: Mapping of class id to class name
+        allowed: Class names to keep
+
+    Returns:
+        Boolean mask [N]
+    """
+    allowed = set(allowed)
+    size = max(max(names.keys(), default=-1), int(cls.max(initial=-1))) + 1
+    lookup = np.zeros(size, dtype=bool)
+    for cls_id, name in names.items():
+        lookup[cls_id] = name in allowed
+    return lookup[cls]
+
+
+def filter_arrays(
+    xyxy: np.ndarray,
+    conf: np.ndarray,
+    cls: np.ndarray,
+    mask: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Apply a boolean mask to (xyxy, conf, cls) arrays"""
+    return xyxy[mask], conf[mask], cls[mask]
+
+
+def build_detections(
+    xyxy: np.ndarray,
+    conf: np.ndarray,
+    cls: np.ndarray,
+    names: Dict[int, str],
+    include_size: bool = True,
+    track_ids: Optional[np.ndarray] = None
+) -> List[Dict]:
+    """
+    Build the API detection list from (xyxy, conf, cls) arrays
+
+    Args:
+        xyxy: Box coordinates [N, 4]
+        conf: Confidences [N]
+        cls: Class ids [N]
+        names: Mapping of class id to class name
+        include_size: Whether to add width/height to each bbox
+        track_ids: Optional tracker ids [N], added as track_id
+
+    Returns:
+        List of detection dictionaries
+    """
+    if len(conf) == 0:
+        return []
+    if track_ids is not None:
+        detections = build_detections(xyxy, conf, cls, names, include_size)
+        for detection, track_id in zip(detections, track_ids.tolist()):
+            detection['track_id'] = track_id
+        return detections
+
+    coords = xyxy.astype(np.int64)
+    boxes = coords.tolist()
+    confidences = np.round(conf.astype(np.float64), 3).tolist()
+    class_ids = cls.tolist()
+
+    if include_size:
+        sizes = (coords[:, 2:] - coords[:, :2]).tolist()
+        return [
+            {
+                'class_id': cls_id,
+                'class_name': names[cls_id],
+                'confidence': confidence,
+                'bbox': {
+                    'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2,
+                    'width': width, 'height': height
+                }
+            }
+            for cls_id, confidence, (x1, y1, x2, y2), (width, height)
+            in zip(class_ids, confidences, boxes, sizes)
+        ]
+
+    return [
+        {
+            'class_id': cls_id,
+            'class_name': names[cls_id],
+            'confidence': confidence,
+            'bbox': {'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2}
+        }
+        for cls_id, confidence, (x1, y1, x2, y2) in zip(class_ids, confidences, boxes)
+    ]
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise IoU between two sets of xyxy boxes
+
+    Args:
+        a: Boxes [N, 4]
+        b: Boxes [M, 4]
+
+    Returns:
+        IoU matrix [N, M]
+    """
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float64)
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(np.clip(a[:, 2:] - a[:, :2], 0, None), axis=1)
+    area_b = np.prod(np.clip(b[:, 2:] - b[:, :2], 0, None), axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float = 0.7) -> np.ndarray:
+    """
+    Greedy non-maximum suppression
+
+    Each step suppresses all remaining boxes overlapping the current best box
+    with one vectorized IoU computation.
+
+    Args:
+        boxes: Boxes in xyxy format [N, 4]
+        scores: Box scores [N]
+        iou_threshold: Boxes with IoU above this are suppressed
+
+    Returns:
+        Indices of kept boxes, highest score first
+    """
+    if len(scores) == 0:
+        return np.zeros((0,), dtype=np.int64)
+
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    order = np.argsort(-scores, kind='stable')
+
+    keep = []
+    while order.size > 0:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+
+        inter_w = np.clip(np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest]), 0, None)
+        inter = inter_w * inter_h
+        iou = inter / (areas[best] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+
+    return np.asarray(keep, dtype=np.int64)
+
+
+def batched_nms(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    cls: np.ndarray,
+    iou_threshold: float = 0.7
+) -> np.ndarray:
+    """Class-aware NMS: boxes of different classes never suppress each other"""
+    if len(scores) == 0:
+        return np.zeros((0,), dtype=np.int64)
+    # Shift each class into its own coordinate range so one NMS pass handles all classes
+    offset = float(boxes.max() - boxes.min()) + 1.0
+    return nms(boxes + (cls.astype(np.float32) * offset)[:, None], scores, iou_threshold)
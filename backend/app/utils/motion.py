@@ -0,0 +1,98 @@
+"""
+Motion gate
+Cheap frame differencing that decides whether a stream frame needs the model
+"""
+
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from app.config import Config
+
+
+class MotionGate:
+    """
+    Skips inference while the scene is static
+
+    Each frame is shrunk to a small grayscale thumbnail and compared with
+    the thumbnail of the last frame that went through the model. The model
+    runs again only when enough pixels changed, or when the last result is
+    older than max_stale seconds; otherwise the caller reuses the last
+    result stored with remember().
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        max_stale: Optional[float] = None,
+        pixel_delta: int = 25,
+        width: int = 64
+    ):
+        """
+        Initialize motion gate
+
+        Args:
+            threshold: Fraction of changed thumbnail pixels that counts as motion (uses Config if None)
+            max_stale: Maximum seconds a result is reused (uses Config if None)
+            pixel_delta: Gray level difference for a pixel to count as changed
+            width: Thumbnail width in pixels
+        """
+        self.threshold = threshold if threshold is not None else Config.MOTION_THRESHOLD
+        self.max_stale = max_stale if max_stale is not None else Config.MOTION_MAX_STALE_S
+        self.pixel_delta = pixel_delta
+        self.width = width
+
+        self.last = None
+        self.motion = 0.0
+        self.frames = 0
+        self.skipped = 0
+        self._reference: Optional[np.ndarray] = None
+        self._pending: Optional[np.ndarray] = None
+        self._last_run = 0.0
+
+    def should_run(self, frame: np.ndarray) -> bool:
+        """
+        Whether the model has to run on this frame
+
+        Args:
+            frame: BGR frame
+
+        Returns:
+            False when the scene matches the last processed frame and self.last can be reused
+        """
+        self.frames += 1
+        height, width = frame.shape[:2]
+        size = (self.width, max(1, round(height * self.width / width)))
+        thumb = cv2.cvtColor(cv2.resize(frame, size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        self._pending = cv2.GaussianBlur(thumb, (3, 3), 0)
+
+        if self.last is None or self._reference is None or self._reference.shape != self._pending.shape:
+            return True
+        self.motion = float(np.count_nonzero(cv2.absdiff(self._pending, self._reference) > self.pixel_delta)) / self._pending.size
+        if self.motion > self.threshold or time.monotonic() - self._last_run > self.max_stale:
+            return True
+
+        self.skipped += 1
+        return False
+
+    def remember(self, result):
+        """Store the model result for the frame last passed to should_run()"""
+        self.last = result
+        self._reference = self._pending
+        self._last_run = time.monotonic()
+
+    def reset(self):
+        """Forget the stored result so the next frame runs the model"""
+        self.last = None
+        self._reference = None
+
+    def get_stats(self) -> dict:
+        """Frames seen, frames skipped and the latest motion score"""
+        return {
+            'frames': self.frames,
+            'skipped': self.skipped,
+            'skip_ratio': round(self.skipped / self.frames, 3) if self.frames else 0.0,
+            'motion': round(self.motion, 4)
+        }
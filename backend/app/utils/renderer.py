@@ -0,0 +1,144 @@
+"""
+Detection renderer
+Draws bounding boxes and labels for every entry point (API, stream, CLI)
+"""
+
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+Color = Tuple[int, int, int]
+
+
+class DetectionRenderer:
+    """
+    Draws detections onto BGR images
+
+    All boxes of one color are drawn with a single cv2.polylines call (and
+    their label backgrounds with a single cv2.fillPoly call). Label text
+    sizes are measured once per label and cached.
+    """
+
+    def __init__(
+        self,
+        color: Color = (0, 255, 0),
+        text_color: Optional[Color] = (0, 0, 0),
+        font_scale: float = 0.6,
+        thickness: int = 2,
+        label_background: bool = True,
+        label_offset: int = 5,
+        cache_size: int = 8192
+    ):
+        """
+        Initialize renderer
+
+        Args:
+            color: Default box color (BGR)
+            text_color: Label text color; None draws text in the box color
+            font_scale: Label font scale
+            thickness: Box and text line thickness
+            label_background: Whether to draw a filled box behind each label
+            label_offset: Distance between the text baseline and the box top
+            cache_size: Maximum number of cached label sizes
+        """
+        self.color = color
+        self.text_color = text_color
+        self.font = cv2.FONT_HERSHEY_SIMPLEX
+        self.font_scale = font_scale
+        self.thickness = thickness
+        self.label_background = label_background
+        self.label_offset = label_offset
+        self.cache_size = cache_size
+
+        self._text_sizes: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def text_size(self, label: str) -> Tuple[int, int]:
+        """Get (width, height) of a label, measured once and cached"""
+        size = self._text_sizes.get(label)
+        if size is None:
+            size = cv2.getTextSize(label, self.font, self.font_scale, self.thickness)[0]
+            with self._lock:
+                if len(self._text_sizes) >= self.cache_size:
+                    self._text_sizes.clear()
+                self._text_sizes[label] = size
+        return size
+
+    def draw(
+        self,
+        image: np.ndarray,
+        xyxy: np.ndarray,
+        conf: np.ndarray,
+        cls: np.ndarray,
+        names: Dict[int, str],
+        colors: Optional[Sequence[Color]] = None,
+        labels: Optional[Sequence[str]] = None
+    ) -> np.ndarray:
+        """
+        Draw detections onto an image in place
+
+        Args:
+            image: BGR image to draw on
+            xyxy: Box coordinates [N, 4]
+            conf: Confidences [N]
+            cls: Class ids [N]
+            names: Mapping of class id to class name
+            colors: Optional per-detection colors (defaults to self.color)
+            labels: Optional per-detection label text (defaults to "name: conf")
+
+        Returns:
+            The same image
+        """
+        count = len(conf)
+        if count == 0:
+            return image
+
+        boxes = np.asarray(xyxy).astype(np.int32)
+        if labels is None:
+            labels = [f"{names[c]}: {s:.2f}" for c, s in zip(np.asarray(cls).tolist(), np.asarray(conf).tolist())]
+        sizes = np.array([self.text_size(label) for label in labels], dtype=np.int32)
+
+        x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+        outlines = np.stack([
+            np.stack([x1, y1], axis=1), np.stack([x2, y1], axis=1),
+            np.stack([x2, y2], axis=1), np.stack([x1, y2], axis=1)
+        ], axis=1)
+
+        if colors is None:
+            groups = [(self.color, np.arange(count))]
+            box_colors = [self.color] * count
+        else:
+            box_colors = [tuple(int(v) for v in color) for color in colors]
+            palette, inverse = np.unique(np.asarray(box_colors, dtype=np.int32), axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            groups = [
+                (tuple(int(v) for v in color), np.flatnonzero(inverse == i))
+                for i, color in enumerate(palette)
+            ]
+
+        for color, index in groups:
+            cv2.polylines(image, list(outlines[index]), True, color, self.thickness)
+
+        if self.label_background:
+            top = y1 - sizes[:, 1] - 2 * self.label_offset
+            right = x1 + sizes[:, 0]
+            backgrounds = np.stack([
+                np.stack([x1, top], axis=1), np.stack([right, top], axis=1),
+                np.stack([right, y1], axis=1), np.stack([x1, y1], axis=1)
+            ], axis=1)
+            for color, index in groups:
+                cv2.fillPoly(image, list(backgrounds[index]), color)
+
+        origins = np.stack([x1, y1 - self.label_offset], axis=1).tolist()
+        for label, origin, box_color in zip(labels, origins, box_colors):
+            text_color = self.text_color if self.text_color is not None else box_color
+            cv2.putText(image, label, tuple(origin), self.font, self.font_scale, text_color, self.thickness)
+
+        return image
+
+
+# Shared renderers: labelled boxes for images, lighter style for video frames
+image_renderer = DetectionRenderer()
+frame_renderer = DetectionRenderer(text_color=None, font_scale=0.5, label_background=False, label_offset=10)
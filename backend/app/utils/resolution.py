@@ -0,0 +1,111 @@
+"""
+Input resolution selection
+Validates requested inference sizes and shrinks them to meet measured latency budgets
+"""
+
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from app.config import Config
+
+# Objects smaller than this after resizing to the inference size are rarely detected
+MIN_DETECTABLE_PX = 16
+
+# Model input sizes must be multiples of the largest stride
+SIZE_STRIDE = 32
+
+# Input size ultralytics runs when none is given
+DEFAULT_IMGSZ = 640
+
+Imgsz = Union[int, str, None]
+
+
+def normalize_imgsz(value) -> Imgsz:
+    """
+    Validate a requested inference size
+
+    Args:
+        value: None/empty (model default), 'auto' (adaptive) or a size in pixels
+
+    Returns:
+        None, 'auto', or the size rounded up to a multiple of 32
+
+    Raises:
+        ValueError: If the size is not a number between 32 and 2048
+    """
+    if value is None or value == '':
+        return None
+    if str(value).lower() == 'auto':
+        return 'auto'
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("imgsz must be a number or 'auto'")
+    if not SIZE_STRIDE <= size <= 2048:
+        raise ValueError('imgsz must be between 32 and 2048')
+    return -(-size // SIZE_STRIDE) * SIZE_STRIDE
+
+
+def estimate_latency(size: int, latencies: Dict[int, float]) -> Optional[float]:
+    """
+    Warm forward latency for an input size
+
+    Sizes that were not measured are scaled from the nearest measured size,
+    assuming cost grows with the number of input pixels.
+
+    Args:
+        size: Square input size
+        latencies: Measured warm latency in ms per size (see DetectionService.warmup())
+
+    Returns:
+        Latency in milliseconds, or None if nothing was measured
+    """
+    if not latencies:
+        return None
+    if size in latencies:
+        return latencies[size]
+    nearest = min(latencies, key=lambda measured: abs(measured - size))
+    return latencies[nearest] * (size / nearest) ** 2
+
+
+def choose_imgsz(
+    image_shape: Tuple[int, ...],
+    latencies: Dict[int, float],
+    budget_ms: Optional[float] = None,
+    min_object_px: Optional[float] = None,
+    choices: Optional[Iterable[int]] = None,
+    native: Optional[int] = None
+) -> int:
+    """
+    Pick the inference size for imgsz=auto
+
+    Without a latency budget this is the model's native size. With one, the
+    largest candidate size whose measured (see estimate_latency()) forward
+    latency fits the budget is used, but never a size below the accuracy
+    floor. The floor is a heuristic, not a measured accuracy profile: the
+    size at which an object of min_object_px (in original image pixels)
+    still spans MIN_DETECTABLE_PX, capped at the image itself. When even the
+    floor misses the budget, the floor wins.
+
+    Args:
+        image_shape: Shape of the image (height, width, ...)
+        latencies: Measured warm latency in ms per size
+        budget_ms: Latency budget for the forward pass (no limit if None)
+        min_object_px: Smallest object of interest in image pixels (uses Config if None)
+        choices: Candidate sizes below the native size (uses Config.IMGSZ_CHOICES if None)
+        native: Native input size of the model (uses DEFAULT_IMGSZ if None)
+
+    Returns:
+        Inference size in pixels
+    """
+    native = native or DEFAULT_IMGSZ
+    if budget_ms is None or not latencies:
+        return native
+
+    sizes = sorted({choice for choice in (choices or Config.IMGSZ_CHOICES) if choice < native} | {native})
+    min_object_px = min_object_px or Config.ADAPTIVE_MIN_OBJECT_PX
+    long_side = max(image_shape[:2])
+    needed = min(long_side, long_side * MIN_DETECTABLE_PX / min_object_px)
+    floor = next((size for size in sizes if size >= needed), native)
+
+    within = [size for size in sizes if size >= floor and estimate_latency(size, latencies) <= budget_ms]
+    return within[-1] if within else floor
@@ -0,0 +1,198 @@
+"""
+Stream controller
+Feedback loop that keeps a live stream within a target frame rate and latency
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from app.config import Config
+
+# Upgrades must fit the targets with this much margin, which keeps the
+# controller from bouncing between two settings
+HEADROOM = 0.8
+
+QUALITY_STEP = 10
+
+
+class StreamController:
+    """
+    Tunes frame skip, input size and JPEG quality of a live stream at runtime
+
+    Frame skip paces processing to the target FPS, so a fast machine does
+    not run the model more often than the viewer needs. Input size and JPEG
+    quality move one step per interval: down while the slowest stage or the
+    capture-to-encode latency misses a target, back up while the predicted
+    cost of the next step still fits. Timings are the worst seen in each
+    interval, so cheap tracker or motion-gated frames do not hide the cost
+    of a real detector run.
+    """
+
+    def __init__(
+        self,
+        target_fps: Optional[float] = None,
+        target_latency_ms: Optional[float] = None,
+        sizes: Optional[list] = None,
+        max_quality: Optional[int] = None,
+        min_quality: Optional[int] = None,
+        interval: Optional[float] = None
+    ):
+        """
+        Initialize stream controller
+
+        Args:
+            target_fps: Frames per second the viewer needs (no FPS target if None)
+            target_latency_ms: Maximum capture-to-encode latency (no latency target if None)
+            sizes: Input sizes to choose from (uses Config.IMGSZ_CHOICES if None)
+            max_quality: Highest JPEG quality (uses Config if None)
+            min_quality: Lowest JPEG quality (uses Config if None)
+            interval: Seconds between adjustments (uses Config if None)
+        """
+        self.target_fps = target_fps or None
+        self.target_latency_ms = target_latency_ms or None
+        self.sizes = sorted(set(sizes or Config.IMGSZ_CHOICES))
+        self.max_quality = max_quality or Config.STREAM_JPEG_QUALITY
+        self.min_quality = min(min_quality or Config.STREAM_MIN_JPEG_QUALITY, self.max_quality)
+        self.interval = interval if interval is not None else Config.STREAM_CONTROL_INTERVAL_S
+
+        # Start at full quality and only degrade when measurements ask for it
+        self.size_index = len(self.sizes) - 1
+        self.quality = self.max_quality
+        self.skip = 1
+        self.adjustments = 0
+        self.skipped = 0
+
+        self.source_fps = 0.0
+        self.inference_ms = 0.0
+        self.encode_ms = 0.0
+        self.latency_ms = 0.0
+        self._window = {'inference_ms': 0.0, 'encode_ms': 0.0, 'latency_ms': 0.0, 'frames': 0}
+        self._seen: Optional[tuple] = None     # (seq, time) of the last captured frame seen
+        self._processed_seq = 0
+        self._next_adjust = time.monotonic() + self.interval
+        self._lock = threading.Lock()
+
+    def use_sizes(self, sizes: list):
+        """
+        Restrict the input sizes to the ones the model actually runs
+
+        A backend with a fixed input shape (a static ONNX export) maps every
+        size to one, which leaves resolution out of the control loop.
+
+        Args:
+            sizes: Input sizes the backend honours
+        """
+        with self._lock:
+            self.sizes = sorted(set(sizes))
+            self.size_index = len(self.sizes) - 1
+
+    @property
+    def imgsz(self) -> int:
+        """Current inference size"""
+        return self.sizes[self.size_index]
+
+    def should_process(self, seq: int) -> bool:
+        """
+        Whether a captured frame should go through inference
+
+        Also measures the source frame rate from the capture sequence numbers.
+
+        Args:
+            seq: Capture sequence number of the frame
+
+        Returns:
+            False for frames skipped to pace the stream to the target FPS
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._seen is not None and seq > self._seen[0] and now > self._seen[1]:
+                fps = (seq - self._seen[0]) / (now - self._seen[1])
+                self.source_fps = fps if self.source_fps == 0 else 0.8 * self.source_fps + 0.2 * fps
+            self._seen = (seq, now)
+
+            if self._processed_seq and seq - self._processed_seq < self.skip:
+                self.skipped += 1
+                return False
+            self._processed_seq = seq
+            return True
+
+    def record_inference(self, inference_ms: float):
+        """Report the time one frame spent in the inference stage"""
+        with self._lock:
+            self._window['inference_ms'] = max(self._window['inference_ms'], inference_ms)
+
+    def record_frame(self, encode_ms: float, latency_ms: float):
+        """
+        Report an encoded frame and adjust the settings once per interval
+
+        Args:
+            encode_ms: Time spent encoding the frame
+            latency_ms: Time from capture to encoded frame
+        """
+        with self._lock:
+            window = self._window
+            window['encode_ms'] = max(window['encode_ms'], encode_ms)
+            window['latency_ms'] = max(window['latency_ms'], latency_ms)
+            window['frames'] += 1
+
+            now = time.monotonic()
+            if now < self._next_adjust:
+                return
+            self.inference_ms, self.encode_ms, self.latency_ms = (
+                window['inference_ms'], window['encode_ms'], window['latency_ms']
+            )
+            self._window = {'inference_ms': 0.0, 'encode_ms': 0.0, 'latency_ms': 0.0, 'frames': 0}
+            self._next_adjust = now + self.interval
+            self._adjust()
+
+    def get_stats(self) -> Dict:
+        """Targets, current settings and the timings they were chosen from"""
+        return {
+            'target_fps': self.target_fps,
+            'target_latency_ms': self.target_latency_ms,
+            'skip': self.skip,
+            'imgsz': self.imgsz,
+            'quality': self.quality,
+            'source_fps': round(self.source_fps, 2),
+            'worst_inference_ms': round(self.inference_ms, 2),
+            'worst_encode_ms': round(self.encode_ms, 2),
+            'worst_latency_ms': round(self.latency_ms, 2),
+            'skipped': self.skipped,
+            'adjustments': self.adjustments
+        }
+
+    def _fits(self, inference_ms: float, latency_ms: float, margin: float = 1.0) -> bool:
+        """Whether the given timings meet every target, scaled by margin"""
+        stage_ms = max(inference_ms, self.encode_ms)
+        if self.target_fps and stage_ms * self.target_fps > 1000.0 * margin:
+            return False
+        if self.target_latency_ms and latency_ms > self.target_latency_ms * margin:
+            return False
+        return True
+
+    def _adjust(self):
+        if self.target_fps and self.source_fps > 0:
+            # Process the share of captured frames closest to the target rate
+            self.skip = max(1, round(self.source_fps / self.target_fps))
+
+        settings = (self.size_index, self.quality)
+        if not self._fits(self.inference_ms, self.latency_ms):
+            encode_bound = self.encode_ms > self.inference_ms
+            if self.size_index > 0 and not (encode_bound and self.quality > self.min_quality):
+                self.size_index -= 1
+            elif encode_bound or len(self.sizes) > 1:
+                # With a fixed input size a slow model is left to frame skip
+                self.quality = max(self.min_quality, self.quality - QUALITY_STEP)
+        elif self.quality < self.max_quality:
+            if self._fits(self.inference_ms, self.latency_ms, HEADROOM):
+                self.quality = min(self.max_quality, self.quality + QUALITY_STEP)
+        elif self.size_index < len(self.sizes) - 1:
+            # Inference cost grows with the number of input pixels
+            growth = (self.sizes[self.size_index + 1] / self.imgsz) ** 2
+            extra = self.inference_ms * (growth - 1)
+            if self._fits(self.inference_ms + extra, self.latency_ms + extra, HEADROOM):
+                self.size_index += 1
+
+        if (self.size_index, self.quality) != settings:
+            self.adjustments += 1
@@ -0,0 +1,117 @@
+"""
+Sliced inference utilities
+Overlapping tile layout and cross-tile merging of detections
+"""
+
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from app.config import Config
+from app.utils.detections import batched_nms, box_iou
+
+TILE_MERGE_METHODS = ('nms', 'wbf')
+
+
+def tiling_options(
+    size: Optional[int] = None,
+    overlap: Optional[float] = None,
+    full_pass: Optional[bool] = None,
+    merge: Optional[str] = None,
+    iou: Optional[float] = None
+) -> Dict:
+    """
+    Complete tiled inference settings with the Config defaults
+
+    Raises:
+        ValueError: If a setting is out of range
+    """
+    options = {
+        'size': int(size if size is not None else Config.TILE_SIZE),
+        'overlap': float(overlap if overlap is not None else Config.TILE_OVERLAP),
+        'full_pass': bool(full_pass if full_pass is not None else Config.TILE_FULL_PASS),
+        'merge': (merge or Config.TILE_MERGE).lower(),
+        'iou': float(iou if iou is not None else Config.TILE_IOU)
+    }
+    if options['size'] < 32:
+        raise ValueError('tile_size must be at least 32')
+    if not 0.0 <= options['overlap'] < 0.9:
+        raise ValueError('tile_overlap must be between 0 and 0.9')
+    if options['merge'] not in TILE_MERGE_METHODS:
+        raise ValueError(f"tile_merge must be one of: {', '.join(TILE_MERGE_METHODS)}")
+    return options
+
+
+def tile_grid(height: int, width: int, tile_size: int, overlap: float) -> np.ndarray:
+    """
+    Lay out overlapping tiles that cover an image
+
+    Tiles have a fixed size; the last row and column are shifted back so
+    they end exactly at the image border instead of being padded.
+
+    Args:
+        height: Image height
+        width: Image width
+        tile_size: Tile edge length in pixels
+        overlap: Overlap between neighbouring tiles as a fraction of tile_size (0..0.9)
+
+    Returns:
+        Tile boxes [T, 4] as (x1, y1, x2, y2) integers
+    """
+    overlap = min(max(overlap, 0.0), 0.9)
+    stride = max(1, int(tile_size * (1 - overlap)))
+
+    def starts(length: int) -> np.ndarray:
+        if length <= tile_size:
+            return np.array([0])
+        positions = np.arange(0, length - tile_size, stride)
+        return np.unique(np.append(positions, length - tile_size))
+
+    ys, xs = starts(height), starts(width)
+    y1, x1 = np.meshgrid(ys, xs, indexing='ij')
+    y1, x1 = y1.ravel(), x1.ravel()
+    return np.stack([x1, y1, np.minimum(x1 + tile_size, width), np.minimum(y1 + tile_size, height)], axis=1)
+
+
+def merge_tile_detections(
+    xyxy: np.ndarray,
+    conf: np.ndarray,
+    cls: np.ndarray,
+    iou_threshold: float = 0.5,
+    method: str = 'wbf'
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Merge detections of overlapping tiles (and an optional full-image pass)
+
+    'nms' keeps the best box of each overlapping group. 'wbf' (weighted box
+    fusion) replaces each group by the confidence-weighted average of its
+    boxes, which keeps objects cut by a tile border from shrinking to the
+    visible part. Both are class aware and vectorized over all boxes.
+
+    Args:
+        xyxy: Boxes in full-image coordinates [N, 4]
+        conf: Confidences [N]
+        cls: Class ids [N]
+        iou_threshold: Boxes of the same class with IoU above this are merged
+        method: 'nms' or 'wbf'
+
+    Returns:
+        Merged (xyxy, conf, cls), highest confidence first
+    """
+    keep = batched_nms(xyxy, conf, cls, iou_threshold)
+    if method == 'nms' or len(keep) == 0:
+        return xyxy[keep], conf[keep], cls[keep]
+
+    # Assign every box to the kept box of its class it overlaps most
+    iou = box_iou(xyxy[keep], xyxy)
+    iou[cls[keep][:, None] != cls[None, :]] = 0.0
+    cluster = np.argmax(iou, axis=0)
+    member = iou[cluster, np.arange(len(conf))] > iou_threshold
+    member[keep] = True
+
+    weights = conf[member].astype(np.float64)
+    sums = np.zeros((len(keep), 4))
+    totals = np.zeros(len(keep))
+    np.add.at(sums, cluster[member], xyxy[member] * weights[:, None])
+    np.add.at(totals, cluster[member], weights)
+    fused = (sums / totals[:, None]).astype(np.float32)
+    return fused, conf[keep], cls[keep]
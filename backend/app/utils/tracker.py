@@ -0,0 +1,223 @@
+"""
+Multi-object tracker
+Carries detections between sparse detector runs with a constant-velocity Kalman filter
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+from app.config import Config
+from app.utils.detections import box_iou
+
+TrackArrays = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+# Constant-velocity model over (cx, cy, w, h): state is [cx, cy, w, h, vx, vy, vw, vh]
+_F = np.eye(8, dtype=np.float64)
+_F[:4, 4:] = np.eye(4)
+_H = np.eye(4, 8, dtype=np.float64)
+
+
+def _to_cxcywh(xyxy: np.ndarray) -> np.ndarray:
+    xyxy = xyxy.astype(np.float64)
+    return np.concatenate([(xyxy[:, :2] + xyxy[:, 2:]) / 2, xyxy[:, 2:] - xyxy[:, :2]], axis=1)
+
+
+def _to_xyxy(cxcywh: np.ndarray) -> np.ndarray:
+    half = np.clip(cxcywh[:, 2:4], 1.0, None) / 2
+    return np.concatenate([cxcywh[:, :2] - half, cxcywh[:, :2] + half], axis=1).astype(np.float32)
+
+
+class BoxTracker:
+    """
+    IoU-matched Kalman tracker for sparse inference
+
+    The detector only has to run when should_detect() says so; in between,
+    predict() moves every track along its estimated velocity and decays its
+    confidence. Track ids stay stable across detector runs, and a track
+    survives max_misses detector runs without a match before it is dropped.
+    All tracks are filtered together with batched numpy operations.
+    """
+
+    def __init__(
+        self,
+        detect_interval: Optional[int] = None,
+        iou_threshold: float = 0.3,
+        conf_decay: Optional[float] = None,
+        min_conf: Optional[float] = None,
+        max_misses: int = 1
+    ):
+        """
+        Initialize tracker
+
+        Args:
+            detect_interval: Run the detector at least every N frames (uses Config if None)
+            iou_threshold: Minimum IoU to match a detection to a track
+            conf_decay: Per-frame confidence decay of tracks between detector runs (uses Config if None)
+            min_conf: Run the detector early when a track's decayed confidence drops below this (uses Config if None)
+            max_misses: Detector runs a track may go unmatched before it is dropped
+        """
+        self.detect_interval = max(1, detect_interval or Config.TRACKER_DETECT_INTERVAL)
+        self.iou_threshold = iou_threshold
+        self.conf_decay = conf_decay if conf_decay is not None else Config.TRACKER_CONF_DECAY
+        self.min_conf = min_conf if min_conf is not None else Config.TRACKER_MIN_CONF
+        self.max_misses = max_misses
+
+        self._x = np.zeros((0, 8))          # Kalman state per track
+        self._p = np.zeros((0, 8, 8))       # Kalman covariance per track
+        self._ids = np.zeros((0,), dtype=np.int64)
+        self._cls = np.zeros((0,), dtype=np.int64)
+        self._conf = np.zeros((0,), dtype=np.float32)
+        self._misses = np.zeros((0,), dtype=np.int64)
+        self._next_id = 1
+        self._since_detect = 0
+        self.detector_runs = 0
+        self.predicted_frames = 0
+
+    def should_detect(self, conf: Optional[float] = None) -> bool:
+        """
+        Whether the next frame needs a detector run
+
+        Args:
+            conf: Confidence threshold of the caller; the detector runs before
+                any visible track would decay below it (or below min_conf)
+        """
+        if self.detector_runs == 0 or self._since_detect + 1 >= self.detect_interval:
+            return True
+        visible = self._misses == 0
+        if not visible.any():
+            return False
+        decayed = self._conf[visible] * self.conf_decay ** (self._since_detect + 1)
+        return bool((decayed < max(self.min_conf, conf or 0.0)).any())
+
+    def update(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray) -> TrackArrays:
+        """
+        Advance one frame and correct the tracks with detector output
+
+        Args:
+            xyxy: Detected boxes [N, 4]
+            conf: Confidences [N]
+            cls: Class ids [N]
+
+        Returns:
+            (xyxy, conf, cls, track_ids) of the tracks matched or created by these detections
+        """
+        self._predict()
+        self.detector_runs += 1
+        self._since_detect = 0
+
+        pairs = self._match(xyxy, cls)
+        track_idx = np.array([t for t, _ in pairs], dtype=np.int64)
+        det_idx = np.array([d for _, d in pairs], dtype=np.int64)
+        if len(pairs):
+            self._correct(track_idx, _to_cxcywh(xyxy[det_idx]))
+            self._conf[track_idx] = conf[det_idx]
+
+        # Tracks without a match are hidden until they match again or expire
+        self._misses += 1
+        self._misses[track_idx] = 0
+
+        new = np.setdiff1d(np.arange(len(conf)), det_idx)
+        if len(new):
+            self._spawn(xyxy[new], conf[new], cls[new])
+
+        keep = self._misses <= self.max_misses
+        self._select(keep)
+        return self._visible()
+
+    def predict(self, conf: Optional[float] = None) -> TrackArrays:
+        """
+        Advance one frame without a detector run
+
+        Args:
+            conf: Leave out tracks whose decayed confidence is below this threshold
+
+        Returns:
+            (xyxy, conf, cls, track_ids) of the visible tracks at their predicted positions
+        """
+        self._predict()
+        self._since_detect += 1
+        self.predicted_frames += 1
+        xyxy, confs, cls, ids = self._visible()
+        if conf is None:
+            return xyxy, confs, cls, ids
+        keep = confs >= conf
+        return xyxy[keep], confs[keep], cls[keep], ids[keep]
+
+    def reset(self):
+        """Drop all tracks and run the detector on the next frame"""
+        self._select(np.zeros(len(self._ids), dtype=bool))
+        self._since_detect = self.detect_interval
+
+    def get_stats(self) -> dict:
+        """Detector runs versus frames served from the tracker"""
+        frames = self.detector_runs + self.predicted_frames
+        return {
+            'tracks': int((self._misses == 0).sum()),
+            'detector_runs': self.detector_runs,
+            'tracked_frames': self.predicted_frames,
+            'detect_ratio': round(self.detector_runs / frames, 3) if frames else 0.0
+        }
+
+    def _visible(self) -> TrackArrays:
+        visible = self._misses == 0
+        conf = self._conf[visible] * np.float32(self.conf_decay ** self._since_detect)
+        return _to_xyxy(self._x[visible, :4]), conf.astype(np.float32), self._cls[visible], self._ids[visible]
+
+    def _noise(self, scale: np.ndarray, position: float, velocity: float) -> np.ndarray:
+        """Diagonal noise matrices whose std scales with each track's box size"""
+        std = np.concatenate([np.repeat(scale[:, None] * position, 4, 1), np.repeat(scale[:, None] * velocity, 4, 1)], 1)
+        return std[:, :, None] ** 2 * np.eye(8)
+
+    def _predict(self):
+        if not len(self._ids):
+            return
+        scale = np.maximum(self._x[:, 2], self._x[:, 3])
+        self._x = self._x @ _F.T
+        self._p = _F @ self._p @ _F.T + self._noise(scale, 1 / 20, 1 / 160)
+
+    def _correct(self, idx: np.ndarray, z: np.ndarray):
+        x, p = self._x[idx], self._p[idx]
+        scale = np.maximum(z[:, 2], z[:, 3])
+        r = (scale[:, None, None] / 20) ** 2 * np.eye(4)
+        s = _H @ p @ _H.T + r
+        k = p @ _H.T @ np.linalg.inv(s)
+        innovation = z - x @ _H.T
+        self._x[idx] = x + np.einsum('nij,nj->ni', k, innovation)
+        self._p[idx] = (np.eye(8) - k @ _H) @ p
+
+    def _match(self, xyxy: np.ndarray, cls: np.ndarray):
+        """Greedy highest-IoU matching between tracks and same-class detections"""
+        iou = box_iou(_to_xyxy(self._x[:, :4]), xyxy)
+        if iou.size == 0:
+            return []
+        iou[self._cls[:, None] != cls[None, :]] = 0.0
+        candidates = np.argwhere(iou >= self.iou_threshold)
+        order = np.argsort(-iou[candidates[:, 0], candidates[:, 1]], kind='stable')
+
+        pairs, used_tracks, used_dets = [], set(), set()
+        for t, d in candidates[order].tolist():
+            if t not in used_tracks and d not in used_dets:
+                pairs.append((t, d))
+                used_tracks.add(t)
+                used_dets.add(d)
+        return pairs
+
+    def _spawn(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray):
+        count = len(conf)
+        z = _to_cxcywh(xyxy)
+        x = np.concatenate([z, np.zeros((count, 4))], axis=1)
+        scale = np.maximum(z[:, 2], z[:, 3])
+        p = self._noise(scale, 2 / 20, 10 / 160)
+
+        self._x = np.concatenate([self._x, x])
+        self._p = np.concatenate([self._p, p])
+        self._ids = np.concatenate([self._ids, np.arange(self._next_id, self._next_id + count)])
+        self._cls = np.concatenate([self._cls, cls.astype(np.int64)])
+        self._conf = np.concatenate([self._conf, conf.astype(np.float32)])
+        self._misses = np.concatenate([self._misses, np.zeros(count, dtype=np.int64)])
+        self._next_id += count
+
+    def _select(self, mask: np.ndarray):
+        self._x, self._p = self._x[mask], self._p[mask]
+        self._ids, self._cls = self._ids[mask], self._cls[mask]
+        self._conf, self._misses = self._conf[mask], self._misses[mask]
@@ -4,6 +4,9 @@ Validation utilities for file uploads and inputs
 
 import os
 import cv2
+import numpy as np
+from pathlib import Path
+from typing import Callable, Iterable, Optional
 from app.config import Config
 
 
@@ -51,6 +54,27 @@ def validate_image(filepath: str) -> bool:
         return False
 
 
+def decode_image(content: bytes) -> Optional[np.ndarray]:
+    """
+    Decode and validate image bytes in memory
+
+    Args:
+        content: Encoded image bytes
+
+    Returns:
+        BGR image, or None if the bytes are not a valid image
+    """
+    try:
+        if not content:
+            return None
+        img = cv2.imdecode(np.frombuffer(content, np.uint8), cv2.IMREAD_COLOR)
+        if img is None or img.shape[0] < 1 or img.shape[1] < 1:
+            return None
+        return img
+    except Exception:
+        return None
+
+
 def validate_confidence(conf: float) -> bool:
     """
     Validate confidence threshold value
@@ -75,3 +99,75 @@ def validate_camera_index(index: int) -> bool:
         True if valid, False otherwise
     """
     return 0 <= index < 10  # Reasonable limit
+
+
+def _resolve_under(base_dir: str, name: str, predicate: Callable[[Path], bool]) -> Optional[str]:
+    """
+    Resolve a name or path to an existing entry inside a base directory
+
+    Args:
+        base_dir: Directory the entry must stay inside
+        name: Path, absolute or relative to base_dir
+        predicate: Check the resolved path must pass (e.g. Path.is_file)
+
+    Returns:
+        Absolute path, or None if it escapes base_dir or fails the predicate
+    """
+    if not name:
+        return None
+
+    base = Path(base_dir).resolve()
+    candidate = Path(name)
+    if not candidate.is_absolute():
+        candidate = base / candidate
+    candidate = candidate.resolve()
+
+    if candidate != base and base not in candidate.parents:
+        return None
+    if not predicate(candidate):
+        return None
+    return str(candidate)
+
+
+def _has_extension(extensions: Iterable[str]) -> Callable[[Path], bool]:
+    """Predicate for existing files with one of the given extensions"""
+    return lambda path: path.suffix.lstrip('.').lower() in extensions and path.is_file()
+
+
+def resolve_model_path(model: str) -> Optional[str]:
+    """
+    Resolve a model name or path to a weights file inside the backend directory
+
+    Args:
+        model: Model file name (e.g. yolov8n.pt) or path relative to the backend directory
+
+    Returns:
+        Absolute model path, or None if the model is not an allowed existing file
+    """
+    return _resolve_under(Config.BASE_DIR, model, _has_extension(Config.MODEL_EXTENSIONS))
+
+
+def resolve_folder_path(folder: str) -> Optional[str]:
+    """
+    Resolve a folder name or path to an existing directory inside the backend directory
+
+    Args:
+        folder: Directory path, absolute or relative to the backend directory
+
+    Returns:
+        Absolute directory path, or None if it is outside the backend directory or missing
+    """
+    return _resolve_under(Config.BASE_DIR, folder, Path.is_dir)
+
+
+def resolve_video_path(video: str) -> Optional[str]:
+    """
+    Resolve a video name or path to an existing video file inside the backend directory
+
+    Args:
+        video: Video file path, absolute or relative to the backend directory
+
+    Returns:
+        Absolute video path, or None if it is not an allowed existing file
+    """
+    return _resolve_under(Config.BASE_DIR, video, _has_extension(Config.VIDEO_EXTENSIONS))
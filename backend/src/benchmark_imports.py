@@ -0,0 +1,128 @@
+"""
+Import-time Benchmark
+Guards against regressions in process startup time
+
+Each target is imported in a fresh interpreter. The check fails if it takes
+longer than the budget or pulls in a heavy module (ultralytics, torch,
+matplotlib) that should only be loaded on first use.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ['ultralytics', 'torch', 'torchvision', 'matplotlib', 'onnxruntime']
+
+# Code run in the child interpreter; {body} performs the import being measured
+CHILD_TEMPLATE = """
+import json, sys, time
+sys.path.insert(0, {backend!r})
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(json.dumps({{'seconds': elapsed, 'heavy': heavy}}))
+"""
+
+APP_FACTORY = """
+import importlib.util
+spec = importlib.util.spec_from_file_location('app_main', 'app.py')
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+module.create_app(warmup=False)
+"""
+
+CLI_HELP = """
+import runpy
+sys.argv = [{script!r}, '--help']
+try:
+    runpy.run_path({script!r}, run_name='__main__')
+except SystemExit:
+    pass
+"""
+
+CLI_IMPORT = """
+import runpy
+runpy.run_path({script!r}, run_name='benchmark')
+"""
+
+TARGETS = {
+    'app.routes': 'import app.routes',
+    'app.services.detect_service': 'import app.services.detect_service',
+    'app.py create_app': APP_FACTORY,
+    'src/detect_image.py --help': CLI_HELP.format(script='src/detect_image.py'),
+    'src/detect_live.py --help': CLI_HELP.format(script='src/detect_live.py'),
+    'src/export_model.py --help': CLI_HELP.format(script='src/export_model.py'),
+    'src/train.py --help': CLI_HELP.format(script='src/train.py'),
+    'src/merge_coco_custom.py --help': CLI_HELP.format(script='src/merge_coco_custom.py'),
+    'src/merge_datasets.py (import)': CLI_IMPORT.format(script='src/merge_datasets.py'),
+}
+
+
+def measure(body: str, repeat: int) -> dict:
+    """Run one import target in fresh interpreters and keep the fastest run"""
+    code = CHILD_TEMPLATE.format(backend=str(BACKEND_DIR), body=body.strip(), heavy=HEAVY_MODULES)
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True
+        )
+        if proc.returncode != 0:
+            return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed'}
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import-time Benchmark')
+    parser.add_argument('--budget', type=float, default=1.5,
+                        help='Maximum import time per target in seconds (default: 1.5)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per target, fastest is reported (default: 3)')
+    parser.add_argument('--json', action='store_true',
+                        help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = {name: measure(body, args.repeat) for name, body in TARGETS.items()}
+
+    failures = []
+    for name, result in results.items():
+        if 'error' in result:
+            failures.append(f"{name}: {result['error']}")
+        elif result['heavy']:
+            failures.append(f"{name}: imports heavy modules {result['heavy']}")
+        elif result['seconds'] > args.budget:
+            failures.append(f"{name}: {result['seconds']:.3f}s exceeds budget {args.budget:.3f}s")
+
+    if args.json:
+        print(json.dumps({'results': results, 'failures': failures}, indent=2))
+    else:
+        print("=" * 60)
+        print("Import-time Benchmark")
+        print("=" * 60)
+        for name, result in results.items():
+            if 'error' in result:
+                print(f"  {name:<36} ERROR  {result['error']}")
+            else:
+                heavy = f"  heavy={result['heavy']}" if result['heavy'] else ''
+                print(f"  {name:<36} {result['seconds'] * 1000:8.1f} ms{heavy}")
+        print("=" * 60)
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        if not failures:
+            print("OK: all targets within budget")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
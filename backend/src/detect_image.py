@@ -4,9 +4,13 @@ Image Object Detection for Personal Items
 
 import cv2
 import argparse
-from ultralytics import YOLO
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.utils.detections import boxes_to_arrays, build_detections, class_mask, filter_arrays
+from app.utils.renderer import DetectionRenderer
+
 
 def main():
     parser = argparse.ArgumentParser(description='Image Object Detection')
@@ -20,6 +24,9 @@ def main():
                         help='Save results')
     args = parser.parse_args()
 
+    # Heavy import deferred until after argument parsing
+    from ultralytics import YOLO
+
     # Load model
     model = YOLO(args.model)
 
@@ -33,28 +40,17 @@ def main():
 
     # Run detection
     results = model(args.source, conf=args.conf)
+    renderer = DetectionRenderer(text_color=None, label_background=False, label_offset=10)
 
     for i, result in enumerate(results):
-        img = result.orig_img.copy()
-        boxes = result.boxes
-
-        detected_items = []
-
-        if boxes is not None:
-            for box in boxes:
-                cls_id = int(box.cls[0])
-                cls_name = model.names[cls_id]
-
-                if cls_name in personal_items:
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    conf = float(box.conf[0])
-
-                    cv2.rectangle(img, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                    label = f"{cls_name}: {conf:.2f}"
-                    cv2.putText(img, label, (x1, y1 - 10),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-
-                    detected_items.append(cls_name)
+        img = result.orig_img
+        xyxy, confs, cls_ids = boxes_to_arrays(result.boxes)
+        mask = class_mask(cls_ids, model.names, personal_items)
+        xyxy, confs, cls_ids = filter_arrays(xyxy, confs, cls_ids, mask)
+        detections = build_detections(xyxy, confs, cls_ids, model.names)
+        renderer.draw(img, xyxy, confs, cls_ids, model.names)
+
+        detected_items = [det['class_name'] for det in detections]
 
         print(f"Detected personal items: {detected_items}")
 
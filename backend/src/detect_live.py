@@ -5,9 +5,15 @@ Uses YOLOv8 for real-time detection
 
 import cv2
 import argparse
-from ultralytics import YOLO
+import sys
+from pathlib import Path
 import time
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.utils.detections import boxes_to_arrays, class_mask, filter_arrays
+from app.utils.renderer import DetectionRenderer
+from app.utils.tracker import BoxTracker
+
 
 def main():
     parser = argparse.ArgumentParser(description='Live Camera Object Detection')
@@ -21,8 +27,13 @@ def main():
                         help='Show FPS on screen')
     parser.add_argument('--all-objects', action='store_true',
                         help='Detect all objects (not just personal items)')
+    parser.add_argument('--detect-every', type=int, default=4,
+                        help='Run the detector every N frames and track in between (default: 4, 1 = every frame)')
     args = parser.parse_args()
 
+    # Heavy import deferred until after argument parsing
+    from ultralytics import YOLO
+
     # Load model
     print(f"Loading model: {args.model}")
     model = YOLO(args.model)
@@ -68,6 +79,8 @@ def main():
         print("Mode: Detecting personal items only")
 
     show_fps = args.show_fps
+    renderer = DetectionRenderer()
+    tracker = BoxTracker(detect_interval=args.detect_every) if args.detect_every > 1 else None
     prev_time = time.time()
 
     while True:
@@ -76,38 +89,30 @@ def main():
             print("Error: Cannot read frame")
             break
 
-        # Run detection
-        results = model(frame, conf=args.conf, verbose=False)
-
-        # Filter results for personal items only
-        for result in results:
-            boxes = result.boxes
-            if boxes is not None:
-                for box in boxes:
-                    cls_id = int(box.cls[0])
-                    cls_name = model.names[cls_id]
-
-                    # Check if we should display this object
-                    should_display = all_objects_mode or (cls_name in personal_items)
-
-                    if should_display:
-                        # Get box coordinates
-                        x1, y1, x2, y2 = map(int, box.xyxy[0])
-                        conf = float(box.conf[0])
-
-                        # Color: green for personal items, blue for others
-                        color = (0, 255, 0) if cls_name in personal_items else (255, 165, 0)
-
-                        # Draw box
-                        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-
-                        # Draw label
-                        label = f"{cls_name}: {conf:.2f}"
-                        label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
-                        cv2.rectangle(frame, (x1, y1 - label_size[1] - 10),
-                                     (x1 + label_size[0], y1), color, -1)
-                        cv2.putText(frame, label, (x1, y1 - 5),
-                                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
+        # Run detection only when the tracker needs it, otherwise move the tracks
+        if tracker is None or tracker.should_detect(args.conf):
+            results = model(frame, conf=args.conf, verbose=False)
+            xyxy, confs, cls_ids = boxes_to_arrays(results[0].boxes)
+            if not all_objects_mode:
+                # Filter results for personal items only
+                mask = class_mask(cls_ids, model.names, personal_items)
+                xyxy, confs, cls_ids = filter_arrays(xyxy, confs, cls_ids, mask)
+            track_ids = None
+            if tracker is not None:
+                xyxy, confs, cls_ids, track_ids = tracker.update(xyxy, confs, cls_ids)
+        else:
+            xyxy, confs, cls_ids, track_ids = tracker.predict(args.conf)
+        is_personal = class_mask(cls_ids, model.names, personal_items)
+
+        # Color: green for personal items, blue for others
+        colors = [(0, 255, 0) if personal else (255, 165, 0) for personal in is_personal.tolist()]
+        labels = None
+        if track_ids is not None:
+            labels = [
+                f"{model.names[c]} #{t}: {s:.2f}"
+                for c, t, s in zip(cls_ids.tolist(), track_ids.tolist(), confs.tolist())
+            ]
+        renderer.draw(frame, xyxy, confs, cls_ids, model.names, colors=colors, labels=labels)
 
         # Calculate and display FPS
         if show_fps:
@@ -132,11 +137,16 @@ def main():
             show_fps = not show_fps
         elif key == ord('a'):
             all_objects_mode = not all_objects_mode
+            if tracker is not None:
+                tracker.reset()
             mode_text = "ALL objects" if all_objects_mode else "personal items only"
             print(f"Switched to: {mode_text}")
 
     cap.release()
     cv2.destroyAllWindows()
+    if tracker is not None:
+        stats = tracker.get_stats()
+        print(f"Detector ran on {stats['detector_runs']} frames, tracked {stats['tracked_frames']} frames")
     print("Detection stopped")
 
 
@@ -3,7 +3,6 @@ Export trained YOLO model to various formats
 """
 
 import argparse
-from ultralytics import YOLO
 from pathlib import Path
 
 
@@ -26,6 +25,9 @@ def main():
                         help='Dynamic axes for ONNX')
     args = parser.parse_args()
 
+    # Heavy import deferred until after argument parsing
+    from ultralytics import YOLO
+
     # Load model
     print(f"Loading model: {args.model}")
     model = YOLO(args.model)
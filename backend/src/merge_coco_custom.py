@@ -8,7 +8,6 @@ import shutil
 import yaml
 import random
 from pathlib import Path
-from ultralytics import YOLO
 from tqdm import tqdm
 
 
@@ -236,6 +235,7 @@ def main():
     if args.download_coco or not coco_dir.exists():
         print("\nDownloading COCO128 dataset...")
         # YOLO will download to datasets/coco128
+        from ultralytics import YOLO
         model = YOLO('yolov8n.pt')
         model.val(data='coco128.yaml', verbose=False)
         coco_dir = Path('datasets/coco128')
@@ -3,8 +3,6 @@ Train YOLOv8 model for Personal Items Detection
 """
 
 import argparse
-import torch
-from ultralytics import YOLO
 from pathlib import Path
 
 
@@ -28,6 +26,10 @@ def main():
                         help='Experiment name')
     args = parser.parse_args()
 
+    # Heavy imports deferred until after argument parsing
+    import torch
+    from ultralytics import YOLO
+
     # Check GPU availability
     print("=" * 50)
     print("GPU Check")